@@ -0,0 +1,111 @@
+import hashlib
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header, parse_etags
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def certificate_response(request, certificate, filename):
+    """
+    Builds the download response for a rendered certificate according to
+    CERTIFICATE_DELIVERY:
+
+    - "x-accel-redirect": empty response; nginx serves the file from
+      CERTIFICATE_ACCEL_REDIRECT_PREFIX
+    - "x-sendfile": empty response; Apache/lighttpd serve the file by path
+    - "direct" (default): Django serves the file, honouring If-None-Match
+      (304) and single byte ranges (206)
+
+    Permission checks must already have passed.
+    """
+    mode = settings.CERTIFICATE_DELIVERY
+    etag = certificate_etag(certificate)
+
+    if mode == "x-accel-redirect":
+        response = HttpResponse(content_type="application/pdf")
+        response["X-Accel-Redirect"] = (
+            settings.CERTIFICATE_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(certificate.pdf_file.name)
+        )
+    elif mode == "x-sendfile":
+        response = HttpResponse(content_type="application/pdf")
+        response["X-Sendfile"] = certificate.pdf_file.path
+    else:
+        response = _direct_response(request, certificate, etag)
+
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    if response.status_code != 304:
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+def certificate_etag(certificate):
+    """
+    Rendered PDFs never change in place (a re-render gets a new file name),
+    so the certificate id plus the stored name identify the bytes without
+    touching storage.
+    """
+    digest = hashlib.md5(
+        f"{certificate.certificate_id}:{certificate.pdf_file.name}".encode(),
+        usedforsecurity=False
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def _direct_response(request, certificate, etag):
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == "*"):
+        return HttpResponse(status=304)
+
+    pdf_file = certificate.pdf_file
+    byte_range = RANGE_RE.match(request.META.get("HTTP_RANGE", "").strip())
+    if_range = request.META.get("HTTP_IF_RANGE")
+
+    # Only single ranges are honoured; a stale If-Range means the client's
+    # partial copy is outdated, so both cases fall back to the whole file.
+    if byte_range and (not if_range or if_range == etag):
+        size = pdf_file.size
+        bounds = _range_bounds(*byte_range.groups(), size)
+
+        if bounds is None:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        start, end = bounds
+        with pdf_file.open("rb") as f:
+            f.seek(start)
+            data = f.read(end - start + 1)
+
+        response = HttpResponse(data, status=206, content_type="application/pdf")
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+    response = FileResponse(pdf_file.open("rb"), content_type="application/pdf")
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def _range_bounds(start, end, size):
+    """
+    Turns the two halves of "bytes=start-end" into inclusive (start, end)
+    offsets, or None when the range cannot be satisfied.
+    """
+    if start == "":
+        if end == "" or int(end) == 0:
+            return None
+        # Suffix range: the last N bytes
+        start = max(size - int(end), 0)
+        end = size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+
+    if start >= size or start > end:
+        return None
+    return start, end
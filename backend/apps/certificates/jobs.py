@@ -0,0 +1,88 @@
+import logging
+from concurrent.futures import as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from core.jobs import claim_jobs as claim_queued_jobs
+
+from .models import CertificateJob
+from .utils import render_certificate
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_certificate(certificate):
+    """
+    Returns the render job for a certificate, creating it if needed.
+    A finished job whose file went missing is queued again. A FAILED job
+    stays failed until CERTIFICATE_JOB_RETRY_SECONDS after its last
+    attempt; asking for the certificate after that queues it for one more
+    attempt (attempts keep counting).
+    """
+    job, created = CertificateJob.objects.get_or_create(certificate=certificate)
+    if created:
+        return job
+
+    requeue = CertificateJob.objects.filter(pk=job.pk)
+    if job.status == CertificateJob.Status.DONE:
+        requeue = requeue.filter(status=CertificateJob.Status.DONE)
+    elif job.status == CertificateJob.Status.FAILED:
+        requeue = requeue.filter(
+            status=CertificateJob.Status.FAILED,
+            updated_at__lte=timezone.now() - timedelta(seconds=settings.CERTIFICATE_JOB_RETRY_SECONDS)
+        )
+    else:
+        return job
+
+    # Conditional, so concurrent polls queue the job once
+    if requeue.update(status=CertificateJob.Status.PENDING, updated_at=timezone.now()):
+        job.refresh_from_db()
+    return job
+
+
+def claim_jobs(limit):
+    """
+    Moves up to `limit` pending jobs to RUNNING and returns them.
+    """
+    return claim_queued_jobs(
+        CertificateJob.objects.select_related('certificate__student', 'certificate__course'),
+        limit
+    )
+
+
+def process_jobs(jobs, pool):
+    """
+    Renders the claimed jobs on `pool` (a concurrent.futures executor) and
+    stores the resulting PDFs. Failed renders are retried up to
+    CERTIFICATE_JOB_MAX_ATTEMPTS times before the job is marked FAILED.
+    """
+    futures = {}
+    for job in jobs:
+        certificate = job.certificate
+        futures[pool.submit(
+            render_certificate,
+            student_name=certificate.student.username,
+            course_name=certificate.course.title,
+            date_str=certificate.issued_at.strftime("%Y-%m-%d"),
+            cert_id=certificate.certificate_id
+        )] = job
+
+    for future in as_completed(futures):
+        job = futures[future]
+        try:
+            filename, pdf_data = future.result()
+            job.certificate.pdf_file.save(filename, ContentFile(pdf_data))
+            job.status = CertificateJob.Status.DONE
+            job.error = ''
+        except Exception as e:
+            logger.exception("Certificate job %s failed", job.job_id)
+            job.error = str(e)
+            job.status = job.retry_status(settings.CERTIFICATE_JOB_MAX_ATTEMPTS)
+
+        job.save(update_fields=['status', 'error', 'updated_at'])
+
+    return len(futures)
+
@@ -0,0 +1,46 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.certificates.utils import render_certificate
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark certificate rendering and check that output is byte-stable."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--renders",
+            type=int,
+            default=500,
+            help="Certificates rendered (default: 500).",
+        )
+
+    def handle(self, *args, **options):
+        renders = options["renders"]
+        sample = {
+            "student_name": "benchmark_student",
+            "course_name": "Benchmark Course",
+            "date_str": "2025-01-01",
+            "cert_id": uuid.UUID(int=0),
+        }
+
+        # Byte stability: same inputs -> same bytes
+        _, first = render_certificate(**sample)
+        _, second = render_certificate(**sample)
+        if first != second:
+            raise CommandError("Certificate output is not byte-stable for identical inputs")
+        self.stdout.write("Byte-stable output: OK")
+
+        started = time.perf_counter()
+        for i in range(renders):
+            render_certificate(
+                student_name=f"student_{i}",
+                course_name=sample["course_name"],
+                date_str=sample["date_str"],
+                cert_id=uuid.UUID(int=i),
+            )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(f"{renders / elapsed:.1f} renders/s"))
@@ -0,0 +1,23 @@
+from django.conf import settings
+
+from apps.certificates.jobs import claim_jobs, process_jobs
+from apps.certificates.models import CertificateJob
+from core.jobs import JobWorkerCommand
+
+
+class Command(JobWorkerCommand):
+    help = (
+        "Render queued certificate PDFs on a local process pool. "
+        "The queue lives in the database, so no external broker is needed."
+    )
+    model = CertificateJob
+    stale_seconds = settings.CERTIFICATE_JOB_STALE_SECONDS
+    worker_name = "Certificate worker"
+    job_name = "certificate job"
+    pool_purpose = "rendering"
+
+    def claim(self, limit):
+        return claim_jobs(limit)
+
+    def process(self, jobs, pool):
+        return process_jobs(jobs, pool)
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-17 15:46
+
+from django.db import migrations, models
+from django.db.models import F
+
+RUNNING = 2
+
+
+def backfill_locked_at(apps, schema_editor):
+    # Jobs already running were claimed at their last update; without a
+    # claim time the stale-job requeue would never pick them up
+    apps.get_model("certificates", "CertificateJob").objects.filter(status=RUNNING).update(locked_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificates', '0002_certificatejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificatejob',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_locked_at, migrations.RunPython.noop),
+    ]
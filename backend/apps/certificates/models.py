@@ -2,6 +2,7 @@ from django.db import models
 from django.conf import settings
 import uuid
 from apps.courses.models import Course
+from core.jobs import QueueJob
 
 class Certificate(models.Model):
     # Unique ID for verification (e.g., printed on the PDF)
@@ -18,4 +19,21 @@ class Certificate(models.Model):
         unique_together = ('student', 'course')
 
     def __str__(self):
-        return f"Certificate: {self.student.username} - {self.course.title}"
\ No newline at end of file
+        return f"Certificate: {self.student.username} - {self.course.title}"
+
+
+class CertificateJob(QueueJob):
+    """
+    DB-backed render queue entry for a certificate PDF.
+    Picked up by the `run_certificate_worker` management command.
+    """
+    job_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    certificate = models.OneToOneField(Certificate, on_delete=models.CASCADE, related_name='job')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"CertificateJob {self.job_id} ({self.get_status_display()})"
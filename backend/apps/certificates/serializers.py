@@ -0,0 +1,14 @@
+from rest_framework import serializers
+
+from core.serializers import ModelSerializer
+
+from .models import CertificateJob
+
+
+class CertificateJobSerializer(ModelSerializer):
+    course = serializers.IntegerField(source='certificate.course_id', read_only=True)
+    status_name = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = CertificateJob
+        fields = ['job_id', 'course', 'status', 'status_name', 'attempts', 'error', 'created_at', 'updated_at']
@@ -0,0 +1,189 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.courses.models import Course, CourseAssignment
+from core.jobs import requeue_stale_jobs
+
+from .delivery import certificate_etag, certificate_response
+from .jobs import claim_jobs, enqueue_certificate
+from .models import Certificate, CertificateJob
+
+User = get_user_model()
+
+
+class CertificateJobQueueTests(TestCase):
+    def setUp(self):
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.jobs = []
+        for n in range(3):
+            student = User.objects.create_user(username=f"student{n}", password="x", role=User.Role.STUDENT)
+            course = Course.objects.create(title=str(n), mentor=mentor)
+            self.jobs.append(CertificateJob.objects.create(
+                certificate=Certificate.objects.create(student=student, course=course)
+            ))
+
+    def test_claim_takes_oldest_pending_jobs_once(self):
+        claimed = claim_jobs(2)
+
+        self.assertEqual([job.pk for job in claimed], [job.pk for job in self.jobs[:2]])
+        for job in claimed:
+            self.assertEqual(job.status, CertificateJob.Status.RUNNING)
+            self.assertEqual(job.attempts, 1)
+            self.assertIsNotNone(job.locked_at)
+        self.assertEqual([job.pk for job in claim_jobs(2)], [self.jobs[2].pk])
+        self.assertEqual(claim_jobs(2), [])
+
+    def test_requeue_only_jobs_claimed_before_the_timeout(self):
+        claim_jobs(2)
+        CertificateJob.objects.filter(pk=self.jobs[0].pk).update(locked_at=timezone.now() - timedelta(minutes=10))
+
+        self.assertEqual(requeue_stale_jobs(CertificateJob, timedelta(minutes=5)), 1)
+        self.assertEqual(
+            dict(CertificateJob.objects.values_list("pk", "status")),
+            {
+                self.jobs[0].pk: CertificateJob.Status.PENDING,
+                self.jobs[1].pk: CertificateJob.Status.RUNNING,
+                self.jobs[2].pk: CertificateJob.Status.PENDING,
+            }
+        )
+
+    def test_retry_status_until_out_of_attempts(self):
+        job = self.jobs[0]
+        job.attempts = 2
+        self.assertEqual(job.retry_status(3), CertificateJob.Status.PENDING)
+        job.attempts = 3
+        self.assertEqual(job.retry_status(3), CertificateJob.Status.FAILED)
+
+
+@override_settings(CERTIFICATE_JOB_RETRY_SECONDS=600)
+class EnqueueCertificateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.student = User.objects.create_user(username="student", password="x", role=User.Role.STUDENT)
+        course = Course.objects.create(title="Course", mentor=mentor)
+        CourseAssignment.objects.create(course=course, student=self.student)
+        self.certificate = Certificate.objects.create(student=self.student, course=course)
+        self.job = CertificateJob.objects.create(certificate=self.certificate, status=CertificateJob.Status.FAILED, attempts=3)
+        self.url = f"/api/certificates/{course.pk}/"
+
+    def fail_ago(self, seconds):
+        CertificateJob.objects.filter(pk=self.job.pk).update(updated_at=timezone.now() - timedelta(seconds=seconds))
+
+    def test_failed_job_stays_failed_during_backoff(self):
+        self.fail_ago(60)
+        for _ in range(3):
+            job = enqueue_certificate(self.certificate)
+        self.assertEqual((job.status, job.attempts), (CertificateJob.Status.FAILED, 3))
+
+    def test_failed_job_is_requeued_after_backoff_keeping_attempts(self):
+        self.fail_ago(601)
+        job = enqueue_certificate(self.certificate)
+        self.assertEqual((job.status, job.attempts), (CertificateJob.Status.PENDING, 3))
+
+    def test_download_answers_503_while_failed(self):
+        self.fail_ago(60)
+        client = APIClient()
+        client.force_authenticate(self.student)
+
+        response = client.get(self.url)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "600")
+        self.assertEqual(response.data["data"]["status"], CertificateJob.Status.FAILED)
+
+
+class CertificateDeliveryTests(TestCase):
+    def setUp(self):
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        student = User.objects.create_user(username="student", password="x", role=User.Role.STUDENT)
+        course = Course.objects.create(title="Course", mentor=mentor)
+        self.certificate = Certificate.objects.create(student=student, course=course)
+        self.certificate.pdf_file.save("delivery.pdf", ContentFile(b"0123456789"))
+        self.addCleanup(self.certificate.pdf_file.delete, save=False)
+        self.etag = certificate_etag(self.certificate)
+
+    def download(self, **headers):
+        request = RequestFactory().get("/", headers=headers)
+        response = certificate_response(request, self.certificate, "certificate.pdf")
+        if response.streaming:
+            # response.close() would also fire request_finished
+            self.addCleanup(response.file_to_stream.close)
+        return response
+
+    def test_whole_file(self):
+        response = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("certificate.pdf", response["Content-Disposition"])
+
+    def test_matching_if_none_match_is_304(self):
+        for if_none_match in (self.etag, f'"other", {self.etag}', "*"):
+            with self.subTest(if_none_match=if_none_match):
+                response = self.download(if_none_match=if_none_match)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+                self.assertEqual(response["ETag"], self.etag)
+                self.assertNotIn("Content-Disposition", response)
+
+        self.assertEqual(self.download(if_none_match='"other"').status_code, 200)
+
+    def test_single_range_is_206(self):
+        for byte_range, content, content_range in (
+            ("bytes=2-5", b"2345", "bytes 2-5/10"),
+            ("bytes=7-", b"789", "bytes 7-9/10"),
+            ("bytes=-3", b"789", "bytes 7-9/10"),
+            ("bytes=8-20", b"89", "bytes 8-9/10"),
+        ):
+            with self.subTest(range=byte_range):
+                response = self.download(range=byte_range)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response.content, content)
+                self.assertEqual(response["Content-Range"], content_range)
+
+    def test_unsatisfiable_range_is_416(self):
+        for byte_range in ("bytes=10-", "bytes=5-2", "bytes=-0"):
+            with self.subTest(range=byte_range):
+                response = self.download(range=byte_range)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response["Content-Range"], "bytes */10")
+
+    def test_multiple_ranges_fall_back_to_whole_file(self):
+        self.assertEqual(self.download(range="bytes=0-1,4-5").status_code, 200)
+
+    def test_if_range(self):
+        response = self.download(range="bytes=2-5", if_range=self.etag)
+        self.assertEqual(response.status_code, 206)
+
+        # The client's partial copy is stale: send the whole file
+        response = self.download(range="bytes=2-5", if_range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+
+    @override_settings(CERTIFICATE_DELIVERY="x-accel-redirect", CERTIFICATE_ACCEL_REDIRECT_PREFIX="/protected/")
+    def test_x_accel_redirect(self):
+        response = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected/{self.certificate.pdf_file.name}")
+        self.assertEqual(response["ETag"], self.etag)
+        self.assertIn("certificate.pdf", response["Content-Disposition"])
+
+    @override_settings(CERTIFICATE_DELIVERY="x-sendfile")
+    def test_x_sendfile(self):
+        response = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["X-Sendfile"], self.certificate.pdf_file.path)
+        self.assertEqual(response["ETag"], self.etag)
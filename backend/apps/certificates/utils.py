@@ -4,20 +4,52 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter, landscape
 from reportlab.lib import colors
 
+PAGE_SIZE = landscape(letter)
+
 
 def generate_certificate_pdf(student_name, course_name, date_str, cert_id):
     """
     Generates a PDF certificate in landscape mode.
     Returns a Django ContentFile ready to be saved to a model.
     """
+    filename, pdf_data = render_certificate(student_name, course_name, date_str, cert_id)
+    return ContentFile(pdf_data, name=filename)
+
+
+def render_certificate(student_name, course_name, date_str, cert_id):
+    """
+    Renders the certificate and returns (filename, pdf bytes).
+    Plain picklable values only, so it can run in a worker process pool.
+    Output is byte-stable for identical inputs.
+    """
     buffer = BytesIO()
 
     # Create the PDF object, using the buffer as its "file."
-    p = canvas.Canvas(buffer, pagesize=landscape(letter))
-    width, height = landscape(letter)
+    # `invariant` pins the creation date and document id so identical
+    # inputs always produce identical bytes.
+    p = canvas.Canvas(buffer, pagesize=PAGE_SIZE, invariant=1)
+    width, height = PAGE_SIZE
 
     # --- Design the Certificate ---
+    p.saveState()
+    _draw_static_layer(p, width, height)
+    p.restoreState()
+
+    _draw_variable_layer(p, width, height, student_name, course_name, date_str, cert_id)
+
+    # Close the PDF object cleanly, and we're done.
+    p.showPage()
+    p.save()
 
+    # Get the value of the BytesIO buffer and write it to the response.
+    pdf_data = buffer.getvalue()
+    buffer.close()
+
+    filename = f"certificate_{student_name}_{course_name}.pdf".replace(" ", "_")
+    return filename, pdf_data
+
+
+def _draw_static_layer(p, width, height):
     # Border
     p.setStrokeColor(colors.darkblue)
     p.setLineWidth(5)
@@ -31,33 +63,22 @@ def generate_certificate_pdf(student_name, course_name, date_str, cert_id):
     p.setFont("Helvetica", 18)
     p.drawCentredString(width / 2, height - 160, "This is to certify that")
 
+    # More Body Text
+    p.drawCentredString(width / 2, height - 260, "has successfully completed the course")
+
+
+def _draw_variable_layer(p, width, height, student_name, course_name, date_str, cert_id):
     # Student Name
     p.setFont("Helvetica-Bold", 30)
     p.setFillColor(colors.darkblue)
     p.drawCentredString(width / 2, height - 210, student_name)
 
-    # More Body Text
-    p.setFont("Helvetica", 18)
-    p.setFillColor(colors.black)
-    p.drawCentredString(width / 2, height - 260, "has successfully completed the course")
-
     # Course Name
     p.setFont("Helvetica-Bold", 24)
+    p.setFillColor(colors.black)
     p.drawCentredString(width / 2, height - 300, course_name)
 
     # Date and ID Footer
     p.setFont("Helvetica", 12)
     p.drawString(50, 50, f"Issued: {date_str}")
     p.drawRightString(width - 50, 50, f"ID: {str(cert_id)}")
-
-    # Close the PDF object cleanly, and we're done.
-    p.showPage()
-    p.save()
-
-    # Get the value of the BytesIO buffer and write it to the response.
-    pdf_data = buffer.getvalue()
-    buffer.close()
-
-    # Return as a ContentFile with a filename
-    filename = f"certificate_{student_name}_{course_name}.pdf".replace(" ", "_")
-    return ContentFile(pdf_data, name=filename)
\ No newline at end of file
@@ -1,14 +1,21 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.http import FileResponse
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.reverse import reverse
 
-from apps.courses.models import Course, Chapter, ChapterProgress, CourseAssignment
+from apps.courses.events import record_event
+from apps.courses.models import Course, CourseAssignment, ProgressEvent
+from .delivery import certificate_response
+from .jobs import enqueue_certificate
 from .utils import generate_certificate_pdf
 from apps.courses.permissions import IsStudent
+from apps.courses.utils import is_student_enrolled
 
-from .models import Certificate
+from .models import Certificate, CertificateJob
+from .serializers import CertificateJobSerializer
 
 class CertificateViewSet(viewsets.GenericViewSet):
     """
@@ -24,29 +31,34 @@ class CertificateViewSet(viewsets.GenericViewSet):
         1. Check if user is enrolled.
         2. Check if user has completed ALL chapters (100%).
         3. If certificate exists, return it.
-        4. If not, generate it, save it, then return it.
+        4. If not, queue it for the certificate worker and answer 202 with
+           the job (or, with CERTIFICATE_RENDERING="inline", generate it,
+           save it, then return it).
         """
         student = request.user
         course_id = pk
 
         try:
-            course = get_object_or_404(Course, pk=course_id)
-
             # 1. Check Enrollment (Optional, but good for security)
-            if not CourseAssignment.objects.filter(student=student, course=course).exists():
+            # Answered from the cached enrollment set
+            if not course_id.isdigit() or not is_student_enrolled(student, int(course_id)):
+                get_object_or_404(Course, pk=course_id)
                 return Response({'detail': 'Not enrolled'}, status=status.HTTP_403_FORBIDDEN)
 
+            # The assignment row carries the denormalized progress counters
+            assignment = CourseAssignment.objects.select_related('course').get(
+                student=student,
+                course_id=course_id
+            )
+            course = assignment.course
+
             # 2. Check for 100% Completion
-            total_chapters = Chapter.objects.filter(course=course).count()
+            total_chapters = course.chapter_count
 
             # if total_chapters == 0:
             #     return Response({'detail': 'Course has no chapters to complete.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            completed_chapters = ChapterProgress.objects.filter(
-                student=student,
-                chapter__course=course,
-                completed=True
-            ).count()
+            completed_chapters = assignment.completed_chapters
 
             if completed_chapters < total_chapters:
                 missing = total_chapters - completed_chapters
@@ -60,9 +72,41 @@ class CertificateViewSet(viewsets.GenericViewSet):
                 student=student,
                 course=course
             )
+            if created:
+                record_event(
+                    ProgressEvent.Kind.CERTIFICATE_ISSUED,
+                    student.id,
+                    course.id,
+                    occurred_at=certificate.issued_at
+                )
 
             # If it was just created (or if file is missing), generate the PDF
             if created or not certificate.pdf_file:
+                if settings.CERTIFICATE_RENDERING != 'inline':
+                    # Rendered by the certificate worker; poll the job status
+                    job = enqueue_certificate(certificate)
+                    if job.status == CertificateJob.Status.FAILED:
+                        # Queued again once CERTIFICATE_JOB_RETRY_SECONDS have passed
+                        return Response(
+                            {
+                                'data': CertificateJobSerializer(job).data,
+                                'detail': 'Certificate generation failed. Try again later.'
+                            },
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            headers={'Retry-After': str(settings.CERTIFICATE_JOB_RETRY_SECONDS)}
+                        )
+                    return Response({
+                        'data': {
+                            **CertificateJobSerializer(job).data,
+                            'status_url': reverse(
+                                'certificate-job-status',
+                                kwargs={'job_id': job.job_id},
+                                request=request
+                            )
+                        },
+                        'detail': 'Certificate is being generated. Try again shortly.'
+                    }, status=status.HTTP_202_ACCEPTED)
+
                 pdf_file = generate_certificate_pdf(
                     student_name=student.username,
                     course_name=course.title,
@@ -73,13 +117,30 @@ class CertificateViewSet(viewsets.GenericViewSet):
                 certificate.save()
 
             # 4. Return the file as a download
-            # FileResponse automatically sets the correct headers for PDF viewing/download
-            return FileResponse(
-                certificate.pdf_file.open('rb'),
-                content_type='application/pdf',
-                as_attachment=True,
+            # Served directly (ETag / Range aware) or handed to the front
+            # proxy, depending on CERTIFICATE_DELIVERY
+            return certificate_response(
+                request,
+                certificate,
                 filename=f"Certificate-{course.title}.pdf"
             )
 
         except Exception as e:
-            return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['get'], url_path=r'jobs/(?P<job_id>[0-9a-f-]+)', url_name='job-status')
+    def job_status(self, request, job_id=None):
+        """
+        GET /api/certificates/jobs/:job_id/
+        Status of a background certificate render started by `retrieve`.
+        """
+        job = get_object_or_404(
+            CertificateJob.objects.select_related('certificate'),
+            job_id=job_id,
+            certificate__student=request.user
+        )
+
+        return Response({
+            'data': CertificateJobSerializer(job).data,
+            'detail': 'Certificate job fetched successfully'
+        }, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class CoursesConfig(AppConfig):
+    name = "apps.courses"
+    label = "courses"
+
+    def ready(self):
+        from core import checks  # noqa: F401
+
+        from . import signals  # noqa: F401
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import async_views
+
+# Included ahead of apps.courses.urls when ASYNC_READ_VIEWS is on, so these
+# paths resolve to the async views; everything else keeps its DRF route.
+urlpatterns = [
+    path('courses/enrolled/', async_views.enrolled_courses, name='course-enrolled-courses'),
+    path('courses/<int:course_id>/chapters/', async_views.chapter_list, name='course-chapters'),
+    path('progress/my/', async_views.my_progress, name='progress-my-progress'),
+]
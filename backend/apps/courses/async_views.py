@@ -0,0 +1,196 @@
+"""
+Native async versions of the hottest read endpoints, mounted in front of
+their DRF twins when ASYNC_READ_VIEWS is on (core/asgi.py turns it on).
+
+DRF views are sync only, so these are plain Django async views run inside
+their DRF view's request cycle (permissions, content negotiation, exception
+handling and rendering come from the DRF view itself). They do their own
+queries through the async ORM and cache API, so an ASGI worker keeps
+serving other requests while one waits on the database. Responses match
+the DRF endpoints (see apps.courses.tests.AsyncReadViewTests); other
+methods than GET are handed to the DRF view.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+from core.pagination import EnvelopeCursorPagination
+from core.serializers import ValuesSerializer
+
+from .models import Chapter, Course
+from .serializers import ChapterSerializer
+from .utils import (
+    aenrolled_courses_version,
+    ais_student_enrolled,
+    course_values_serializer,
+    enrolled_courses_validators,
+    not_modified_response,
+    progress_assignments,
+    progress_row,
+    set_validators,
+    version_etag
+)
+from .views import ChapterViewSet, CourseViewSet, ProgressViewSet
+
+User = get_user_model()
+
+def async_read_view(drf_view):
+    """
+    Serves GET with an async handler inside the DRF view's own request
+    cycle: an instance of the view (with its permissions, renderers and
+    exception handling) runs initialize_request, initial(),
+    handle_exception and finalize_response as APIView.dispatch does. Only
+    authentication is awaited, so the user lookup does not block the event
+    loop. Other methods go to `drf_view`.
+    """
+    sync_view = sync_to_async(drf_view)
+
+    def decorator(handler):
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method != "GET":
+                return await sync_view(request, *args, **kwargs)
+
+            api_view = _view_instance(drf_view, request, args, kwargs)
+            request = api_view.initialize_request(request, *args, **kwargs)
+            api_view.request = request
+            api_view.headers = api_view.default_response_headers
+
+            await _authenticate(request)
+            try:
+                api_view.initial(request, *args, **kwargs)
+                response = await handler(request, *args, **kwargs)
+            except Exception as exc:
+                response = api_view.handle_exception(exc)
+
+            return api_view.finalize_response(request, response, *args, **kwargs)
+
+        # DRF views are CSRF exempt too (JWT requests carry no cookies)
+        view.csrf_exempt = True
+        return view
+
+    return decorator
+
+
+def _view_instance(drf_view, request, args, kwargs):
+    # What the view function returned by (ViewSet.)as_view sets up
+    # before calling dispatch
+    api_view = drf_view.cls(**drf_view.initkwargs)
+    api_view.action_map = {"head": drf_view.actions["get"], **drf_view.actions}
+    for method, action in api_view.action_map.items():
+        setattr(api_view, method, getattr(api_view, action))
+    api_view.request, api_view.args, api_view.kwargs = request, args, kwargs
+    return api_view
+
+
+async def _authenticate(request):
+    """
+    Runs the request's authenticators ahead of initial(), awaiting
+    `aauthenticate` where they have one, and leaves the outcome in a single
+    authenticator for DRF's own Request._authenticate to pick up.
+    """
+    result = error = None
+    for authenticator in request.authenticators:
+        try:
+            if hasattr(authenticator, "aauthenticate"):
+                result = await authenticator.aauthenticate(request)
+            else:
+                result = await sync_to_async(authenticator.authenticate)(request)
+        except exceptions.APIException as exc:
+            error = exc
+            break
+        if result is not None:
+            break
+    request.authenticators = (_AwaitedAuthentication(result, error),)
+
+
+class _AwaitedAuthentication:
+    def __init__(self, result, error):
+        self.result, self.error = result, error
+
+    def authenticate(self, request):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+# -------------------------------------------------
+# GET /api/courses/enrolled/  (Student)
+# -------------------------------------------------
+@async_read_view(CourseViewSet.as_view({"get": "enrolled_courses"}))
+async def enrolled_courses(request):
+    student = request.user
+
+    etag, last_modified = enrolled_courses_validators(request, await aenrolled_courses_version(student.id))
+
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    values = course_values_serializer(request, context={"request": request})
+    paginator = EnvelopeCursorPagination()
+    page = await paginator.apaginate_queryset(
+        values.values(Course.objects.filter(courseassignment__student=student)),
+        request
+    )
+
+    response = Response(paginator.get_paginated_data(
+        await values.ato_representation(page),
+        detail="Enrolled courses fetched successfully"
+    ))
+    return set_validators(response, etag, last_modified)
+
+
+# -------------------------------------------------
+# GET /api/courses/:course_id/chapters/  (Mentor owner / enrolled Student)
+# -------------------------------------------------
+@async_read_view(ChapterViewSet.as_view({"get": "list", "post": "create"}))
+async def chapter_list(request, course_id):
+    course = await Course.objects.filter(pk=course_id).only("id", "mentor", "updated_at").afirst()
+    if course is None:
+        raise exceptions.NotFound("No Course matches the given query.")
+    user = request.user
+
+    if user.role == User.Role.MENTOR:
+        if course.mentor_id != user.id:
+            raise exceptions.PermissionDenied("You are not the mentor of this course.")
+
+    elif user.role == User.Role.STUDENT:
+        if not await ais_student_enrolled(user, course.id):
+            raise exceptions.PermissionDenied("You are not enrolled in this course.")
+
+    else:
+        raise exceptions.PermissionDenied("You are not allowed to view chapters.")
+
+    etag = version_etag(course.id, course.updated_at)
+    not_modified = not_modified_response(request, etag, course.updated_at)
+    if not_modified is not None:
+        return not_modified
+
+    values = ValuesSerializer(ChapterSerializer, context={"request": request})
+    chapters = [
+        row async for row in
+        values.values(Chapter.objects.filter(course=course).order_by("sequence_number")).aiterator()
+    ]
+
+    response = Response({
+        "data": await values.ato_representation(chapters),
+        "detail": "Chapters fetched successfully"
+    })
+    return set_validators(response, etag, course.updated_at)
+
+
+# -------------------------------------------------
+# GET /api/progress/my/  (Student)
+# -------------------------------------------------
+@async_read_view(ProgressViewSet.as_view({"get": "my_progress"}))
+async def my_progress(request):
+    results = [progress_row(assignment) async for assignment in progress_assignments(request.user).aiterator()]
+
+    return Response({
+        "data": results,
+        "detail": "Progress fetched successfully"
+    })
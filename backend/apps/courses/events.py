@@ -0,0 +1,163 @@
+"""
+ProgressEvent log: a buffered writer for the request path and the
+incremental consumer behind `manage.py consume_progress_events`.
+
+Recording an event costs no query. Events are handed to an in-process
+buffer once their transaction commits (events of a rolled-back request
+are dropped with it) and written with one bulk_create when the request
+finishes or the buffer reaches PROGRESS_EVENT_BATCH_SIZE. A crash loses
+at most the unflushed buffer.
+"""
+import atexit
+import logging
+import threading
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CourseActivity, EventConsumerOffset, ProgressEvent
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pending = []
+
+# CourseActivity column each event kind increments
+_ACTIVITY_COLUMNS = {
+    ProgressEvent.Kind.ASSIGNED: "assigned",
+    ProgressEvent.Kind.CHAPTER_COMPLETED: "chapters_completed",
+    ProgressEvent.Kind.CERTIFICATE_ISSUED: "certificates_issued",
+}
+
+COURSE_ACTIVITY = "course_activity"
+
+
+def record_event(kind, student_id, course_id, chapter_id=None, occurred_at=None):
+    record_events([
+        ProgressEvent(
+            kind=kind,
+            student_id=student_id,
+            course_id=course_id,
+            chapter_id=chapter_id,
+            occurred_at=occurred_at or timezone.now()
+        )
+    ])
+
+
+def record_events(events):
+    """
+    Queues unsaved ProgressEvents for the next flush once the current
+    transaction commits (right away outside a transaction).
+    """
+    if events:
+        transaction.on_commit(partial(_buffer, list(events)))
+
+
+def _buffer(events):
+    with _lock:
+        _pending.extend(events)
+        full = len(_pending) >= settings.PROGRESS_EVENT_BATCH_SIZE
+    if full:
+        flush_events_quietly()
+
+
+def flush_events():
+    """
+    Writes every buffered event; returns how many.
+    """
+    with _lock:
+        events = _pending[:]
+        del _pending[:]
+    if not events:
+        return 0
+
+    try:
+        ProgressEvent.objects.bulk_create(events, batch_size=settings.PROGRESS_EVENT_BATCH_SIZE)
+    except Exception:
+        # Kept for the next flush rather than lost
+        with _lock:
+            _pending[:0] = events
+        raise
+    return len(events)
+
+
+def flush_events_quietly():
+    # For flushes after the response is decided: a failed write is logged
+    # and retried with the next flush instead of breaking the request
+    try:
+        flush_events()
+    except Exception:
+        logger.exception("Could not write %d buffered progress event(s)", len(_pending))
+
+
+atexit.register(flush_events_quietly)
+
+
+def _activity_day(occurred_at):
+    if timezone.is_aware(occurred_at):
+        return timezone.localdate(occurred_at)
+    return occurred_at.date()
+
+
+def fold_course_activity(batch_size=1000, settle_seconds=None):
+    """
+    Folds the next `batch_size` events after the stored offset into
+    CourseActivity and advances the offset, in one transaction, so a
+    crash never counts an event twice. Returns how many were folded.
+
+    The batch ends at the first event younger than `settle_seconds`,
+    which waits for the next pass along with everything after it: two
+    concurrent flushes can commit their ids and recorded_at stamps in
+    different orders, and the offset must never move past an event that
+    is not folded yet.
+    """
+    if settle_seconds is None:
+        settle_seconds = settings.PROGRESS_EVENT_SETTLE_SECONDS
+    cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+
+    with transaction.atomic():
+        EventConsumerOffset.objects.get_or_create(name=COURSE_ACTIVITY)
+        # Serializes concurrent consumers
+        offset = EventConsumerOffset.objects.select_for_update().get(name=COURSE_ACTIVITY)
+
+        events = []
+        for event in ProgressEvent.objects.filter(
+            pk__gt=offset.position
+        ).order_by("pk").values_list("pk", "kind", "course_id", "occurred_at", "recorded_at")[:batch_size]:
+            if event[4] > cutoff:
+                break
+            events.append(event)
+        if not events:
+            return 0
+
+        counts = {}
+        for _, kind, course_id, occurred_at, _ in events:
+            key = (course_id, _activity_day(occurred_at))
+            column = _ACTIVITY_COLUMNS[kind]
+            counts.setdefault(key, dict.fromkeys(_ACTIVITY_COLUMNS.values(), 0))[column] += 1
+
+        rows = CourseActivity.objects.filter(
+            course_id__in={course_id for course_id, _ in counts},
+            day__in={day for _, day in counts}
+        )
+        existing = {(row.course_id, row.day): row for row in rows if (row.course_id, row.day) in counts}
+
+        created = []
+        for key, increments in counts.items():
+            row = existing.get(key)
+            if row is None:
+                created.append(CourseActivity(course_id=key[0], day=key[1], **increments))
+            else:
+                for column, increment in increments.items():
+                    setattr(row, column, getattr(row, column) + increment)
+
+        CourseActivity.objects.bulk_create(created)
+        CourseActivity.objects.bulk_update(list(existing.values()), list(_ACTIVITY_COLUMNS.values()))
+
+        offset.position = events[-1][0]
+        offset.save(update_fields=["position", "updated_at"])
+
+    return len(events)
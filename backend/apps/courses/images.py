@@ -0,0 +1,181 @@
+import logging
+import posixpath
+from concurrent.futures import as_completed
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from core.jobs import claim_jobs as claim_queued_jobs
+
+from .models import Chapter, ChapterImageJob, Course
+
+logger = logging.getLogger(__name__)
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def render_variants(data, widths, quality, max_pixels):
+    """
+    Returns [(width, webp bytes)] for each width smaller than the image.
+    Plain picklable values only, so it can run in a worker process pool.
+
+    Decoding is memory-bounded: oversized images are rejected from their
+    header alone, and JPEGs are decoded straight at the smallest DCT scale
+    that still covers the largest variant (draft mode). Each variant is
+    then resized from the previous, larger one.
+    """
+    with Image.open(BytesIO(data)) as image:
+        width, height = image.size
+        if width * height > max_pixels:
+            raise ValueError(f"Image is {width}x{height}; the limit is {max_pixels} pixels")
+        if image.getexif().get(0x0112) in _TRANSPOSED_ORIENTATIONS:
+            width, height = height, width
+
+        targets = sorted((w for w in set(widths) if w < width), reverse=True)
+        if not targets:
+            return []
+
+        image.draft("RGB", (targets[0], targets[0]))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        variants = []
+        for target in targets:
+            if image.width > target:
+                image = image.resize(
+                    (target, max(1, round(image.height * target / image.width))),
+                    Image.LANCZOS,
+                    reducing_gap=3.0
+                )
+            buffer = BytesIO()
+            image.save(buffer, "WEBP", quality=quality, method=4)
+            variants.append((target, buffer.getvalue()))
+        return variants
+
+
+def enqueue_image_variants(chapter):
+    """
+    Queues variant generation for the chapter's current image (replacing
+    any earlier job). Returns the job, or None when there is no image.
+    """
+    if not chapter.image:
+        return None
+
+    job, _ = ChapterImageJob.objects.update_or_create(
+        chapter=chapter,
+        defaults={
+            "source": chapter.image.name,
+            "status": ChapterImageJob.Status.PENDING,
+            "attempts": 0,
+            "error": "",
+        }
+    )
+    return job
+
+
+def enqueue_missing_variants():
+    """
+    Queues every chapter that has an image but no variants or job yet
+    (images uploaded before the pipeline existed).
+    """
+    chapters = Chapter.objects.exclude(image="").exclude(image__isnull=True).filter(
+        image_variants={},
+        image_job__isnull=True
+    ).only("pk", "image")
+    return sum(1 for chapter in chapters.iterator() if enqueue_image_variants(chapter))
+
+
+def claim_jobs(limit):
+    """
+    Moves up to `limit` pending jobs to RUNNING and returns them.
+    """
+    return claim_queued_jobs(ChapterImageJob.objects.select_related("chapter"), limit)
+
+
+def process_jobs(jobs, pool):
+    """
+    Generates the claimed jobs' variants on `pool` (a concurrent.futures
+    executor), stores them next to the original and records them on the
+    chapter. Failed jobs are retried up to CHAPTER_IMAGE_JOB_MAX_ATTEMPTS
+    times before they are marked FAILED.
+    """
+    futures = {}
+    for job in jobs:
+        try:
+            with job.chapter.image.storage.open(job.source, "rb") as f:
+                data = f.read()
+        except Exception as e:
+            _finish(job, e)
+            continue
+        futures[pool.submit(
+            render_variants,
+            data,
+            settings.CHAPTER_IMAGE_WIDTHS,
+            settings.CHAPTER_IMAGE_WEBP_QUALITY,
+            settings.CHAPTER_IMAGE_MAX_PIXELS
+        )] = job
+
+    for future in as_completed(futures):
+        job = futures[future]
+        try:
+            _store_variants(job, future.result())
+            _finish(job)
+        except Exception as e:
+            _finish(job, e)
+
+    return len(jobs)
+
+
+def _store_variants(job, variants):
+    chapter = job.chapter
+    storage = chapter.image.storage
+    stem = posixpath.splitext(posixpath.basename(job.source))[0]
+
+    names = {
+        str(width): storage.save(
+            f"chapters/variants/{chapter.pk}/{stem}-{width}.webp",
+            ContentFile(data)
+        )
+        for width, data in variants
+    }
+
+    with transaction.atomic():
+        # The image may have been replaced while this job was running
+        current = Chapter.objects.select_for_update().filter(
+            pk=chapter.pk,
+            image=job.source
+        ).values_list("image_variants", flat=True).first()
+
+        if current is None:
+            obsolete = names.values()
+        else:
+            Chapter.objects.filter(pk=chapter.pk).update(image_variants=names)
+            # Chapter payloads changed: invalidates conditional GETs
+            Course.objects.filter(pk=chapter.course_id).update(updated_at=timezone.now())
+            obsolete = set(current.values()) - set(names.values())
+
+    for name in obsolete:
+        storage.delete(name)
+
+
+def _finish(job, error=None):
+    if error is None:
+        status, message = ChapterImageJob.Status.DONE, ""
+    else:
+        logger.error("Chapter image job %s failed: %s", job.pk, error)
+        message = str(error)
+        status = job.retry_status(settings.CHAPTER_IMAGE_JOB_MAX_ATTEMPTS)
+
+    # Conditional on the source: a re-upload re-queued the job meanwhile
+    ChapterImageJob.objects.filter(pk=job.pk, source=job.source).update(
+        status=status,
+        error=message,
+        updated_at=timezone.now()
+    )
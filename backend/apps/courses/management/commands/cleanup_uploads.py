@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.courses.uploads import cleanup_abandoned_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete chunked chapter uploads that were never finalized, together "
+        "with their partial files (run periodically, e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age-hours",
+            type=float,
+            default=None,
+            help="Idle time before an upload counts as abandoned "
+                 "(default: CHAPTER_UPLOAD_EXPIRY_HOURS).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        max_age = options["max_age_hours"]
+        uploads, orphans = cleanup_abandoned_uploads(
+            max_age=timedelta(hours=max_age) if max_age is not None else None,
+            dry_run=options["dry_run"],
+        )
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {uploads} abandoned upload(s) and {orphans} orphaned partial file(s)."
+        ))
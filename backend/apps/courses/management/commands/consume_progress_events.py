@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.courses.events import fold_course_activity
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the ProgressEvent log into the daily CourseActivity counts, "
+        "continuing from the stored offset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Events folded per transaction.",
+        )
+        parser.add_argument(
+            "--settle-seconds",
+            type=float,
+            default=settings.PROGRESS_EVENT_SETTLE_SECONDS,
+            help="Leave events younger than this for the next pass.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep when no new events are ready.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Fold the events that are ready and exit instead of polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+
+        folded = 0
+        try:
+            while True:
+                close_old_connections()
+
+                count = fold_course_activity(batch_size, options["settle_seconds"])
+                folded += count
+                if count:
+                    continue
+
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"Folded {folded} progress event(s)"))
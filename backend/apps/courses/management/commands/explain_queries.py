@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.courses.models import Chapter, ChapterProgress, Course, CourseAssignment
+from apps.courses.serializers import ChapterSerializer, CourseSerializer
+from apps.courses.utils import chapter_completion_state, enrolled_courses_aggregates, progress_assignments
+from apps.users.serializers import UserSerializer
+from core.pagination import EnvelopeCursorPagination
+from core.serializers import ValuesSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the database plan (EXPLAIN) for the queries behind the hot "
+        "course, progress and user endpoints, using sample rows from the "
+        "current database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--student", type=int, help="Student id to use (default: first student).")
+        parser.add_argument("--mentor", type=int, help="Mentor id to use (default: first mentor).")
+        parser.add_argument("--course", type=int, help="Course id to use (default: first course).")
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run EXPLAIN ANALYZE (PostgreSQL only); executes the queries.",
+        )
+
+    def handle(self, *args, **options):
+        student = self._sample(User.objects.filter(role=User.Role.STUDENT), options["student"], "student")
+        mentor = self._sample(User.objects.filter(role=User.Role.MENTOR), options["mentor"], "mentor")
+        course = self._sample(Course.objects.all(), options["course"], "course")
+        chapter = Chapter.objects.filter(course=course).order_by("-sequence_number").first()
+
+        explain_options = {}
+        if options["analyze"]:
+            if connection.vendor != "postgresql":
+                raise CommandError("--analyze is only supported on PostgreSQL.")
+            explain_options = {"analyze": True, "buffers": True}
+
+        page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
+
+        def first_page(queryset):
+            # What EnvelopeCursorPagination fetches for the first page
+            return queryset.order_by(EnvelopeCursorPagination.ordering)[:page_size + 1]
+
+        # The listings' ValuesSerializer: the page of .values() rows, then
+        # one query for the nested chapters of the page
+        courses = ValuesSerializer(CourseSerializer)
+        users = ValuesSerializer(UserSerializer)
+
+        def course_listing(label, queryset):
+            page = first_page(courses.values(queryset))
+            return [
+                (label, page),
+                (f"{label} (chapters)", courses.nested_querysets(list(page))["chapters"]),
+            ]
+
+        queries = [
+            *course_listing("GET /api/courses/", Course.objects.all()),
+            *course_listing("GET /api/courses/my/", Course.objects.filter(mentor=mentor)),
+            # aggregate() runs immediately, so explain the same aggregates
+            # grouped by the (single) student
+            ("GET /api/courses/enrolled/ (ETag validator)",
+                CourseAssignment.objects.filter(student_id=student.pk).values("student_id").annotate(
+                    **enrolled_courses_aggregates()
+                )),
+            *course_listing("GET /api/courses/enrolled/", Course.objects.filter(courseassignment__student=student)),
+            ("Enrollment set (cache fill)",
+                CourseAssignment.objects.filter(student_id=student.pk).values_list("course_id", flat=True)),
+            ("GET /api/courses/<id>/chapters/",
+                ValuesSerializer(ChapterSerializer).values(
+                    Chapter.objects.filter(course=course).order_by("sequence_number")
+                )),
+            ("GET /api/progress/my/", progress_assignments(student)),
+            ("GET /api/certificates/<course_id>/",
+                CourseAssignment.objects.select_related("course").filter(student=student, course=course)),
+            ("GET /api/users/", first_page(users.values(User.objects.all()))),
+            ("GET /api/users/students/", first_page(users.values(User.objects.filter(role=User.Role.STUDENT)))),
+        ]
+
+        if chapter is not None:
+            queries.insert(9, (
+                "POST /api/progress/<chapter_id>/complete/",
+                chapter_completion_state(student).only("pk", "course_id", "sequence_number").filter(pk=chapter.pk),
+            ))
+            queries.insert(10, (
+                "POST /api/progress/<chapter_id>/complete/ (progress row)",
+                ChapterProgress.objects.filter(student=student, chapter=chapter),
+            ))
+
+        for label, queryset in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write("")
+
+    def _sample(self, queryset, pk, label):
+        obj = queryset.filter(pk=pk).first() if pk else queryset.order_by("pk").first()
+        if obj is None:
+            raise CommandError(f"No {label} found; pass --{label} or seed some data first.")
+        return obj
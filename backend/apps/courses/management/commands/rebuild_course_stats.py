@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.courses.utils import refresh_course_counters, refresh_course_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the CourseStats / ChapterStats analytics rollups from "
+        "assignments and ChapterProgress (backfill or drift repair)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            type=int,
+            action="append",
+            dest="course_ids",
+            help="Only rebuild this course (may be given several times).",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Course completions are derived from the progress counters
+            refresh_course_counters(course_ids=options["course_ids"])
+            rows = refresh_course_stats(course_ids=options["course_ids"])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} analytics row(s)."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.courses.utils import refresh_course_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Course.chapter_count and CourseAssignment progress counters "
+        "from chapters and ChapterProgress, fixing any rows that have drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            type=int,
+            action="append",
+            dest="course_ids",
+            help="Only repair this course (may be given several times).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted rows without writing.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            courses_fixed, assignments_fixed = refresh_course_counters(
+                course_ids=options["course_ids"],
+                dry_run=options["dry_run"],
+            )
+
+        verb = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {courses_fixed} course(s) and {assignments_fixed} assignment(s) "
+            f"with stale counters."
+        ))
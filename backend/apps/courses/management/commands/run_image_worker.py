@@ -0,0 +1,36 @@
+from django.conf import settings
+
+from apps.courses.images import claim_jobs, enqueue_missing_variants, process_jobs
+from apps.courses.models import ChapterImageJob
+from core.jobs import JobWorkerCommand
+
+
+class Command(JobWorkerCommand):
+    help = (
+        "Generate resized WebP variants of uploaded chapter images on a local "
+        "process pool. The queue lives in the database, so no external broker is needed."
+    )
+    model = ChapterImageJob
+    stale_seconds = settings.CHAPTER_IMAGE_JOB_STALE_SECONDS
+    worker_name = "Image worker"
+    job_name = "chapter image job"
+    pool_purpose = "resizing"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--enqueue-missing",
+            action="store_true",
+            help="First queue chapters whose image has no variants yet (backfill).",
+        )
+
+    def claim(self, limit):
+        return claim_jobs(limit)
+
+    def process(self, jobs, pool):
+        return process_jobs(jobs, pool)
+
+    def handle(self, *args, **options):
+        if options["enqueue_missing"]:
+            self.stdout.write(f"Queued {enqueue_missing_variants()} chapter image(s)")
+        super().handle(*args, **options)
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.11 on 2026-10-17 14:39
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Course = apps.get_model("courses", "Course")
+    Chapter = apps.get_model("courses", "Chapter")
+    CourseAssignment = apps.get_model("courses", "CourseAssignment")
+    ChapterProgress = apps.get_model("courses", "ChapterProgress")
+
+    Course.objects.update(
+        chapter_count=Coalesce(
+            Subquery(
+                Chapter.objects.filter(course=OuterRef("pk"))
+                .values("course")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0
+        )
+    )
+
+    completed = ChapterProgress.objects.filter(
+        student=OuterRef("student"),
+        chapter__course=OuterRef("course"),
+        completed=True
+    ).values("student")
+    CourseAssignment.objects.update(
+        completed_chapters=Coalesce(
+            Subquery(completed.annotate(total=Count("pk")).values("total")),
+            0
+        ),
+        last_completed_sequence=Subquery(
+            completed.annotate(last=Max("chapter__sequence_number")).values("last")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_alter_chapter_sequence_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='chapter_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='courseassignment',
+            name='completed_chapters',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='courseassignment',
+            name='last_completed_sequence',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-17 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chapterprogress',
+            index=models.Index(condition=models.Q(('completed', True)), fields=['student', 'chapter'], name='progress_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='courseassignment',
+            index=models.Index(fields=['student', 'course'], name='assignment_student_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.11 on 2026-10-17 15:01
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+import django.db.models.deletion
+
+
+def backfill_stats(apps, schema_editor):
+    Course = apps.get_model("courses", "Course")
+    Chapter = apps.get_model("courses", "Chapter")
+    CourseAssignment = apps.get_model("courses", "CourseAssignment")
+    CourseStats = apps.get_model("courses", "CourseStats")
+    ChapterStats = apps.get_model("courses", "ChapterStats")
+
+    enrolled = dict(
+        CourseAssignment.objects.values("course").annotate(total=Count("pk")).values_list("course", "total")
+    )
+    finished = dict(
+        CourseAssignment.objects.filter(
+            course__chapter_count__gt=0,
+            completed_chapters__gte=F("course__chapter_count")
+        ).values("course").annotate(total=Count("pk")).values_list("course", "total")
+    )
+    CourseStats.objects.bulk_create([
+        CourseStats(course_id=pk, enrolled=enrolled.get(pk, 0), completed=finished.get(pk, 0))
+        for pk in Course.objects.values_list("pk", flat=True).iterator()
+    ], batch_size=1000)
+
+    chapter_stats = []
+    previous_course, reached = None, 0
+    for pk, course_id, completed in Chapter.objects.annotate(
+        completed=Count("chapterprogress", filter=Q(chapterprogress__completed=True))
+    ).order_by("course", "sequence_number").values_list("pk", "course_id", "completed").iterator():
+        if course_id != previous_course:
+            previous_course, reached = course_id, enrolled.get(course_id, 0)
+        chapter_stats.append(
+            ChapterStats(chapter_id=pk, course_id=course_id, reached=reached, completed=completed)
+        )
+        reached = completed
+    ChapterStats.objects.bulk_create(chapter_stats, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='courses.course')),
+                ('enrolled', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChapterStats',
+            fields=[
+                ('chapter', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='courses.chapter')),
+                ('reached', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chapter_stats', to='courses.course')),
+            ],
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
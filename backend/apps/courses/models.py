@@ -1,7 +1,11 @@
+import uuid
+
 from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+from core.jobs import QueueJob
+
 User = settings.AUTH_USER_MODEL
 
 
@@ -16,6 +20,9 @@ class Course(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized; maintained on chapter create/delete
+    chapter_count = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return self.title
 
@@ -33,6 +40,10 @@ class Chapter(models.Model):
     video_url = models.URLField(null=False)
     sequence_number = models.PositiveIntegerField(null=False)
 
+    # Width (as a string) -> storage name of a resized WebP copy of `image`;
+    # filled in by `run_image_worker`
+    image_variants = models.JSONField(default=dict, blank=True)
+
     class Meta:
         unique_together = ("course", "sequence_number")
         ordering = ["course", "sequence_number"]
@@ -50,8 +61,17 @@ class CourseAssignment(models.Model):
     )
     assigned_at = models.DateTimeField(default=timezone.now)
 
+    # Denormalized progress; maintained by complete_chapter
+    completed_chapters = models.PositiveIntegerField(default=0)
+    last_completed_sequence = models.PositiveIntegerField(null=True, blank=True)
+
     class Meta:
         unique_together = ("course", "student")
+        indexes = [
+            # Per-student lookups (enrollment set, my_progress); the unique
+            # index above leads with course and cannot serve them
+            models.Index(fields=["student", "course"], name="assignment_student_idx"),
+        ]
 
 
 class ChapterProgress(models.Model):
@@ -62,3 +82,154 @@ class ChapterProgress(models.Model):
 
     class Meta:
         unique_together = ("student", "chapter")
+        indexes = [
+            # Completed-progress counts and checks; partial where supported
+            models.Index(
+                fields=["student", "chapter"],
+                condition=models.Q(completed=True),
+                name="progress_completed_idx"
+            ),
+        ]
+
+
+class CourseStats(models.Model):
+    """
+    Enrollment rollup for the admin analytics; kept up to date by
+    assign_course / complete_chapter and rebuilt by `rebuild_course_stats`.
+    """
+    course = models.OneToOneField(
+        Course,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats"
+    )
+    enrolled = models.PositiveIntegerField(default=0)
+    # Students who completed every chapter
+    completed = models.PositiveIntegerField(default=0)
+
+
+class ChapterStats(models.Model):
+    """
+    Per-chapter funnel: students who unlocked the chapter (enrolled, for the
+    first chapter; completed the previous one otherwise) and who completed it.
+    """
+    chapter = models.OneToOneField(
+        Chapter,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats"
+    )
+    course = models.ForeignKey(
+        Course,
+        on_delete=models.CASCADE,
+        related_name="chapter_stats"
+    )
+    reached = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+
+
+class ChapterImageJob(QueueJob):
+    """
+    DB-backed queue entry for generating a chapter image's resized variants.
+    Picked up by the `run_image_worker` management command.
+    """
+    chapter = models.OneToOneField(Chapter, on_delete=models.CASCADE, related_name="image_job")
+    # Storage name of the image the variants are generated from
+    source = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"ChapterImageJob {self.chapter_id} ({self.get_status_display()})"
+
+
+class ChapterUpload(models.Model):
+    """
+    A resumable, chunked upload of a chapter image. Chunks are appended to
+    a partial file (see apps.courses.uploads) until `offset` reaches
+    `size`; finalizing attaches the file as Chapter.image.
+    """
+    upload_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    chapter = models.ForeignKey(Chapter, on_delete=models.CASCADE, related_name="uploads")
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="chapter_uploads")
+
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    # Bytes received so far; the next chunk must start here
+    offset = models.PositiveBigIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Abandoned-upload cleanup
+            models.Index(fields=["updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"ChapterUpload {self.upload_id} ({self.offset}/{self.size})"
+
+
+class ProgressEvent(models.Model):
+    """
+    Append-only history of learning activity. Rows are written in batches
+    through apps.courses.events.record_event and never updated; the
+    `consume_progress_events` command folds them into CourseActivity.
+    """
+    class Kind(models.IntegerChoices):
+        ASSIGNED = 1, 'Assigned'
+        CHAPTER_COMPLETED = 2, 'Chapter completed'
+        CERTIFICATE_ISSUED = 3, 'Certificate issued'
+
+    kind = models.PositiveSmallIntegerField(choices=Kind.choices)
+    # No constraints or cascades: the history outlives deleted users,
+    # courses and chapters
+    student = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    course = models.ForeignKey(Course, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    chapter = models.ForeignKey(
+        Chapter,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+
+    # When it happened (client time for synced offline completions) and
+    # when the row was written
+    occurred_at = models.DateTimeField(default=timezone.now)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"ProgressEvent {self.pk} ({self.get_kind_display()})"
+
+
+class CourseActivity(models.Model):
+    """
+    Daily per-course activity counts folded from ProgressEvent by
+    `consume_progress_events`.
+    """
+    course = models.ForeignKey(Course, on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    day = models.DateField()
+    assigned = models.PositiveIntegerField(default=0)
+    chapters_completed = models.PositiveIntegerField(default=0)
+    certificates_issued = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("course", "day")
+
+
+class EventConsumerOffset(models.Model):
+    """
+    The last ProgressEvent id a consumer has folded in.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    position = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
@@ -16,4 +16,5 @@ class IsStudent(BasePermission):
 
 class IsCourseMentor(BasePermission):
     def has_object_permission(self, request, view, obj):
-        return obj.mentor == request.user
+        return obj.mentor_id == request.user.id
+
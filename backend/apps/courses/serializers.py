@@ -1,30 +1,167 @@
+from collections import Counter
+
 from rest_framework import serializers
-from .models import Course, Chapter, CourseAssignment, ChapterProgress
+from django.conf import settings
+from django.core.validators import get_available_image_extensions
+
+from core.serializers import ModelSerializer
+
+from .models import Course, Chapter, CourseAssignment, ChapterProgress, ChapterUpload
+
+
+class ChapterListSerializer(serializers.ListSerializer):
+    """
+    Bulk chapter create: the items are validated together (sequence numbers
+    must be unique within the payload and free in the course passed as
+    context["course"]) and inserted with a single bulk_create.
+    """
+
+    def validate(self, attrs):
+        sequence_numbers = [item["sequence_number"] for item in attrs]
+        duplicates = sorted(n for n, count in Counter(sequence_numbers).items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError(
+                f"Duplicate sequence numbers in request: {duplicates}"
+            )
+
+        course = self.context.get("course")
+        if course is not None:
+            taken = sorted(
+                Chapter.objects.filter(
+                    course=course,
+                    sequence_number__in=sequence_numbers
+                ).values_list("sequence_number", flat=True)
+            )
+            if taken:
+                raise serializers.ValidationError(
+                    f"Sequence numbers already used in this course: {taken}"
+                )
+        return attrs
+
+    def create(self, validated_data):
+        return Chapter.objects.bulk_create([Chapter(**item) for item in validated_data])
 
 
-class ChapterSerializer(serializers.ModelSerializer):
+class ChapterSerializer(ModelSerializer):
+    # {"320": url, "640": url, ...}; empty until the image worker has run
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Chapter
         fields = "__all__"
         read_only_fields = ("course",)
+        list_serializer_class = ChapterListSerializer
+
+    def get_image_variants(self, chapter):
+        return self.represent_image_variants(chapter.image_variants)
+
+    def represent_image_variants(self, image_variants):
+        # Also used by ValuesSerializer on the raw column
+        storage = Chapter._meta.get_field("image").storage
+        request = self.context.get("request")
+        variants = {}
+        for width, name in sorted(image_variants.items(), key=lambda item: int(item[0])):
+            url = storage.url(name)
+            variants[width] = request.build_absolute_uri(url) if request is not None else url
+        return variants
+
+
+class ChapterReorderSerializer(serializers.Serializer):
+    """
+    Every chapter id of the course in the new order.
+    """
+    chapter_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=1000
+    )
+
+
+class ChapterUploadSerializer(ModelSerializer):
+    """
+    A resumable chapter image upload; `offset` is where the next chunk
+    must start.
+    """
+
+    class Meta:
+        model = ChapterUpload
+        fields = ["upload_id", "chapter", "filename", "size", "offset", "created_at", "updated_at"]
+        read_only_fields = ("upload_id", "offset", "created_at", "updated_at")
+
+    def validate_filename(self, value):
+        extension = value.rsplit(".", 1)[-1].lower() if "." in value else ""
+        if extension not in get_available_image_extensions():
+            raise serializers.ValidationError("Only image files can be uploaded.")
+        # Never trust client paths
+        return value.replace("\\", "/").rsplit("/", 1)[-1]
 
+    def validate_size(self, value):
+        if not 0 < value <= settings.CHAPTER_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"size must be between 1 and {settings.CHAPTER_UPLOAD_MAX_SIZE} bytes."
+            )
+        return value
 
-class CourseSerializer(serializers.ModelSerializer):
+
+class CourseSerializer(ModelSerializer):
     chapters = ChapterSerializer(many=True, read_only=True)
 
     class Meta:
         model = Course
         fields = "__all__"
-        read_only_fields = ("mentor", "created_at")
+        read_only_fields = ("mentor", "created_at", "chapter_count")
 
 
-class CourseAssignmentSerializer(serializers.ModelSerializer):
+class CourseAssignmentSerializer(ModelSerializer):
     class Meta:
         model = CourseAssignment
         fields = "__all__"
+        read_only_fields = ("completed_chapters", "last_completed_sequence")
+
+
+class BulkCourseAssignmentSerializer(serializers.Serializer):
+    """
+    Payload for assigning many students (optionally to many courses) at once.
+    """
+    student_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=5000
+    )
+    course_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=100
+    )
+
+
+class ProgressSyncItemSerializer(serializers.Serializer):
+    """
+    One queued completion: a bare chapter id or
+    {"chapter_id": ..., "completed_at": ...}.
+    """
+    chapter_id = serializers.IntegerField(min_value=1)
+    completed_at = serializers.DateTimeField(required=False)
+
+    def to_internal_value(self, data):
+        if isinstance(data, int) and not isinstance(data, bool):
+            data = {"chapter_id": data}
+        return super().to_internal_value(data)
+
+
+class ProgressSyncSerializer(serializers.Serializer):
+    """
+    Payload for replaying offline chapter completions, in the order they
+    happened: { "completions": [3, {"chapter_id": 4, "completed_at": ...}] }
+    """
+    completions = serializers.ListField(
+        child=ProgressSyncItemSerializer(),
+        allow_empty=False,
+        max_length=1000
+    )
 
 
-class ChapterProgressSerializer(serializers.ModelSerializer):
+class ChapterProgressSerializer(ModelSerializer):
     chapter_title = serializers.CharField(source='chapter.title', read_only=True)
     sequence = serializers.IntegerField(source='chapter.sequence_number', read_only=True)
 
@@ -32,7 +169,7 @@ class ChapterProgressSerializer(serializers.ModelSerializer):
         model = ChapterProgress
         fields = ['chapter', 'chapter_title', 'sequence', 'completed', 'completed_at']
 
-class CourseProgressSerializer(serializers.ModelSerializer):
+class CourseProgressSerializer(ModelSerializer):
     """
     Shows overall progress for a specific course assigned to the student.
     """
@@ -0,0 +1,59 @@
+from django.core.signals import request_finished
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .events import flush_events_quietly
+from .models import Course, Chapter, CourseAssignment, CourseStats
+from .utils import (
+    invalidate_enrollments,
+    refresh_course_counters,
+    refresh_course_stats,
+    refresh_course_stats_on_commit
+)
+
+
+def _origin_model(origin):
+    if isinstance(origin, models.Model):
+        return origin._meta.model
+    return getattr(origin, "model", None)
+
+
+@receiver(post_save, sender=Course)
+def create_course_stats(sender, instance, created, raw=False, **kwargs):
+    # Rollup row that assign_course / complete_chapter update in place
+    if created and not raw:
+        CourseStats.objects.create(course=instance)
+
+
+@receiver(post_delete, sender=Chapter)
+def refresh_counters_on_chapter_delete(sender, instance, origin=None, **kwargs):
+    """
+    Deleting a chapter changes the course's chapter count and cascades to
+    ChapterProgress, so the course's counters and analytics rollups are
+    recomputed and its version (updated_at) is bumped.
+    Cascades from a course (or user) delete are skipped: the course and its
+    assignments are going away as well.
+    """
+    if _origin_model(origin) is Chapter:
+        refresh_course_counters(course_ids=[instance.course_id])
+        refresh_course_stats(course_ids=[instance.course_id])
+        # Invalidates conditional GETs of the course and its chapters
+        Course.objects.filter(pk=instance.course_id).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=CourseAssignment)
+def invalidate_enrollments_on_assignment_delete(sender, instance, origin=None, **kwargs):
+    transaction.on_commit(lambda: invalidate_enrollments([instance.student_id]))
+
+    # Unenrolling (e.g. deleting a student) leaves the course behind, so its
+    # rollups are rebuilt once the delete has committed
+    if _origin_model(origin) is not Course:
+        refresh_course_stats_on_commit(instance.course_id)
+
+
+@receiver(request_finished)
+def flush_progress_events(sender, **kwargs):
+    # The events a request recorded go out in one bulk insert
+    flush_events_quietly()
@@ -0,0 +1,772 @@
+import threading
+from datetime import timedelta
+from unittest import mock, skipIf
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
+
+from apps.users.authentication import issue_tokens
+from core.serializers import ValuesSerializer
+
+from . import async_views, uploads
+from .events import fold_course_activity
+from .models import (
+    Chapter,
+    ChapterProgress,
+    ChapterStats,
+    ChapterUpload,
+    Course,
+    CourseActivity,
+    CourseAssignment,
+    CourseStats,
+    EventConsumerOffset,
+    ProgressEvent
+)
+from .serializers import ChapterSerializer, CourseSerializer
+from .views import ChapterViewSet, CourseViewSet, ProgressViewSet
+from .utils import get_enrolled_course_ids, refresh_course_counters, refresh_course_stats
+
+User = get_user_model()
+
+
+class FoldCourseActivityTests(TestCase):
+    def setUp(self):
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.student = User.objects.create_user(username="student", password="x", role=User.Role.STUDENT)
+        self.course = Course.objects.create(title="Course", mentor=mentor)
+
+    def add_events(self, *ages):
+        """
+        One ASSIGNED event per age (seconds since it was recorded), in pk order.
+        """
+        now = timezone.now()
+        events = ProgressEvent.objects.bulk_create([
+            ProgressEvent(kind=ProgressEvent.Kind.ASSIGNED, student=self.student, course=self.course)
+            for _ in ages
+        ])
+        for event, age in zip(events, ages):
+            ProgressEvent.objects.filter(pk=event.pk).update(recorded_at=now - timedelta(seconds=age))
+        return [event.pk for event in ProgressEvent.objects.order_by("pk")]
+
+    def assigned(self):
+        return sum(CourseActivity.objects.values_list("assigned", flat=True))
+
+    def test_unsettled_event_holds_back_later_ids(self):
+        # The lower id was recorded later (a concurrent flush): it is still
+        # settling, so the older higher id must wait with it
+        pks = self.add_events(1, 60)
+
+        self.assertEqual(fold_course_activity(settle_seconds=10), 0)
+        self.assertEqual(self.assigned(), 0)
+
+        ProgressEvent.objects.filter(pk=pks[0]).update(recorded_at=timezone.now() - timedelta(seconds=60))
+        self.assertEqual(fold_course_activity(settle_seconds=10), 2)
+        self.assertEqual(self.assigned(), 2)
+        self.assertEqual(EventConsumerOffset.objects.get().position, pks[1])
+
+    def test_batch_stops_before_unsettled_event(self):
+        pks = self.add_events(60, 1, 60)
+
+        self.assertEqual(fold_course_activity(settle_seconds=10), 1)
+        self.assertEqual(EventConsumerOffset.objects.get().position, pks[0])
+
+        ProgressEvent.objects.filter(pk=pks[1]).update(recorded_at=timezone.now() - timedelta(seconds=60))
+        self.assertEqual(fold_course_activity(settle_seconds=10), 2)
+        self.assertEqual(fold_course_activity(settle_seconds=10), 0)
+        self.assertEqual(self.assigned(), 3)
+
+
+class ProgressSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.student = User.objects.create_user(username="student", password="x", role=User.Role.STUDENT)
+        self.course = Course.objects.create(title="Course", mentor=mentor)
+        self.chapter = Chapter.objects.create(course=self.course, title="One", video_url="https://v/1", sequence_number=1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def sync(self):
+        return self.client.post("/api/progress/sync/", {"completions": [self.chapter.pk]}, format="json")
+
+    def test_unassigned_student_with_stale_enrollment_cache_is_rejected(self):
+        CourseAssignment.objects.create(course=self.course, student=self.student)
+        self.assertIn(self.course.pk, get_enrolled_course_ids(self.student.pk))
+        # The cache invalidation runs on commit, which never happens here
+        CourseAssignment.objects.filter(student=self.student).delete()
+
+        response = self.sync()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"][0]["status"], "rejected")
+        self.assertFalse(ChapterProgress.objects.exists())
+
+    def test_just_assigned_student_is_accepted_before_the_cache_expires(self):
+        self.assertEqual(get_enrolled_course_ids(self.student.pk), frozenset())
+        CourseAssignment.objects.create(course=self.course, student=self.student)
+
+        response = self.sync()
+
+        self.assertEqual(response.data["data"][0]["status"], "completed")
+        self.assertEqual(CourseAssignment.objects.get().completed_chapters, 1)
+
+
+class CompleteChapterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.student = User.objects.create_user(username="student", password="x", role=User.Role.STUDENT)
+        course = Course.objects.create(title="Course", mentor=mentor)
+        self.chapters = [
+            Chapter.objects.create(course=course, title=str(n), video_url=f"https://v/{n}", sequence_number=n)
+            for n in (1, 2)
+        ]
+        CourseAssignment.objects.create(course=course, student=self.student)
+        refresh_course_stats()
+        # Enrollment is answered from the warm cache
+        get_enrolled_course_ids(self.student.pk)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def complete(self, chapter):
+        return self.client.post(f"/api/progress/{chapter.pk}/complete/")
+
+    def test_query_count(self):
+        # One read (chapter, previous/own progress, next chapter), then the
+        # assignment counter update, progress insert and rollup update in
+        # one savepoint (SAVEPOINT / RELEASE)
+        with self.assertNumQueries(6):
+            self.assertEqual(self.complete(self.chapters[0]).status_code, 200)
+        # Already completed: the read alone
+        with self.assertNumQueries(1):
+            self.assertEqual(self.complete(self.chapters[0]).status_code, 200)
+
+    def test_previous_chapter_required(self):
+        self.assertEqual(self.complete(self.chapters[1]).status_code, 400)
+        self.assertFalse(ChapterProgress.objects.exists())
+
+    def test_assignment_locked_before_progress_is_written(self):
+        # sync locks the assignment rows before writing ChapterProgress;
+        # taking them in the opposite order here could deadlock with it
+        with CaptureQueriesContext(connection) as queries:
+            self.complete(self.chapters[0])
+        statements = [query["sql"] for query in queries.captured_queries]
+        savepoint = next(n for n, sql in enumerate(statements) if sql.startswith("SAVEPOINT"))
+        # First statement in the atomic block: the assignment counter update
+        self.assertTrue(statements[savepoint + 1].startswith('UPDATE "courses_courseassignment"'))
+
+    def test_unassigned_student_with_stale_enrollment_cache_is_rejected(self):
+        # The cache invalidation runs on commit, which never happens here
+        CourseAssignment.objects.filter(student=self.student).delete()
+
+        self.assertEqual(self.complete(self.chapters[0]).status_code, 403)
+        self.assertFalse(ChapterProgress.objects.exists())
+
+
+class CompleteChapterConcurrencyTests(TransactionTestCase):
+    threads = 8
+
+    def setUp(self):
+        cache.clear()
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.student = User.objects.create_user(username="student", password="x", role=User.Role.STUDENT)
+        self.course = Course.objects.create(title="Course", mentor=mentor)
+        self.chapter = Chapter.objects.create(course=self.course, title="One", video_url="https://v/1", sequence_number=1)
+        CourseAssignment.objects.create(course=self.course, student=self.student)
+        refresh_course_stats()
+
+    def test_parallel_duplicates_complete_once(self):
+        barrier = threading.Barrier(self.threads)
+        statuses = []
+
+        def complete():
+            client = APIClient()
+            client.force_authenticate(self.student)
+            try:
+                barrier.wait()
+                statuses.append(client.post(f"/api/progress/{self.chapter.pk}/complete/").status_code)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=complete) for _ in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(statuses, [200] * self.threads)
+        self.assertEqual(ChapterProgress.objects.filter(student=self.student, chapter=self.chapter).count(), 1)
+        self.assertEqual(CourseAssignment.objects.get(student=self.student).completed_chapters, 1)
+        self.assertEqual(ChapterStats.objects.get(chapter=self.chapter).completed, 1)
+
+
+class AssignBulkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        other = User.objects.create_user(username="other", password="x", role=User.Role.MENTOR)
+        self.students = [
+            User.objects.create_user(username=f"student{n}", password="x", role=User.Role.STUDENT)
+            for n in range(3)
+        ]
+        self.course = Course.objects.create(title="Course", mentor=self.mentor)
+        self.second = Course.objects.create(title="Second", mentor=self.mentor)
+        self.foreign = Course.objects.create(title="Foreign", mentor=other)
+        self.client = APIClient()
+        self.client.force_authenticate(self.mentor)
+
+    def assign(self, student_ids, course_ids=None):
+        data = {"student_ids": student_ids}
+        if course_ids is not None:
+            data["course_ids"] = course_ids
+        with mock.patch("apps.courses.views.record_events") as record_events:
+            response = self.client.post(f"/api/courses/{self.course.pk}/assign/", data, format="json")
+        # ASSIGNED events queued for the pairs the request reported as created
+        self.events = [
+            (event.kind, event.course_id, event.student_id)
+            for call in record_events.call_args_list
+            for event in call.args[0]
+        ]
+        return response
+
+    def pairs(self, course, *students):
+        return [{"course_id": course.pk, "student_id": student.pk} for student in students]
+
+    def test_reports_every_pair(self):
+        first, second, third = self.students
+        CourseAssignment.objects.create(course=self.course, student=first)
+
+        response = self.assign([first.pk, second.pk, self.mentor.pk, 999999])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["detail"], "1 assignments created, 1 already assigned, 2 invalid")
+        self.assertEqual(response.data["data"], {
+            "created": self.pairs(self.course, second),
+            "already_assigned": self.pairs(self.course, first),
+            "invalid": [
+                {"student_id": self.mentor.pk, "detail": "The selected user is not a Student."},
+                {"student_id": 999999, "detail": "User does not exist."}
+            ],
+            "invalid_courses": []
+        })
+        self.assertFalse(CourseAssignment.objects.filter(student=third).exists())
+        self.assertEqual(self.events, [(ProgressEvent.Kind.ASSIGNED, self.course.pk, second.pk)])
+
+    def test_only_owned_courses_are_assigned(self):
+        student = self.students[0]
+
+        response = self.assign([student.pk], [self.second.pk, self.foreign.pk])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.data["data"]["created"],
+            self.pairs(self.course, student) + self.pairs(self.second, student)
+        )
+        self.assertEqual(
+            response.data["data"]["invalid_courses"],
+            [{"course_id": self.foreign.pk, "detail": "You are not the mentor of this course."}]
+        )
+        self.assertFalse(CourseAssignment.objects.filter(course=self.foreign).exists())
+
+    def test_nothing_created_is_200(self):
+        student = self.students[0]
+        CourseAssignment.objects.create(course=self.course, student=student)
+
+        response = self.assign([student.pk])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["created"], [])
+        self.assertEqual(self.events, [])
+
+    def test_pair_inserted_concurrently_is_not_created(self):
+        first, second, _ = self.students
+        bulk_create = CourseAssignment.objects.bulk_create
+
+        def concurrent_insert(objs, **kwargs):
+            # Another request commits the first pair between the read of the
+            # existing pairs and this insert
+            CourseAssignment.objects.create(course=self.course, student=first)
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(CourseAssignment.objects, "bulk_create", concurrent_insert):
+            response = self.assign([first.pk, second.pk])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["data"]["created"], self.pairs(self.course, second))
+        self.assertEqual(response.data["data"]["already_assigned"], self.pairs(self.course, first))
+        self.assertEqual(self.events, [(ProgressEvent.Kind.ASSIGNED, self.course.pk, second.pk)])
+
+
+class CourseListQueryTests(TestCase):
+    """
+    The course listings cost the same number of queries for 1 course as
+    for many (no per-course chapter or mentor lookups).
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(username="admin", password="x", role=User.Role.ADMIN)
+        self.mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.student = User.objects.create_user(username="student", password="x", role=User.Role.STUDENT)
+
+    def add_courses(self, count):
+        for _ in range(count):
+            course = Course.objects.create(title="Course", mentor=self.mentor)
+            for n in (1, 2):
+                Chapter.objects.create(course=course, title=str(n), video_url=f"https://v/{n}", sequence_number=n)
+            CourseAssignment.objects.create(course=course, student=self.student)
+
+    def assert_queries(self, user, path, queries):
+        client = APIClient()
+        client.force_authenticate(user)
+        for count, total in ((1, 1), (4, 5)):
+            self.add_courses(count)
+            cache.clear()
+            with self.subTest(courses=total), self.assertNumQueries(queries):
+                response = client.get(path)
+            self.assertEqual(len(response.data["data"]), total)
+            self.assertEqual(len(response.data["data"][0]["chapters"]), 2)
+
+    def test_list(self):
+        # Page of courses + their chapters
+        self.assert_queries(self.admin, "/api/courses/", 2)
+
+    def test_my_courses(self):
+        self.assert_queries(self.mentor, "/api/courses/my/", 2)
+
+    def test_enrolled_courses(self):
+        # Version aggregate, then the page and its chapters
+        self.assert_queries(self.student, "/api/courses/enrolled/", 3)
+
+
+class CourseListFieldsTests(TestCase):
+    """
+    ?fields= / ?include= / ?chapter_fields= narrow the course listings,
+    and chapters left out are not queried.
+    """
+
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_user(username="admin", password="x", role=User.Role.ADMIN)
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        course = Course.objects.create(title="Course", mentor=mentor)
+        for n in (1, 2):
+            Chapter.objects.create(course=course, title=str(n), video_url=f"https://v/{n}", sequence_number=n)
+        self.course_keys = set(CourseSerializer(course).data) - {"chapters"}
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def get(self, query, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(f"/api/courses/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.data["data"][0]
+
+    def test_fields_skip_chapters(self):
+        # The page alone
+        course = self.get("fields=id,title", 1)
+        self.assertEqual(set(course), {"id", "title"})
+
+    def test_include_chapters(self):
+        course = self.get("include=chapters", 2)
+        self.assertEqual(set(course), self.course_keys | {"chapters"})
+        self.assertEqual(len(course["chapters"]), 2)
+
+        course = self.get("fields=id&include=chapters", 2)
+        self.assertEqual(set(course), {"id", "chapters"})
+
+    def test_chapter_fields_imply_chapters(self):
+        course = self.get("fields=id&chapter_fields=id,title", 2)
+        self.assertEqual(set(course), {"id", "chapters"})
+        self.assertEqual([set(chapter) for chapter in course["chapters"]], [{"id", "title"}] * 2)
+        self.assertEqual([chapter["title"] for chapter in course["chapters"]], ["1", "2"])
+
+    def test_unknown_names_are_rejected(self):
+        for param, value in (("fields", "id,nope"), ("include", "mentor"), ("chapter_fields", "nope")):
+            with self.subTest(param=param):
+                response = self.client.get("/api/courses/", {param: value})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data["detail"], f"Unknown {param}: {value.split(',')[-1]}")
+
+
+class EnrolledCoursesETagTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.student = User.objects.create_user(username="student", password="x", role=User.Role.STUDENT)
+        self.courses = [Course.objects.create(title=str(n), mentor=mentor) for n in (1, 2)]
+        CourseAssignment.objects.create(course=self.courses[0], student=self.student)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def get(self, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get("/api/courses/enrolled/", **headers)
+
+    def test_unchanged_listing_is_not_modified(self):
+        etag = self.get()["ETag"]
+        self.assertEqual(self.get(etag).status_code, 304)
+
+    def test_enrollment_change_with_stale_cache_changes_etag(self):
+        etag = self.get()["ETag"]
+        get_enrolled_course_ids(self.student.pk)
+        # Neither invalidation runs (no commit): the cached set is stale
+        CourseAssignment.objects.create(course=self.courses[1], student=self.student)
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["data"]), 2)
+
+        etag = response["ETag"]
+        CourseAssignment.objects.filter(course=self.courses[1]).delete()
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["data"]), 1)
+
+
+class ProgressMatrixTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.course = Course.objects.create(title="Course", mentor=self.mentor, chapter_count=70)
+        # More than one 63-bit word, created out of sequence order
+        self.chapters = sorted(
+            Chapter.objects.bulk_create([
+                Chapter(course=self.course, title=str(n), video_url=f"https://v/{n}", sequence_number=n * 10)
+                for n in reversed(range(1, 71))
+            ]),
+            key=lambda chapter: chapter.sequence_number
+        )
+        self.students = [
+            User.objects.create_user(username=f"student{n}", password="x", role=User.Role.STUDENT)
+            for n in range(3)
+        ]
+        completed = {0: [0, 1, 64], 1: [], 2: [62, 63]}
+        for n, positions in completed.items():
+            CourseAssignment.objects.create(
+                course=self.course,
+                student=self.students[n],
+                completed_chapters=len(positions),
+                last_completed_sequence=self.chapters[positions[-1]].sequence_number if positions else None
+            )
+            ChapterProgress.objects.bulk_create([
+                ChapterProgress(student=self.students[n], chapter=self.chapters[i], completed=True)
+                for i in positions
+            ])
+        # Started, not completed: no bit
+        ChapterProgress.objects.create(student=self.students[1], chapter=self.chapters[0])
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.mentor)
+
+    def get(self, query=""):
+        return self.client.get(f"/api/courses/{self.course.pk}/progress-matrix/{query}")
+
+    def test_sequence_encoding(self):
+        with self.assertNumQueries(2):
+            response = self.get("?names=true")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"], {
+            "course_id": self.course.pk,
+            "total_chapters": 70,
+            "encoding": "sequence",
+            "student_ids": [student.pk for student in self.students],
+            "usernames": ["student0", "student1", "student2"],
+            "completed": [3, 0, 2],
+            "last_sequence": [650, None, 640],
+        })
+
+    def test_bitmap_encoding(self):
+        # Course, assignments, chapter ids, one grouped bitmap query
+        with self.assertNumQueries(4):
+            response = self.get("?encoding=bitmap")
+
+        data = response.data["data"]
+        self.assertEqual(data["chapter_ids"], [chapter.pk for chapter in self.chapters])
+        self.assertEqual(data["student_ids"], [student.pk for student in self.students])
+        self.assertEqual(data["bitmaps"], [
+            format(1 << 0 | 1 << 1 | 1 << 64, "x"),
+            "0",
+            format(1 << 62 | 1 << 63, "x"),
+        ])
+        self.assertNotIn("usernames", data)
+
+    def test_unknown_encoding(self):
+        self.assertEqual(self.get("?encoding=csv").status_code, 400)
+
+    def test_other_mentor_is_forbidden(self):
+        other = User.objects.create_user(username="other", password="x", role=User.Role.MENTOR)
+        self.client.force_authenticate(other)
+        self.assertEqual(self.get().status_code, 403)
+
+
+class ChapterStatsMaintenanceTests(TestCase):
+    """
+    Chapter creates, reorders and unassignments leave the same rollups as
+    a full refresh_course_stats.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.course = Course.objects.create(title="Course", mentor=self.mentor)
+        self.chapters = [
+            Chapter.objects.create(course=self.course, title=str(n), video_url=f"https://v/{n}", sequence_number=n)
+            for n in (10, 20, 30)
+        ]
+        Course.objects.filter(pk=self.course.pk).update(chapter_count=3)
+        # Students at 0, 1, 2 and 3 (all) completed chapters
+        self.students = []
+        for done in range(4):
+            student = User.objects.create_user(username=f"student{done}", password="x", role=User.Role.STUDENT)
+            CourseAssignment.objects.create(course=self.course, student=student)
+            client = APIClient()
+            client.force_authenticate(student)
+            for chapter in self.chapters[:done]:
+                client.post(f"/api/progress/{chapter.pk}/complete/")
+            self.students.append(student)
+        refresh_course_stats()
+        self.client = APIClient()
+        self.client.force_authenticate(self.mentor)
+
+    def rollups(self):
+        return (
+            sorted(ChapterStats.objects.values_list("chapter_id", "reached", "completed")),
+            list(CourseStats.objects.values_list("course_id", "enrolled", "completed"))
+        )
+
+    def assert_rollups_fresh(self):
+        # No drifted counters (chapter_count, last_completed_sequence, ...)
+        self.assertEqual(refresh_course_counters(dry_run=True), (0, 0))
+        maintained = self.rollups()
+        refresh_course_stats()
+        self.assertEqual(maintained, self.rollups())
+
+    def chapter_payload(self, sequence_number):
+        return {"title": str(sequence_number), "video_url": "https://video.example.com/new", "sequence_number": sequence_number}
+
+    def test_create_chapter_between_others(self):
+        response = self.client.post(f"/api/courses/{self.course.pk}/chapters/", self.chapter_payload(15), format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assert_rollups_fresh()
+
+    def test_bulk_create_first_and_last_chapters(self):
+        response = self.client.post(
+            f"/api/courses/{self.course.pk}/chapters/",
+            [self.chapter_payload(5), self.chapter_payload(40)],
+            format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assert_rollups_fresh()
+
+    def test_reorder(self):
+        chapter_ids = [chapter.pk for chapter in reversed(self.chapters)]
+        response = self.client.post(
+            f"/api/courses/{self.course.pk}/chapters/reorder/",
+            {"chapter_ids": chapter_ids},
+            format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assert_rollups_fresh()
+
+    def test_unassignments_refresh_each_course_once(self):
+        with mock.patch("apps.courses.utils.refresh_course_stats", wraps=refresh_course_stats) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                CourseAssignment.objects.filter(student__in=self.students[:3]).delete()
+
+        refresh.assert_called_once_with(course_ids={self.course.pk})
+        self.assertEqual(CourseStats.objects.get().enrolled, 1)
+        self.assert_rollups_fresh()
+
+
+class ChapterUploadChunkTests(TestCase):
+    def setUp(self):
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        course = Course.objects.create(title="Course", mentor=mentor)
+        chapter = Chapter.objects.create(course=course, title="One", video_url="https://v/1", sequence_number=1)
+        self.client = APIClient()
+        self.client.force_authenticate(mentor)
+        response = self.client.post(
+            "/api/chapter-uploads/",
+            {"chapter": chapter.pk, "filename": "cover.png", "size": 4},
+            format="json"
+        )
+        self.url = f"/api/chapter-uploads/{response.data['data']['upload_id']}/chunk/"
+
+    def put_chunk(self, body, content_range):
+        return self.client.generic(
+            "PUT", self.url, body,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=content_range
+        )
+
+    def test_chunk_advances_offset(self):
+        response = self.put_chunk(b"ab", "bytes 0-1/4")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["data"]["offset"], 2)
+
+    def test_empty_body_is_rejected(self):
+        response = self.put_chunk(b"", "bytes 0-1/4")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["detail"], "The chunk body is empty")
+
+    def test_chunk_is_written_outside_a_transaction(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.put_chunk(b"ab", "bytes 0-1/4").status_code, 200)
+        self.assertFalse([query for query in queries if "SAVEPOINT" in query["sql"]])
+
+    def test_chunk_not_at_offset_is_a_conflict(self):
+        self.put_chunk(b"ab", "bytes 0-1/4")
+        response = self.put_chunk(b"ab", "bytes 0-1/4")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["data"]["offset"], 2)
+
+    def test_offset_moved_during_the_write_is_a_conflict(self):
+        def concurrent_write(f, stream, start, length):
+            ChapterUpload.objects.update(offset=2)
+            return start + length
+
+        with mock.patch("apps.courses.views.write_chunk", concurrent_write):
+            response = self.put_chunk(b"ab", "bytes 0-1/4")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["data"]["offset"], 2)
+
+    @skipIf(uploads.fcntl is None, "no advisory file locks")
+    def test_chunk_being_written_is_a_conflict(self):
+        with uploads.open_partial(ChapterUpload.objects.get()):
+            response = self.put_chunk(b"ab", "bytes 0-1/4")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(ChapterUpload.objects.get().offset, 0)
+
+
+class AsyncReadViewTests(TestCase):
+    """
+    The async read views answer exactly like their DRF views: same status,
+    headers and bytes, errors included.
+    """
+
+    views = {
+        "enrolled": (async_views.enrolled_courses, CourseViewSet.as_view({"get": "enrolled_courses"})),
+        "chapters": (async_views.chapter_list, ChapterViewSet.as_view({"get": "list", "post": "create"})),
+        "progress": (async_views.my_progress, ProgressViewSet.as_view({"get": "my_progress"})),
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        self.student = User.objects.create_user(username="student", password="x", role=User.Role.STUDENT)
+        self.courses = [Course.objects.create(title=str(n), mentor=self.mentor) for n in range(3)]
+        for course in self.courses:
+            for n in (1, 2):
+                Chapter.objects.create(course=course, title=str(n), video_url=f"https://v/{n}", sequence_number=n)
+            CourseAssignment.objects.create(course=course, student=self.student)
+        self.factory = APIRequestFactory()
+
+    def token(self, user):
+        return str(issue_tokens(user).access_token)
+
+    def assert_same_response(self, name, path, user=None, **kwargs):
+        async_view, drf_view = self.views[name]
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {self.token(user)}"} if user else {}
+        headers.update(kwargs.pop("headers", {}))
+
+        sync_response = drf_view(self.factory.get(path, **headers), **kwargs)
+        async_response = async_to_sync(async_view)(self.factory.get(path, **headers), **kwargs)
+        for response in (sync_response, async_response):
+            if hasattr(response, "render"):
+                response.render()
+
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+        self.assertEqual(dict(async_response.items()), dict(sync_response.items()))
+        return sync_response
+
+    def test_enrolled_courses_pages(self):
+        response = self.assert_same_response("enrolled", "/api/courses/enrolled/?page_size=2", self.student)
+        self.assertEqual(response.status_code, 200)
+        self.assert_same_response("enrolled", response.data["next"], self.student)
+        self.assert_same_response(
+            "enrolled", "/api/courses/enrolled/?page_size=2", self.student,
+            headers={"HTTP_IF_NONE_MATCH": response["ETag"]}
+        )
+
+    def test_chapter_list(self):
+        course_id = self.courses[0].pk
+        self.assert_same_response("chapters", f"/api/courses/{course_id}/chapters/", self.student, course_id=course_id)
+        self.assert_same_response("chapters", f"/api/courses/{course_id}/chapters/", self.mentor, course_id=course_id)
+
+    def test_my_progress(self):
+        self.assert_same_response("progress", "/api/progress/my/", self.student)
+
+    def test_errors(self):
+        self.assert_same_response("enrolled", "/api/courses/enrolled/")
+        self.assert_same_response("enrolled", "/api/courses/enrolled/", self.mentor)
+        self.assert_same_response(
+            "enrolled", "/api/courses/enrolled/",
+            headers={"HTTP_AUTHORIZATION": "Bearer not-a-token"}
+        )
+        self.assert_same_response("chapters", "/api/courses/0/chapters/", self.student, course_id=0)
+        other = Course.objects.create(title="Other", mentor=self.mentor)
+        self.assert_same_response("chapters", f"/api/courses/{other.pk}/chapters/", self.student, course_id=other.pk)
+
+
+class ValuesSerializerTests(TestCase):
+    """
+    ValuesSerializer output equals the DRF serializer's for the list
+    serializers it stands in for.
+    """
+
+    def setUp(self):
+        mentor = User.objects.create_user(username="mentor", password="x", role=User.Role.MENTOR)
+        courses = [
+            Course.objects.create(title="Described", description="About", mentor=mentor),
+            Course.objects.create(title="Bare", mentor=mentor),
+            Course.objects.create(title="Empty", mentor=mentor),
+        ]
+        for course in courses[:2]:
+            Chapter.objects.create(
+                course=course, title="Image", video_url="https://v/1", sequence_number=1,
+                image="chapters/images/a.png",
+                image_variants={"640": "chapters/variants/a-640.webp", "320": "chapters/variants/a-320.webp"}
+            )
+            Chapter.objects.create(
+                course=course, title="Plain", video_url="https://v/2", sequence_number=2,
+                image_url="https://img/2"
+            )
+        self.context = {"request": APIRequestFactory().get("/api/")}
+
+    def assert_same_data(self, serializer_class, queryset):
+        values = ValuesSerializer(serializer_class, context=self.context)
+        self.assertEqual(
+            values.to_representation(values.values(queryset)),
+            serializer_class(queryset, many=True, context=self.context).data
+        )
+
+    def test_course_serializer(self):
+        self.assert_same_data(CourseSerializer, Course.objects.order_by("pk"))
+
+    def test_chapter_serializer(self):
+        self.assert_same_data(ChapterSerializer, Chapter.objects.order_by("pk"))
+
+    def test_to_representation_override_is_rejected(self):
+        class Custom(ChapterSerializer):
+            def to_representation(self, instance):
+                return {}
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(Custom)
+
+    def test_method_field_override_without_represent_is_rejected(self):
+        class Custom(ChapterSerializer):
+            def get_image_variants(self, chapter):
+                return {}
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(Custom)
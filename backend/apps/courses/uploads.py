@@ -0,0 +1,141 @@
+import os
+import re
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ChapterUpload
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no advisory locks; writers rely on the conditional offset
+    # update alone
+    fcntl = None
+
+class UploadBusy(Exception):
+    """
+    Another request is writing a chunk of the same upload.
+    """
+
+
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+# Bytes copied from the request stream per read
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+def partial_path(upload):
+    """
+    Local file collecting an upload's chunks. Kept outside MEDIA_ROOT so
+    unfinished uploads are never served.
+
+    Chunks are appended in place (seek + truncate), which storage backends
+    do not offer, so CHAPTER_UPLOAD_DIR must be one directory shared by
+    every web worker: a single host, or a volume mounted on all of them.
+    """
+    return os.path.join(settings.CHAPTER_UPLOAD_DIR, f"{upload.upload_id}.part")
+
+
+def parse_content_range(header):
+    """
+    "bytes start-end/total" -> (start, end, total), or None if malformed.
+    """
+    match = CONTENT_RANGE_RE.match((header or "").strip())
+    if not match:
+        return None
+    start, end, total = map(int, match.groups())
+    if start > end:
+        return None
+    return start, end, total
+
+
+@contextmanager
+def open_partial(upload):
+    """
+    Opens the upload's partial file for writing under an exclusive
+    advisory lock, which serializes its chunk writers across workers
+    without holding a database transaction open. Raises UploadBusy when
+    another request holds the lock.
+    """
+    path = partial_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT, 0o600), "r+b") as f:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadBusy
+        yield f
+
+
+def write_chunk(f, stream, start, length):
+    """
+    Copies up to `length` bytes from `stream` into the partial file `f`
+    (see open_partial) at `start`, in small blocks so a chunk is never held
+    in memory. Returns the new offset: a dropped connection keeps whatever
+    arrived, so the client resumes from there instead of resending the
+    whole chunk.
+    """
+    written = 0
+    f.seek(start)
+    while written < length:
+        try:
+            block = stream.read(min(COPY_BUFFER_SIZE, length - written))
+        except OSError:
+            # Client went away mid-chunk
+            break
+        if not block:
+            break
+        f.write(block)
+        written += len(block)
+    # Drop anything past the new offset (left by an earlier attempt)
+    f.truncate(start + written)
+
+    return start + written
+
+
+def discard_partial(upload):
+    try:
+        os.remove(partial_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def cleanup_abandoned_uploads(max_age=None, dry_run=False):
+    """
+    Deletes unfinished uploads idle for longer than `max_age` (default:
+    CHAPTER_UPLOAD_EXPIRY_HOURS) along with their partial files, and any
+    partial file whose upload row no longer exists.
+    Returns (uploads_removed, orphan_files_removed).
+    """
+    if max_age is None:
+        max_age = timedelta(hours=settings.CHAPTER_UPLOAD_EXPIRY_HOURS)
+    cutoff = timezone.now() - max_age
+
+    expired = list(ChapterUpload.objects.filter(updated_at__lt=cutoff))
+    if not dry_run:
+        for upload in expired:
+            discard_partial(upload)
+        ChapterUpload.objects.filter(pk__in=[upload.pk for upload in expired]).delete()
+
+    orphans = 0
+    directory = settings.CHAPTER_UPLOAD_DIR
+    if os.path.isdir(directory):
+        known = {str(upload_id) for upload_id in ChapterUpload.objects.values_list("upload_id", flat=True)}
+        for name in os.listdir(directory):
+            stem, ext = os.path.splitext(name)
+            path = os.path.join(directory, name)
+            if ext != ".part" or stem in known:
+                continue
+            # Files younger than the cutoff may belong to an upload being created
+            if os.path.getmtime(path) >= cutoff.timestamp():
+                continue
+            orphans += 1
+            if not dry_run:
+                os.remove(path)
+
+    return len(expired), orphans
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CourseViewSet, ChapterViewSet, ProgressViewSet
+from .views import CourseViewSet, ChapterViewSet, ChapterUploadViewSet, ProgressViewSet
 
 router = DefaultRouter()
 router.register(r'courses', CourseViewSet, basename='course')
 router.register(r'progress', ProgressViewSet, basename='progress')
+router.register(r'chapter-uploads', ChapterUploadViewSet, basename='chapter-upload')
 
 urlpatterns = [
     # Standard Course URLs
@@ -16,4 +17,7 @@ urlpatterns = [
         'get': 'list',
         'post': 'create'
     }), name='course-chapters'),
+    path('courses/<int:course_id>/chapters/reorder/', ChapterViewSet.as_view({
+        'post': 'reorder'
+    }), name='course-chapters-reorder'),
 ]
\ No newline at end of file
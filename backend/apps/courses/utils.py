@@ -0,0 +1,618 @@
+import hashlib
+import threading
+from calendar import timegm
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.db.models import (
+    BigIntegerField, Case, Count, Exists, F, Max, OuterRef, PositiveIntegerField, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import Exact
+from rest_framework.exceptions import ParseError
+
+from core.serializers import ValuesSerializer, compile_serializer
+
+from .models import (
+    Course,
+    Chapter,
+    CourseAssignment,
+    ChapterProgress,
+    CourseStats,
+    ChapterStats
+)
+from .serializers import ChapterSerializer, CourseSerializer
+
+
+def chapter_completion_state(student):
+    """
+    Chapters annotated with what complete_chapter needs to know about
+    `student`, all answered by a single query:
+    - has_previous: a chapter with a lower sequence number exists
+    - previous_completed: the student completed that previous chapter
+    - progress_completed: this chapter's progress flag (None: no row yet)
+    - next_chapter_id: the chapter this one unlocks (None: last chapter)
+    """
+    previous_chapter = Chapter.objects.filter(
+        course=OuterRef(OuterRef("course")),
+        sequence_number__lt=OuterRef(OuterRef("sequence_number"))
+    ).order_by("-sequence_number").values("pk")[:1]
+
+    return Chapter.objects.annotate(
+        has_previous=Exists(
+            Chapter.objects.filter(
+                course=OuterRef("course"),
+                sequence_number__lt=OuterRef("sequence_number")
+            )
+        ),
+        previous_completed=Exists(
+            ChapterProgress.objects.filter(
+                student=student,
+                chapter=Subquery(previous_chapter),
+                completed=True
+            )
+        ),
+        progress_completed=Subquery(
+            ChapterProgress.objects.filter(
+                student=student,
+                chapter=OuterRef("pk")
+            ).values("completed")[:1]
+        ),
+        next_chapter_id=Subquery(
+            Chapter.objects.filter(
+                course=OuterRef("course"),
+                sequence_number__gt=OuterRef("sequence_number")
+            ).order_by("sequence_number").values("pk")[:1]
+        )
+    )
+
+
+def _enrollment_cache_key(student_id):
+    return f"enrollments:{student_id}"
+
+
+def get_enrolled_course_ids(student_id, refresh=False):
+    """
+    Returns the frozenset of course ids a student is assigned to, cached per
+    student in Django's cache framework.
+    """
+    key = _enrollment_cache_key(student_id)
+    course_ids = None if refresh else cache.get(key)
+
+    if course_ids is None:
+        course_ids = frozenset(
+            CourseAssignment.objects.filter(student_id=student_id).values_list("course_id", flat=True)
+        )
+        cache.set(key, course_ids, settings.ENROLLMENT_CACHE_TIMEOUT)
+
+    return course_ids
+
+
+def is_student_enrolled(student, course_id):
+    """
+    Enrollment check backed by the cached enrollment set. A miss reloads the
+    set once before denying, so an assignment made through another process
+    (whose invalidation did not reach this cache) is still honoured.
+    """
+    if course_id in get_enrolled_course_ids(student.id):
+        return True
+    return course_id in get_enrolled_course_ids(student.id, refresh=True)
+
+
+async def aget_enrolled_course_ids(student_id, refresh=False):
+    """
+    get_enrolled_course_ids for async views (same cache entries).
+    """
+    key = _enrollment_cache_key(student_id)
+    course_ids = None if refresh else await cache.aget(key)
+
+    if course_ids is None:
+        course_ids = frozenset([
+            course_id async for course_id in
+            CourseAssignment.objects.filter(student_id=student_id).values_list("course_id", flat=True).aiterator()
+        ])
+        await cache.aset(key, course_ids, settings.ENROLLMENT_CACHE_TIMEOUT)
+
+    return course_ids
+
+
+async def ais_student_enrolled(student, course_id):
+    if course_id in await aget_enrolled_course_ids(student.id):
+        return True
+    return course_id in await aget_enrolled_course_ids(student.id, refresh=True)
+
+
+def invalidate_enrollments(student_ids):
+    cache.delete_many([_enrollment_cache_key(student_id) for student_id in set(student_ids)])
+
+
+def _expected_chapter_count():
+    return Coalesce(
+        Subquery(
+            Chapter.objects.filter(course=OuterRef("pk"))
+            .values("course")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0
+    )
+
+
+def _completed_progress():
+    return ChapterProgress.objects.filter(
+        student=OuterRef("student"),
+        chapter__course=OuterRef("course"),
+        completed=True
+    ).values("student")
+
+
+def _expected_completed_chapters():
+    return Coalesce(
+        Subquery(
+            _completed_progress()
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0
+    )
+
+
+def _expected_last_completed_sequence():
+    return Subquery(
+        _completed_progress()
+        .annotate(last=Max("chapter__sequence_number"))
+        .values("last")
+    )
+
+
+def refresh_course_counters(course_ids=None, dry_run=False):
+    """
+    Recompute the denormalized progress counters from the source tables:
+    - Course.chapter_count
+    - CourseAssignment.completed_chapters / last_completed_sequence
+
+    Only rows that have drifted are rewritten. Pass `course_ids` to limit the
+    work to a few courses. Returns (courses_fixed, assignments_fixed).
+    """
+    courses = Course.objects.all()
+    assignments = CourseAssignment.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=course_ids)
+        assignments = assignments.filter(course_id__in=course_ids)
+
+    stale_courses = [
+        pk for pk, stored, expected in courses.annotate(
+            expected=_expected_chapter_count()
+        ).values_list("pk", "chapter_count", "expected").iterator()
+        if stored != expected
+    ]
+
+    stale_assignments = [
+        pk for pk, completed, last, expected_completed, expected_last in assignments.annotate(
+            expected_completed=_expected_completed_chapters(),
+            expected_last=_expected_last_completed_sequence()
+        ).values_list(
+            "pk",
+            "completed_chapters",
+            "last_completed_sequence",
+            "expected_completed",
+            "expected_last"
+        ).iterator()
+        if (completed, last) != (expected_completed, expected_last)
+    ]
+
+    if not dry_run:
+        if stale_courses:
+            Course.objects.filter(pk__in=stale_courses).update(
+                chapter_count=_expected_chapter_count()
+            )
+        if stale_assignments:
+            CourseAssignment.objects.filter(pk__in=stale_assignments).update(
+                completed_chapters=_expected_completed_chapters(),
+                last_completed_sequence=_expected_last_completed_sequence()
+            )
+
+    return len(stale_courses), len(stale_assignments)
+
+
+def refresh_course_stats(course_ids=None):
+    """
+    Rebuild the CourseStats / ChapterStats rollups from the source tables,
+    creating missing rows. Pass `course_ids` to limit the work to a few
+    courses. Returns the number of (course, chapter) rows written.
+    """
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=course_ids)
+
+    assignments = CourseAssignment.objects.filter(course__in=courses)
+    enrolled = dict(
+        assignments.values("course").annotate(total=Count("pk")).values_list("course", "total")
+    )
+    finished = dict(
+        assignments.filter(
+            course__chapter_count__gt=0,
+            completed_chapters__gte=F("course__chapter_count")
+        ).values("course").annotate(total=Count("pk")).values_list("course", "total")
+    )
+
+    course_stats = [
+        CourseStats(course_id=pk, enrolled=enrolled.get(pk, 0), completed=finished.get(pk, 0))
+        for pk in courses.values_list("pk", flat=True).iterator()
+    ]
+
+    # Completion is sequential: a chapter is reached by everyone who
+    # completed the one before it (every enrolled student, for the first)
+    chapter_stats = []
+    previous_course, reached = None, 0
+    for pk, course_id, completed in Chapter.objects.filter(course__in=courses).annotate(
+        completed=Count("chapterprogress", filter=Q(chapterprogress__completed=True))
+    ).order_by("course", "sequence_number").values_list("pk", "course_id", "completed").iterator():
+        if course_id != previous_course:
+            previous_course, reached = course_id, enrolled.get(course_id, 0)
+        chapter_stats.append(
+            ChapterStats(chapter_id=pk, course_id=course_id, reached=reached, completed=completed)
+        )
+        reached = completed
+
+    CourseStats.objects.bulk_create(
+        course_stats,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["course"],
+        update_fields=["enrolled", "completed"]
+    )
+    ChapterStats.objects.bulk_create(
+        chapter_stats,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["chapter"],
+        update_fields=["course", "reached", "completed"]
+    )
+    return len(course_stats) + len(chapter_stats)
+
+
+_stats_refresh = threading.local()
+
+
+def refresh_course_stats_on_commit(course_id):
+    """
+    Queues refresh_course_stats for a course once the current transaction
+    commits. Every course queued before the first callback runs is rebuilt
+    by that one call, so a cascading delete that touches many assignments
+    of the same courses costs a single refresh.
+    """
+    _stats_refresh.__dict__.setdefault("course_ids", set()).add(course_id)
+    transaction.on_commit(_refresh_queued_course_stats)
+
+
+def _refresh_queued_course_stats():
+    course_ids = _stats_refresh.__dict__.pop("course_ids", None)
+    # Ids left behind by a rolled-back transaction are rebuilt as well,
+    # which is harmless
+    if course_ids:
+        refresh_course_stats(course_ids=course_ids)
+
+
+def record_new_chapters(course_id, chapter_ids):
+    """
+    Incremental rollup update for freshly created chapters, which nobody
+    has completed: each new chapter is reached by whoever completed the
+    chapter before it, the chapter after a new one is reached by nobody,
+    and nobody has finished the course any more. Matches what
+    refresh_course_stats would write, in one read and up to three writes.
+    """
+    new = set(chapter_ids)
+    stats, following_new = [], []
+    reached, previous_new = None, False
+
+    for pk, completed, enrolled in Chapter.objects.filter(course_id=course_id).order_by(
+        "sequence_number"
+    ).values_list("pk", "stats__completed", "course__stats__enrolled"):
+        if reached is None:
+            reached = enrolled or 0
+        if pk in new:
+            stats.append(ChapterStats(chapter_id=pk, course_id=course_id, reached=reached))
+            completed = 0
+        elif previous_new:
+            following_new.append(pk)
+        previous_new, reached = pk in new, completed or 0
+
+    ChapterStats.objects.bulk_create(stats)
+    if following_new:
+        ChapterStats.objects.filter(chapter_id__in=following_new).update(reached=0)
+    CourseStats.objects.filter(course_id=course_id).update(completed=0)
+
+
+def remap_chapter_order(course_id, chapter_ids):
+    """
+    Counter and rollup update after a course's chapters were reordered to
+    `chapter_ids`. Completions stay with their chapter, so only two things
+    move: each student's last_completed_sequence takes the new numbers, and
+    each chapter is now reached by whoever completed the one before it in
+    the new order (every enrolled student, for the first).
+    """
+    CourseAssignment.objects.filter(course_id=course_id, completed_chapters__gt=0).update(
+        last_completed_sequence=_expected_last_completed_sequence()
+    )
+
+    rows = list(ChapterStats.objects.filter(course_id=course_id).values_list(
+        "chapter_id", "completed", "course__stats__enrolled"
+    ))
+    if not rows:
+        return
+    completed = {pk: count for pk, count, _ in rows}
+
+    reached, previous = {}, rows[0][2] or 0
+    for pk in chapter_ids:
+        reached[pk], previous = previous, completed.get(pk, 0)
+
+    ChapterStats.objects.filter(course_id=course_id).update(reached=Case(
+        *[When(pk=pk, then=Value(count)) for pk, count in reached.items()],
+        default=F("reached"),
+        output_field=PositiveIntegerField()
+    ))
+
+
+def record_enrollments(new_enrollments):
+    """
+    Incremental rollup update for freshly created assignments;
+    `new_enrollments` maps course id -> number of students added.
+    """
+    for course_id, count in new_enrollments.items():
+        if not count:
+            continue
+        CourseStats.objects.filter(course_id=course_id).update(enrolled=F("enrolled") + count)
+        ChapterStats.objects.filter(
+            chapter=Subquery(
+                Chapter.objects.filter(course_id=course_id).order_by("sequence_number").values("pk")[:1]
+            )
+        ).update(reached=F("reached") + count)
+
+
+def record_completion(chapter_id, course_id, next_chapter_id):
+    """
+    Incremental rollup update for a newly completed chapter: it gains a
+    completion and unlocks the next chapter, or finishes the course when
+    it is the last one.
+    """
+    record_completions([(chapter_id, course_id, next_chapter_id)])
+
+
+def record_completions(completions):
+    """
+    record_completion for many (chapter_id, course_id, next_chapter_id)
+    completions by one student at once, in at most two queries.
+    """
+    completed = [chapter_id for chapter_id, _, _ in completions]
+    reached = [next_chapter_id for _, _, next_chapter_id in completions if next_chapter_id is not None]
+    finished = {course_id for _, course_id, next_chapter_id in completions if next_chapter_id is None}
+
+    if reached:
+        ChapterStats.objects.filter(chapter_id__in=completed + reached).update(
+            completed=Case(
+                When(chapter_id__in=completed, then=F("completed") + 1),
+                default=F("completed"),
+                output_field=PositiveIntegerField()
+            ),
+            reached=Case(
+                When(chapter_id__in=reached, then=F("reached") + 1),
+                default=F("reached"),
+                output_field=PositiveIntegerField()
+            )
+        )
+    elif completed:
+        ChapterStats.objects.filter(chapter_id__in=completed).update(completed=F("completed") + 1)
+
+    # A student finishes each course at most once
+    if finished:
+        CourseStats.objects.filter(course_id__in=finished).update(completed=F("completed") + 1)
+
+
+# Bits per bitmap word summed in SQL: the most a signed 64-bit integer holds
+BITMAP_WORD_BITS = 63
+
+
+def completion_bitmaps(course_id):
+    """
+    Returns (chapter ids in sequence order, {student_id: bitmap}) where bit
+    i of a student's bitmap is set when they completed the i-th chapter.
+
+    The bitmaps are aggregated per student in SQL, one grouped query over
+    the course's completed ChapterProgress rows: each chapter maps to its
+    bit in one of ceil(chapters / 63) bigint words, and a student's bits
+    are summed per word (distinct bits, so the sum is their OR).
+    """
+    chapter_ids = list(
+        Chapter.objects.filter(course_id=course_id).order_by("sequence_number").values_list("pk", flat=True)
+    )
+    if not chapter_ids:
+        return chapter_ids, {}
+
+    words = {}
+    for i, chapter_id in enumerate(chapter_ids):
+        word, bit = divmod(i, BITMAP_WORD_BITS)
+        words.setdefault(f"word{word}", []).append(When(Exact(F("chapter_id"), chapter_id), then=Value(1 << bit)))
+
+    rows = ChapterProgress.objects.filter(
+        chapter_id__in=chapter_ids,
+        completed=True
+    ).values("student_id").annotate(**{
+        name: Sum(Case(*whens, default=Value(0), output_field=BigIntegerField()))
+        for name, whens in words.items()
+    }).order_by()
+
+    bitmaps = {
+        row["student_id"]: sum(
+            int(row[f"word{word}"]) << (word * BITMAP_WORD_BITS) for word in range(len(words))
+        )
+        for row in rows
+    }
+    return chapter_ids, bitmaps
+
+
+def percentage(part, whole):
+    return round(part / whole * 100, 2) if whole else 0.0
+
+
+def progress_assignments(student):
+    """
+    The student's assignments with just what progress_row reads; chapter
+    totals and completion counts are denormalized onto Course /
+    CourseAssignment, so no aggregation is needed.
+    """
+    return CourseAssignment.objects.filter(student=student).select_related("course").only(
+        "completed_chapters",
+        "course__id",
+        "course__title",
+        "course__chapter_count"
+    )
+
+
+def progress_row(assignment):
+    """
+    /api/progress/my/ entry for one of progress_assignments().
+    """
+    total = assignment.course.chapter_count
+    completed = assignment.completed_chapters
+    return {
+        "course_id": assignment.course.id,
+        "course_title": assignment.course.title,
+        "total_chapters": total,
+        "completed_chapters": completed,
+        "percentage": percentage(completed, total)
+    }
+
+
+def course_summary(course):
+    """
+    Analytics summary for a Course.values(...) row carrying the
+    stats__enrolled / stats__completed rollup columns.
+    """
+    enrolled = course["stats__enrolled"] or 0
+    completed = course["stats__completed"] or 0
+    return {
+        "course_id": course["id"],
+        "title": course["title"],
+        "total_chapters": course["chapter_count"],
+        "enrolled": enrolled,
+        "completed": completed,
+        "completion_percentage": percentage(completed, enrolled)
+    }
+
+
+def _field_list(query_params, param, allowed):
+    names = [name for name in query_params.get(param, "").split(",") if name]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ParseError(f"Unknown {param}: {', '.join(unknown)}")
+    return names
+
+
+def course_values_serializer(request, context):
+    """
+    CourseSerializer output narrowed by the request's query string:
+
+    - ?fields=id,title: only these course fields
+    - ?include=chapters: add the nested chapters, which are otherwise
+      only sent when neither ?fields= nor ?include= is given (the full
+      default payload)
+    - ?chapter_fields=id,title: only these chapter fields (implies
+      include=chapters)
+
+    Fields and chapters left out are not queried either.
+    """
+    query_params = request.GET
+    if not {"fields", "include", "chapter_fields"} & query_params.keys():
+        return ValuesSerializer(CourseSerializer, context=context)
+
+    course_keys = compile_serializer(CourseSerializer).keys
+    fields = _field_list(query_params, "fields", course_keys)
+    include = _field_list(query_params, "include", ["chapters"])
+    chapter_fields = _field_list(query_params, "chapter_fields", compile_serializer(ChapterSerializer).keys)
+
+    keys = fields or [key for key in course_keys if key != "chapters"]
+    if "chapters" in include or chapter_fields or not {"fields", "include"} & query_params.keys():
+        keys = keys + ["chapters"]
+
+    return ValuesSerializer(
+        CourseSerializer,
+        context=context,
+        fields=keys,
+        nested_fields={"chapters": chapter_fields or None}
+    )
+
+
+def version_etag(*parts):
+    """
+    Weak ETag built from cheap version tokens (ids, Course.updated_at, ...).
+    """
+    digest = hashlib.md5(
+        ":".join(str(part) for part in parts).encode(),
+        usedforsecurity=False
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def enrolled_courses_version(student_id):
+    """
+    Aggregate over the student's CourseAssignment rows that versions the
+    enrolled courses listing: the newest course change (chapters bump
+    Course.updated_at), the newest assignment and the assignment count.
+    Read from the database, so a stale enrollment cache never produces a
+    matching ETag for a changed enrolled set.
+    """
+    return CourseAssignment.objects.filter(student_id=student_id).aggregate(**enrolled_courses_aggregates())
+
+
+async def aenrolled_courses_version(student_id):
+    return await CourseAssignment.objects.filter(student_id=student_id).aaggregate(**enrolled_courses_aggregates())
+
+
+def enrolled_courses_aggregates():
+    """
+    The CourseAssignment aggregates behind enrolled_courses_version.
+    """
+    return {
+        "course_updated": Max("course__updated_at"),
+        "assigned": Max("assigned_at"),
+        "count": Count("pk")
+    }
+
+
+def enrolled_courses_validators(request, version):
+    """
+    (ETag, Last-Modified) for an enrolled_courses_version aggregate.
+    """
+    last_modified = max(filter(None, (version["course_updated"], version["assigned"])), default=None)
+    etag = version_etag(
+        request.get_full_path(),
+        version["count"],
+        version["assigned"],
+        version["course_updated"]
+    )
+    return etag, last_modified
+
+
+def not_modified_response(request, etag, last_modified=None):
+    """
+    Returns a 304 response when the client's validators still match,
+    otherwise None. Call it before serializing anything.
+    """
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(timegm(last_modified.utctimetuple()))
+    # Per-user content: browsers may keep it but must revalidate each time
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -1,30 +1,72 @@
+from collections import Counter
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files import File
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q, Count
+from PIL import Image
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from rest_framework import viewsets, status, mixins
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from core.serializers import ValuesSerializer
+
+from .events import record_event, record_events
+from .images import enqueue_image_variants
+from .uploads import UploadBusy, discard_partial, open_partial, parse_content_range, partial_path, write_chunk
 from .permissions import IsMentor, IsCourseMentor, IsStudent
 from .models import (
     Course,
     Chapter,
     CourseAssignment,
-    ChapterProgress
+    ChapterProgress,
+    ChapterUpload,
+    ProgressEvent
+)
+from .utils import (
+    chapter_completion_state,
+    completion_bitmaps,
+    course_summary,
+    course_values_serializer,
+    enrolled_courses_validators,
+    enrolled_courses_version,
+    invalidate_enrollments,
+    is_student_enrolled,
+    not_modified_response,
+    percentage,
+    progress_assignments,
+    progress_row,
+    record_completion,
+    record_completions,
+    record_enrollments,
+    record_new_chapters,
+    remap_chapter_order,
+    set_validators,
+    version_etag
 )
 from .serializers import (
     CourseSerializer,
     ChapterSerializer,
-    CourseProgressSerializer
+    CourseProgressSerializer,
+    BulkCourseAssignmentSerializer,
+    ChapterReorderSerializer,
+    ChapterUploadSerializer,
+    ProgressSyncSerializer
 )
 from ..users.permissions import IsAdminRole
 
 User = get_user_model()
 
+# Upper bound for one bulk chapter create request
+MAX_BULK_CHAPTERS = 500
+
 class CourseViewSet(mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.UpdateModelMixin,
@@ -43,6 +85,8 @@ class CourseViewSet(mixins.ListModelMixin,
         * Assign students to own courses
     """
 
+    # Listings go through list_response (ValuesSerializer), which loads
+    # nested chapters with one query per page whatever the page size
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
 
@@ -56,27 +100,35 @@ class CourseViewSet(mixins.ListModelMixin,
         if self.action in ["create", "my_courses"]:
             return [IsAuthenticated(), IsMentor()]
 
-        if self.action in ["update", "partial_update", "destroy", "assign_course"]:
+        if self.action in ["update", "partial_update", "destroy", "assign_course", "progress_matrix"]:
             return [IsAuthenticated(), IsMentor(), IsCourseMentor()]
 
         if self.action == "enrolled_courses":
             return [IsAuthenticated(), IsStudent()]
 
+        if self.action in ["analytics", "course_analytics"]:
+            return [IsAuthenticated(), IsAdminRole()]
+
         return [IsAuthenticated()]
 
     # -------------------------------------------------
     # GET /api/courses/  (Admin only)
     # -------------------------------------------------
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        return self.list_response(Course.objects.all(), detail="All courses fetched successfully")
 
-        return Response(
-            {
-                "data": serializer.data,
-                "detail": "All courses fetched successfully"
-            },
-            status=status.HTTP_200_OK
+    def list_response(self, courses, detail):
+        """
+        A page of `courses` through the read-only ValuesSerializer path
+        (same payload as CourseSerializer, without model instances),
+        narrowed by ?fields= / ?include= / ?chapter_fields=.
+        """
+        values = course_values_serializer(self.request, self.get_serializer_context())
+        page = self.paginate_queryset(values.values(courses))
+
+        return self.paginator.get_paginated_response(
+            values.to_representation(page),
+            detail=detail
         )
 
     # -------------------------------------------------
@@ -136,20 +188,9 @@ class CourseViewSet(mixins.ListModelMixin,
     # -------------------------------------------------
     @action(detail=False, methods=["get"], url_path="my")
     def my_courses(self, request):
-        user_courses = Course.objects.filter(
-            mentor=request.user
-        )
-        serializer = self.get_serializer(
-            user_courses,
-            many=True
-        )
-
-        return Response(
-            {
-                "data": serializer.data,
-                "detail": "Your courses fetched successfully"
-            },
-            status=status.HTTP_200_OK
+        return self.list_response(
+            Course.objects.filter(mentor=request.user),
+            detail="Your courses fetched successfully"
         )
 
     # -------------------------------------------------
@@ -159,6 +200,9 @@ class CourseViewSet(mixins.ListModelMixin,
     def assign_course(self, request, pk=None):
         course = self.get_object()
 
+        if "student_ids" in request.data:
+            return self.assign_bulk(request, course)
+
         student_id = request.data.get("student_id")
         if not student_id:
             return Response(
@@ -174,10 +218,17 @@ class CourseViewSet(mixins.ListModelMixin,
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        assignment, created = CourseAssignment.objects.get_or_create(
-            course=course,
-            student=student
-        )
+        with transaction.atomic():
+            assignment, created = CourseAssignment.objects.get_or_create(
+                course=course,
+                student=student
+            )
+            if created:
+                record_enrollments({course.id: 1})
+                record_event(ProgressEvent.Kind.ASSIGNED, student.id, course.id)
+
+        if created:
+            invalidate_enrollments([student.id])
 
         if not created:
             return Response(
@@ -196,6 +247,119 @@ class CourseViewSet(mixins.ListModelMixin,
             status=status.HTTP_201_CREATED
         )
 
+    def assign_bulk(self, request, course):
+        """
+        Bulk variant of assign_course:
+        { "student_ids": [...], "course_ids": [...] }
+
+        `course_ids` is optional and may only name courses owned by the
+        requesting mentor. Roles are validated in one query and the new
+        assignments are inserted in one transaction; the response reports
+        every (course, student) pair as created, already assigned or invalid.
+        """
+        serializer = BulkCourseAssignmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        student_ids = list(dict.fromkeys(serializer.validated_data["student_ids"]))
+        course_ids = list(dict.fromkeys(
+            [course.id] + serializer.validated_data.get("course_ids", [])
+        ))
+
+        owned_course_ids = set(
+            Course.objects.filter(
+                pk__in=course_ids,
+                mentor=request.user
+            ).values_list("id", flat=True)
+        )
+        invalid_courses = [
+            {"course_id": course_id, "detail": "You are not the mentor of this course."}
+            for course_id in course_ids if course_id not in owned_course_ids
+        ]
+        course_ids = [course_id for course_id in course_ids if course_id in owned_course_ids]
+
+        roles = dict(
+            User.objects.filter(pk__in=student_ids).values_list("id", "role")
+        )
+        invalid = []
+        valid_student_ids = []
+        for student_id in student_ids:
+            if student_id not in roles:
+                invalid.append({"student_id": student_id, "detail": "User does not exist."})
+            elif roles[student_id] != User.Role.STUDENT:
+                invalid.append({"student_id": student_id, "detail": "The selected user is not a Student."})
+            else:
+                valid_student_ids.append(student_id)
+
+        pairs = [
+            (course_id, student_id)
+            for course_id in course_ids
+            for student_id in valid_student_ids
+        ]
+        with transaction.atomic():
+            existing = set(
+                CourseAssignment.objects.filter(
+                    course_id__in=course_ids,
+                    student_id__in=valid_student_ids
+                ).values_list("course_id", "student_id")
+            )
+
+            # Every row this request inserts carries the same assigned_at, so
+            # the re-read below can tell them apart from pairs a concurrent
+            # request inserted after the read above; ignore_conflicts turns
+            # those into no-ops, and they must not be counted as created.
+            assigned_at = timezone.now()
+            new_assignments = [
+                CourseAssignment(course_id=course_id, student_id=student_id, assigned_at=assigned_at)
+                for course_id, student_id in pairs
+                if (course_id, student_id) not in existing
+            ]
+            inserted = set()
+            if new_assignments:
+                CourseAssignment.objects.bulk_create(new_assignments, ignore_conflicts=True)
+                inserted = set(
+                    CourseAssignment.objects.filter(
+                        course_id__in=course_ids,
+                        student_id__in=valid_student_ids,
+                        assigned_at=assigned_at
+                    ).values_list("course_id", "student_id")
+                ) - existing
+
+            created = []
+            already_assigned = []
+            for course_id, student_id in pairs:
+                pair = {"course_id": course_id, "student_id": student_id}
+                if (course_id, student_id) in inserted:
+                    created.append(pair)
+                else:
+                    already_assigned.append(pair)
+
+            record_enrollments(Counter(pair["course_id"] for pair in created))
+            record_events([
+                ProgressEvent(kind=ProgressEvent.Kind.ASSIGNED, **pair)
+                for pair in created
+            ])
+
+            transaction.on_commit(
+                lambda: invalidate_enrollments(pair["student_id"] for pair in created)
+            )
+
+        return Response(
+            {
+                "detail": (
+                    f"{len(created)} assignments created, "
+                    f"{len(already_assigned)} already assigned, "
+                    f"{len(invalid) + len(invalid_courses)} invalid"
+                ),
+                "data": {
+                    "created": created,
+                    "already_assigned": already_assigned,
+                    "invalid": invalid,
+                    "invalid_courses": invalid_courses
+                }
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
     @action(detail=False, methods=["get"], url_path="enrolled")
     def enrolled_courses(self, request):
         """
@@ -204,16 +368,151 @@ class CourseViewSet(mixins.ListModelMixin,
         """
         student = request.user
 
-        courses = Course.objects.filter(
-            courseassignment__student = student
-        ).distinct()
+        etag, last_modified = enrolled_courses_validators(request, enrolled_courses_version(student.id))
+
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        # (course, student) is unique, so the join cannot duplicate rows
+        response = self.list_response(
+            Course.objects.filter(courseassignment__student=student),
+            detail="Enrolled courses fetched successfully"
+        )
+        return set_validators(response, etag, last_modified)
+
+    # -------------------------------------------------
+    # GET /api/courses/analytics/  (Admin)
+    # -------------------------------------------------
+    @action(detail=False, methods=["get"], url_path="analytics")
+    def analytics(self, request):
+        """
+        Enrollment and completion per course, read from the CourseStats
+        rollup (one row per course, no progress scan).
+        """
+        courses = Course.objects.values(
+            "id",
+            "title",
+            "chapter_count",
+            "stats__enrolled",
+            "stats__completed"
+        )
+        page = self.paginate_queryset(courses)
+
+        return self.paginator.get_paginated_response(
+            [course_summary(course) for course in page],
+            detail="Course analytics fetched successfully"
+        )
+
+    # -------------------------------------------------
+    # GET /api/courses/:id/analytics/  (Admin)
+    # -------------------------------------------------
+    @action(detail=True, methods=["get"], url_path="analytics")
+    def course_analytics(self, request, pk=None):
+        """
+        Course summary plus the per-chapter funnel (reached, completed,
+        drop-off), read from the ChapterStats rollup: O(chapters).
+        """
+        course = get_object_or_404(
+            Course.objects.values(
+                "id",
+                "title",
+                "chapter_count",
+                "stats__enrolled",
+                "stats__completed"
+            ),
+            pk=pk
+        )
+        chapters = Chapter.objects.filter(course_id=course["id"]).order_by("sequence_number").values(
+            "id",
+            "title",
+            "sequence_number",
+            "stats__reached",
+            "stats__completed"
+        )
 
-        serializer = self.get_serializer(courses, many=True)
+        data = course_summary(course)
+        data["chapters"] = []
+        for chapter in chapters:
+            reached = chapter["stats__reached"] or 0
+            completed = chapter["stats__completed"] or 0
+            data["chapters"].append({
+                "chapter_id": chapter["id"],
+                "title": chapter["title"],
+                "sequence_number": chapter["sequence_number"],
+                "reached": reached,
+                "completed": completed,
+                "drop_off": max(reached - completed, 0),
+                "completion_percentage": percentage(completed, reached)
+            })
 
         return Response(
             {
-                "data": serializer.data,
-                "detail": "Enrolled courses fetched successfully"
+                "data": data,
+                "detail": "Course analytics fetched successfully"
+            },
+            status=status.HTTP_200_OK
+        )
+
+    # -------------------------------------------------
+    # GET /api/courses/:id/progress-matrix/  (Mentor + owner)
+    # -------------------------------------------------
+    @action(detail=True, methods=["get"], url_path="progress-matrix")
+    def progress_matrix(self, request, pk=None):
+        """
+        Every enrolled student's progress in one response, column-wise:
+
+        - default: completed chapter count and highest completed sequence
+          number per student, straight from the assignment counters
+          (one query)
+        - ?encoding=bitmap: per student a hex bitmap over `chapter_ids`
+          (bit i set = i-th chapter in sequence order completed),
+          aggregated per student in SQL (see completion_bitmaps)
+
+        ?names=true adds a `usernames` column.
+        """
+        encoding = request.query_params.get("encoding", "sequence")
+        if encoding not in ("sequence", "bitmap"):
+            return Response(
+                {"detail": "encoding must be 'sequence' or 'bitmap'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        with_names = request.query_params.get("names") in ("1", "true")
+
+        course = get_object_or_404(
+            Course.objects.only("id", "mentor_id", "chapter_count"),
+            pk=pk
+        )
+        self.check_object_permissions(request, course)
+
+        columns = ["student_id", "completed_chapters", "last_completed_sequence"]
+        if with_names:
+            columns.append("student__username")
+        rows = list(
+            CourseAssignment.objects.filter(course=course).order_by("student_id").values_list(*columns)
+        )
+
+        data = {
+            "course_id": course.id,
+            "total_chapters": course.chapter_count,
+            "encoding": encoding,
+            "student_ids": [row[0] for row in rows],
+        }
+        if with_names:
+            data["usernames"] = [row[3] for row in rows]
+
+        if encoding == "sequence":
+            data["completed"] = [row[1] for row in rows]
+            data["last_sequence"] = [row[2] for row in rows]
+        else:
+            chapter_ids, bitmaps = completion_bitmaps(course.id)
+            data["chapter_ids"] = chapter_ids
+            data["bitmaps"] = [format(bitmaps.get(row[0], 0), "x") for row in rows]
+
+        return Response(
+            {
+                "data": data,
+                "detail": "Progress matrix fetched successfully"
             },
             status=status.HTTP_200_OK
         )
@@ -227,11 +526,13 @@ class ChapterViewSet(mixins.CreateModelMixin,
 
     URL:
       /api/courses/:course_id/chapters/
+      /api/courses/:course_id/chapters/reorder/
 
     Access:
     - Mentor (owner):
         * GET chapters
-        * POST chapters
+        * POST chapters (one or an array)
+        * POST reorder
     - Student (enrolled):
         * GET chapters only
     """
@@ -244,10 +545,7 @@ class ChapterViewSet(mixins.CreateModelMixin,
         return get_object_or_404(Course, pk=course_id)
 
     def is_student_enrolled(self, student, course):
-        return CourseAssignment.objects.filter(
-            student=student,
-            course=course
-        ).exists()
+        return is_student_enrolled(student, course.id)
 
     # -------------------------------------------------
     # GET /api/courses/:course_id/chapters/
@@ -262,7 +560,7 @@ class ChapterViewSet(mixins.CreateModelMixin,
 
         # --- Mentor access ---
         if user.role == User.Role.MENTOR:
-            if course.mentor != user:
+            if course.mentor_id != user.id:
                 raise PermissionDenied("You are not the mentor of this course.")
 
         # --- Student access ---
@@ -273,16 +571,23 @@ class ChapterViewSet(mixins.CreateModelMixin,
         else:
             raise PermissionDenied("You are not allowed to view chapters.")
 
-        chapters = Chapter.objects.filter(course=course).order_by("sequence_number")
-        serializer = self.get_serializer(chapters, many=True)
+        # Course.updated_at is bumped on every chapter change
+        etag = version_etag(course.id, course.updated_at)
+        not_modified = not_modified_response(request, etag, course.updated_at)
+        if not_modified is not None:
+            return not_modified
 
-        return Response(
+        values = ValuesSerializer(self.get_serializer_class(), context=self.get_serializer_context())
+        chapters = values.values(Chapter.objects.filter(course=course).order_by("sequence_number"))
+
+        response = Response(
             {
-                "data": serializer.data,
+                "data": values.to_representation(chapters),
                 "detail": "Chapters fetched successfully"
             },
             status=status.HTTP_200_OK
         )
+        return set_validators(response, etag, course.updated_at)
 
     # -------------------------------------------------
     # POST /api/courses/:course_id/chapters/
@@ -290,36 +595,307 @@ class ChapterViewSet(mixins.CreateModelMixin,
     def create(self, request, *args, **kwargs):
         """
         Mentor-only: must own the course
+
+        Accepts one chapter or a JSON array of chapters; an array is
+        validated as a whole and inserted with one bulk_create.
         """
-        user = request.user
+        course = self.get_owned_course(request, "Only mentors can add chapters.")
+
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(
+            data=request.data,
+            many=many,
+            context={**self.get_serializer_context(), "course": course},
+            **({"allow_empty": False, "max_length": MAX_BULK_CHAPTERS} if many else {})
+        )
+        serializer.is_valid(raise_exception=True)
 
-        if user.role != User.Role.MENTOR:
-            raise PermissionDenied("Only mentors can add chapters.")
+        with transaction.atomic():
+            # Serializes chapter creates / reorders of the course
+            Course.objects.select_for_update().filter(pk=course.pk).values_list("pk").get()
+
+            created = serializer.save(course=course)
+            Course.objects.filter(pk=course.pk).update(
+                chapter_count=F("chapter_count") + (len(created) if many else 1),
+                updated_at=timezone.now()
+            )
+            # A new chapter shifts the course's completion funnel
+            record_new_chapters(course.pk, [chapter.pk for chapter in created] if many else [created.pk])
+            if not many:
+                enqueue_image_variants(created)
+
+        return Response(
+            {
+                "data": serializer.data,
+                "detail": f"{len(created)} chapters added successfully" if many else "Chapter added successfully"
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+    # -------------------------------------------------
+    # POST /api/courses/:course_id/chapters/reorder/
+    # -------------------------------------------------
+    def reorder(self, request, *args, **kwargs):
+        """
+        Mentor-only: must own the course
+        Body: { "chapter_ids": [...] } listing every chapter of the course
+        in the new order; sequence numbers become 1..n.
+
+        (course, sequence_number) is unique and checked row by row, so the
+        chapters are first moved past the current maximum and then written
+        to their final positions: a fixed number of statements whatever
+        the chapter count.
+        """
+        course = self.get_owned_course(request, "Only mentors can reorder chapters.")
+
+        serializer = ChapterReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        chapter_ids = serializer.validated_data["chapter_ids"]
+
+        with transaction.atomic():
+            # Serializes concurrent reorders / chapter creates of the course
+            Course.objects.select_for_update().filter(pk=course.pk).values_list("pk").get()
+
+            chapters = Chapter.objects.filter(course=course)
+            current = dict(chapters.values_list("pk", "sequence_number"))
+            if len(chapter_ids) != len(set(chapter_ids)) or set(chapter_ids) != set(current):
+                return Response(
+                    {"detail": "chapter_ids must list every chapter of this course exactly once."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            new_sequence = {chapter_id: position for position, chapter_id in enumerate(chapter_ids, start=1)}
+            if any(current[pk] != new_sequence[pk] for pk in chapter_ids):
+                # Phase 1: every row lands above every current number (no collisions)
+                chapters.update(sequence_number=F("sequence_number") + max(current.values()))
+                # Phase 2: final numbers are all below the phase 1 range
+                chapters.update(sequence_number=Case(
+                    *[When(pk=pk, then=Value(position)) for pk, position in new_sequence.items()],
+                    output_field=PositiveIntegerField()
+                ))
+                Course.objects.filter(pk=course.pk).update(updated_at=timezone.now())
+
+                # last_completed_sequence and the funnel follow the new order
+                remap_chapter_order(course.pk, chapter_ids)
+
+        return Response(
+            {
+                "data": [
+                    {"id": pk, "sequence_number": position}
+                    for pk, position in new_sequence.items()
+                ],
+                "detail": "Chapters reordered successfully"
+            },
+            status=status.HTTP_200_OK
+        )
+
+    def get_owned_course(self, request, role_message):
+        if request.user.role != User.Role.MENTOR:
+            raise PermissionDenied(role_message)
 
         course = self.get_course()
 
-        if course.mentor != user:
+        if course.mentor_id != request.user.id:
             raise PermissionDenied("You are not the mentor of this course.")
+        return course
+
+
+class ChapterUploadViewSet(mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet):
+    """
+    Resumable, chunked chapter image uploads (Mentor, course owner).
+
+    1. POST /api/chapter-uploads/                      { chapter, filename, size }
+    2. PUT  /api/chapter-uploads/:upload_id/chunk/     raw bytes + Content-Range
+    3. GET  /api/chapter-uploads/:upload_id/           current offset (to resume)
+    4. POST /api/chapter-uploads/:upload_id/finalize/  attaches Chapter.image
+
+    Chunks are streamed to a partial file as they arrive, so no request
+    ever buffers the whole image and a dropped connection only costs the
+    unfinished part of one chunk.
+    """
+    serializer_class = ChapterUploadSerializer
+    permission_classes = [IsAuthenticated, IsMentor]
+    lookup_field = "upload_id"
 
+    def get_queryset(self):
+        return ChapterUpload.objects.filter(owner=self.request.user)
+
+    # -------------------------------------------------
+    # POST /api/chapter-uploads/
+    # -------------------------------------------------
+    def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(course=course)
+
+        if serializer.validated_data["chapter"].course.mentor_id != request.user.id:
+            raise PermissionDenied("You are not the mentor of this course.")
+
+        serializer.save(owner=request.user)
 
         return Response(
             {
-                "data": serializer.data,
-                "detail": "Chapter added successfully"
+                "data": {**serializer.data, "max_chunk_size": settings.CHAPTER_UPLOAD_MAX_CHUNK},
+                "detail": "Upload created successfully"
             },
             status=status.HTTP_201_CREATED
         )
 
+    # -------------------------------------------------
+    # GET /api/chapter-uploads/:upload_id/
+    # -------------------------------------------------
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+
+        return Response(
+            {
+                "data": serializer.data,
+                "detail": "Upload fetched successfully"
+            },
+            status=status.HTTP_200_OK
+        )
+
+    # -------------------------------------------------
+    # PUT /api/chapter-uploads/:upload_id/chunk/
+    # -------------------------------------------------
+    @action(detail=True, methods=["put"], url_path="chunk")
+    def chunk(self, request, upload_id=None):
+        """
+        Body: the raw bytes; Content-Range: bytes <start>-<end>/<size>.
+        `start` must equal the upload's current offset, otherwise 409 with
+        the offset to resume from.
+        """
+        upload = self.get_object()
+
+        content_range = parse_content_range(request.META.get("HTTP_CONTENT_RANGE"))
+        if content_range is None:
+            return Response(
+                {"detail": "Content-Range: bytes <start>-<end>/<size> is required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end, total = content_range
+        if total != upload.size or end >= upload.size:
+            return Response(
+                {"detail": f"Content-Range does not fit an upload of {upload.size} bytes"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if end - start + 1 > settings.CHAPTER_UPLOAD_MAX_CHUNK:
+            return Response(
+                {"detail": f"Chunks are limited to {settings.CHAPTER_UPLOAD_MAX_CHUNK} bytes"},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        # DRF leaves no stream for an empty body
+        if request.stream is None:
+            return Response(
+                {"detail": "The chunk body is empty"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if start != upload.offset:
+            return self.chunk_conflict(upload)
+
+        # The partial file's lock serializes writers of the same upload; the
+        # offset is advanced afterwards with a conditional update, so no
+        # transaction stays open while a slow client streams the chunk
+        try:
+            with open_partial(upload) as f:
+                upload.refresh_from_db(fields=["offset"])
+                if start != upload.offset:
+                    return self.chunk_conflict(upload)
+
+                offset = write_chunk(f, request.stream, start, end - start + 1)
+                advanced = ChapterUpload.objects.filter(pk=upload.pk, offset=start).update(
+                    offset=offset,
+                    updated_at=timezone.now()
+                )
+        except UploadBusy:
+            return self.chunk_conflict(upload, "Another chunk of this upload is being written")
+
+        if not advanced:
+            # Another writer moved the offset (or the upload expired)
+            upload.refresh_from_db(fields=["offset"])
+            return self.chunk_conflict(upload)
+
+        return Response(
+            {
+                "data": {"upload_id": upload.upload_id, "offset": offset, "size": upload.size},
+                "detail": "Chunk stored"
+            },
+            status=status.HTTP_200_OK
+        )
+
+    def chunk_conflict(self, upload, detail="Chunk does not start at the current offset"):
+        return Response(
+            {
+                "detail": detail,
+                "data": {"upload_id": upload.upload_id, "offset": upload.offset, "size": upload.size}
+            },
+            status=status.HTTP_409_CONFLICT
+        )
+
+    # -------------------------------------------------
+    # POST /api/chapter-uploads/:upload_id/finalize/
+    # -------------------------------------------------
+    @action(detail=True, methods=["post"], url_path="finalize")
+    def finalize(self, request, upload_id=None):
+        upload = self.get_object()
+
+        if upload.offset < upload.size:
+            return Response(
+                {
+                    "detail": "Upload is incomplete",
+                    "data": {"upload_id": upload.upload_id, "offset": upload.offset, "size": upload.size}
+                },
+                status=status.HTTP_409_CONFLICT
+            )
+
+        path = partial_path(upload)
+        try:
+            with Image.open(path) as image:
+                image.verify()
+        except Exception:
+            discard_partial(upload)
+            upload.delete()
+            return Response(
+                {"detail": "The uploaded file is not a valid image"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with transaction.atomic():
+            chapter = Chapter.objects.select_for_update().get(pk=upload.chapter_id)
+            old_variants = list(chapter.image_variants.values())
+
+            with open(path, "rb") as f:
+                chapter.image.save(upload.filename, File(f), save=False)
+            chapter.image_variants = {}
+            chapter.save(update_fields=["image", "image_variants"])
+            Course.objects.filter(pk=chapter.course_id).update(updated_at=timezone.now())
+            enqueue_image_variants(chapter)
+
+            upload.delete()
+
+            # Files go only once the new image is committed
+            transaction.on_commit(lambda: discard_partial(upload))
+            for name in old_variants:
+                transaction.on_commit(lambda name=name: chapter.image.storage.delete(name))
+
+        return Response(
+            {
+                "data": ChapterSerializer(chapter, context=self.get_serializer_context()).data,
+                "detail": "Chapter image uploaded successfully"
+            },
+            status=status.HTTP_200_OK
+        )
 
 
 class ProgressViewSet(viewsets.GenericViewSet):
     """
     Handles Student Progress:
     1. POST /api/progress/:chapter_id/complete/ (Mark complete)
-    2. GET  /api/progress/my/                   (View all progress)
+    2. POST /api/progress/sync/                 (Replay offline completions)
+    3. GET  /api/progress/my/                   (View all progress)
     """
     permission_classes = [IsAuthenticated, IsStudent]
 
@@ -331,46 +907,93 @@ class ProgressViewSet(viewsets.GenericViewSet):
         Enforces:
         1. Student must be assigned to the course.
         2. Chapters must be completed in strict sequence.
+
+        Enrollment comes from the cached enrollment set; the previous
+        chapter's progress and this chapter's progress are read together
+        with the chapter in one query. The progress row, the assignment
+        counters and the analytics rollups are then written in one
+        atomic block that writes the assignment row first (sync locks it
+        first too), where the (student, chapter) unique constraint decides
+        between concurrent duplicates: the loser is answered as "already
+        completed" instead of failing.
         """
         student = request.user
-        chapter = get_object_or_404(Chapter, pk=chapter_id)
-        course = chapter.course
+
+        chapter = get_object_or_404(
+            chapter_completion_state(student).only('pk', 'course_id', 'sequence_number'),
+            pk=chapter_id
+        )
 
         # 1. Validation: Is student assigned to this course?
-        if not CourseAssignment.objects.filter(student=student, course=course).exists():
+        if not is_student_enrolled(student, chapter.course_id):
             return Response({
                 'detail': 'You are not enrolled in this course.'
             }, status=status.HTTP_403_FORBIDDEN)
 
         # 2. Validation: Strict Sequence Check
-        previous_chapter = Chapter.objects.filter(
-            course=course,
-            sequence_number__lt=chapter.sequence_number
-        ).order_by('-sequence_number').first()
-
-        if previous_chapter:
-            # Check if the previous chapter is completed
-            is_prev_complete = ChapterProgress.objects.filter(
-                student=student,
-                chapter=previous_chapter,
-                completed=True
-            ).exists()
-
-            if not is_prev_complete:
-                return Response({
-                    'detail': 'You must complete all previous chapters.'
-                }, status=status.HTTP_400_BAD_REQUEST)
+        if chapter.has_previous and not chapter.previous_completed:
+            return Response({
+                'detail': 'You must complete all previous chapters.'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
         # 3. Mark as Complete
-        progress, created = ChapterProgress.objects.get_or_create(
-            student=student,
-            chapter=chapter
-        )
-
-        if not progress.completed:
-            progress.completed = True
-            progress.completed_at = timezone.now()
-            progress.save()
+        marked = False
+        if not chapter.progress_completed:
+            now = timezone.now()
+            try:
+                with transaction.atomic():
+                    # The assignment counter is written first, so its row lock
+                    # is taken before any progress row (the order sync locks
+                    # in); no row means an unassignment the enrollment cache
+                    # missed
+                    enrolled = CourseAssignment.objects.filter(
+                        student=student,
+                        course_id=chapter.course_id
+                    ).update(
+                        completed_chapters=F('completed_chapters') + 1,
+                        last_completed_sequence=Greatest(
+                            Coalesce('last_completed_sequence', Value(chapter.sequence_number)),
+                            Value(chapter.sequence_number)
+                        )
+                    )
+                    if not enrolled:
+                        return Response({
+                            'detail': 'You are not enrolled in this course.'
+                        }, status=status.HTTP_403_FORBIDDEN)
+
+                    if chapter.progress_completed is None:
+                        ChapterProgress.objects.create(
+                            student=student,
+                            chapter=chapter,
+                            completed=True,
+                            completed_at=now
+                        )
+                        marked = True
+                    else:
+                        # Row left incomplete by an earlier version of this endpoint
+                        marked = ChapterProgress.objects.filter(
+                            student=student,
+                            chapter=chapter,
+                            completed=False
+                        ).update(completed=True, completed_at=now) == 1
+
+                    if marked:
+                        record_completion(chapter.pk, chapter.course_id, chapter.next_chapter_id)
+                        record_event(
+                            ProgressEvent.Kind.CHAPTER_COMPLETED,
+                            student.id,
+                            chapter.course_id,
+                            chapter_id=chapter.pk,
+                            occurred_at=now
+                        )
+                    else:
+                        # Completed concurrently: undo the counter update
+                        transaction.set_rollback(True)
+            except IntegrityError:
+                # A concurrent request for the same chapter inserted the row first
+                marked = False
+
+        if marked:
             message = "Chapter marked as completed."
         else:
             message = "Chapter was already completed."
@@ -379,11 +1002,153 @@ class ProgressViewSet(viewsets.GenericViewSet):
             'detail': message,
             'data': {
                 'chapter_id': chapter.id,
-                'course_id': course.id,
+                'course_id': chapter.course_id,
                 'completed': True
             }
         }, status=status.HTTP_200_OK)
 
+    # --- POST /api/progress/sync ---
+    @action(detail=False, methods=['post'], url_path='sync')
+    def sync(self, request):
+        """
+        Batch complete_chapter for completions queued offline, applied in
+        the order given. The same rules hold: enrolled courses only, and
+        a chapter needs its previous chapter completed, either already or
+        earlier in the batch.
+
+        The chapters of every course involved and the student's progress
+        in them are fetched once and the rules are checked in memory; the
+        new progress rows, assignment counters and rollups are then written
+        in one transaction. Each item is reported as completed, already
+        completed or rejected (with the reason). Client timestamps are kept,
+        capped at the server time.
+        """
+        serializer = ProgressSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        completions = serializer.validated_data['completions']
+        student = request.user
+        now = timezone.now()
+
+        requested_ids = [item['chapter_id'] for item in completions]
+        chapters = {}
+        sequences = {}
+        for chapter_id, course_id, sequence_number in Chapter.objects.filter(
+            course_id__in=Chapter.objects.filter(pk__in=requested_ids).values('course_id')
+        ).order_by('course_id', 'sequence_number').values_list('pk', 'course_id', 'sequence_number'):
+            course_chapters = sequences.setdefault(course_id, [])
+            chapters[chapter_id] = (course_id, sequence_number, len(course_chapters))
+            course_chapters.append(chapter_id)
+
+
+        results = []
+        new_progress = []
+        reopened = []
+        counters = {}
+        events = []
+        try:
+            with transaction.atomic():
+                # Enrollment comes from the locked assignment rows, not the
+                # per-process enrollment cache: the lock also serializes
+                # concurrent syncs / completions of the same courses
+                enrolled = set(
+                    CourseAssignment.objects.select_for_update().filter(
+                        student=student,
+                        course_id__in=list(sequences)
+                    ).values_list('course_id', flat=True)
+                )
+                progress = dict(
+                    ChapterProgress.objects.filter(
+                        student=student,
+                        chapter__course_id__in=enrolled
+                    ).values_list('chapter_id', 'completed')
+                )
+
+                for item in completions:
+                    chapter_id = item['chapter_id']
+                    result = {'chapter_id': chapter_id, 'course_id': None, 'status': 'rejected'}
+                    results.append(result)
+
+                    if chapter_id not in chapters:
+                        result['detail'] = 'Chapter not found.'
+                        continue
+                    course_id, sequence_number, position = chapters[chapter_id]
+                    result['course_id'] = course_id
+
+                    if course_id not in enrolled:
+                        result['detail'] = 'You are not enrolled in this course.'
+                    elif progress.get(chapter_id):
+                        result['status'] = 'already_completed'
+                    elif position and not progress.get(sequences[course_id][position - 1]):
+                        result['detail'] = 'You must complete all previous chapters.'
+                    else:
+                        completed_at = min(item.get('completed_at', now), now)
+                        if chapter_id in progress:
+                            # Row left incomplete by an earlier version of complete_chapter
+                            reopened.append((chapter_id, completed_at))
+                        else:
+                            new_progress.append(ChapterProgress(
+                                student=student,
+                                chapter_id=chapter_id,
+                                completed=True,
+                                completed_at=completed_at
+                            ))
+                        progress[chapter_id] = True
+                        result['status'] = 'completed'
+
+                        course_chapters = sequences[course_id]
+                        next_chapter_id = course_chapters[position + 1] if position + 1 < len(course_chapters) else None
+                        counters.setdefault(course_id, []).append((chapter_id, sequence_number, next_chapter_id))
+                        events.append(ProgressEvent(
+                            kind=ProgressEvent.Kind.CHAPTER_COMPLETED,
+                            student_id=student.id,
+                            course_id=course_id,
+                            chapter_id=chapter_id,
+                            occurred_at=completed_at
+                        ))
+
+                ChapterProgress.objects.bulk_create(new_progress)
+                for chapter_id, completed_at in reopened:
+                    ChapterProgress.objects.filter(
+                        student=student,
+                        chapter_id=chapter_id
+                    ).update(completed=True, completed_at=completed_at)
+
+                for course_id, marked in counters.items():
+                    last_sequence = max(sequence_number for _, sequence_number, _ in marked)
+                    CourseAssignment.objects.filter(
+                        student=student,
+                        course_id=course_id
+                    ).update(
+                        completed_chapters=F('completed_chapters') + len(marked),
+                        last_completed_sequence=Greatest(
+                            Coalesce('last_completed_sequence', Value(last_sequence)),
+                            Value(last_sequence)
+                        )
+                    )
+                record_completions([
+                    (chapter_id, course_id, next_chapter_id)
+                    for course_id, marked in counters.items()
+                    for chapter_id, _, next_chapter_id in marked
+                ])
+                record_events(events)
+        except IntegrityError:
+            # A concurrent complete_chapter inserted one of the rows first;
+            # nothing was written and replaying the batch is safe
+            return Response({
+                'detail': 'Progress changed during the sync, please retry.'
+            }, status=status.HTTP_409_CONFLICT)
+
+        completed = sum(1 for result in results if result['status'] == 'completed')
+        already_completed = sum(1 for result in results if result['status'] == 'already_completed')
+        return Response({
+            'detail': (
+                f"{completed} chapters completed, "
+                f"{already_completed} already completed, "
+                f"{len(results) - completed - already_completed} rejected"
+            ),
+            'data': results
+        }, status=status.HTTP_200_OK)
+
     # --- GET /api/progress/my ---
     @action(detail=False, methods=['get'], url_path='my')
     def my_progress(self, request):
@@ -391,34 +1156,7 @@ class ProgressViewSet(viewsets.GenericViewSet):
         Get overall progress for all enrolled courses.
         Calculates percentage automatically.
         """
-        student = request.user
-
-        # Fetch all courses assigned to this student
-        # Annotate with total chapters and completed chapters counts
-        assignments = CourseAssignment.objects.filter(student=student).select_related('course').annotate(
-            total_chapters=Count('course__chapters', distinct=True),
-            completed_chapters=Count(
-                'course__chapters__chapterprogress',
-                filter=Q(course__chapters__chapterprogress__student=student,
-                         course__chapters__chapterprogress__completed=True),
-                distinct=True
-            )
-        )
-
-        results = []
-        for assign in assignments:
-            total = getattr(assign, 'total_chapters', 0)
-            completed = getattr(assign, 'completed_chapters', 0)
-
-            percentage = (completed / total * 100) if total > 0 else 0.0
-
-            results.append({
-                'course_id': assign.course.id,
-                'course_title': assign.course.title,
-                'total_chapters': total,
-                'completed_chapters': completed,
-                'percentage': round(percentage, 2)
-            })
+        results = [progress_row(assignment) for assignment in progress_assignments(request.user)]
 
         return Response({
             'data': results,
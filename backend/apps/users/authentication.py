@@ -0,0 +1,153 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+ROLE_CLAIM = 'role'
+VERSION_CLAIM = 'ver'
+USERNAME_CLAIM = 'username'
+
+# Cached version for users that no longer exist; no token carries it
+REVOKED = -1
+
+
+def issue_tokens(user):
+    """
+    Refresh token (and, through it, access token) carrying the claims
+    ClaimsJWTAuthentication needs: role, token version and username.
+    """
+    token = RefreshToken.for_user(user)
+    token[ROLE_CLAIM] = user.role
+    token[VERSION_CLAIM] = user.token_version
+    token[USERNAME_CLAIM] = user.username
+    return token
+
+
+def _version_cache_key(user_id):
+    return f"token_version:{user_id}"
+
+
+def get_token_version(user_id):
+    key = _version_cache_key(user_id)
+    version = cache.get(key)
+
+    if version is None:
+        version = User.objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+        if version is None:
+            version = REVOKED
+        cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+
+    return version
+
+
+async def aget_token_version(user_id):
+    key = _version_cache_key(user_id)
+    version = await cache.aget(key)
+
+    if version is None:
+        version = await User.objects.filter(pk=user_id).values_list('token_version', flat=True).afirst()
+        if version is None:
+            version = REVOKED
+        await cache.aset(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+
+    return version
+
+
+def bump_token_version(user):
+    """
+    Invalidates every token issued to `user` so far (role change, ...).
+    """
+    User.objects.filter(pk=user.pk).update(token_version=F('token_version') + 1)
+    user.refresh_from_db(fields=['token_version'])
+    cache.set(_version_cache_key(user.pk), user.token_version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+
+
+def revoke_tokens(user_id):
+    """
+    Refuses tokens of a deleted user without waiting for the cache to expire.
+    """
+    cache.set(_version_cache_key(user_id), REVOKED, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that async views can await (`aauthenticate`).
+
+    Reading and validating the token is pure CPU work and is shared with
+    the sync path; only get_user (a database lookup) is handed to a thread.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        # The user row lookup of get_user, run off the event loop
+        return await sync_to_async(self.get_user)(validated_token)
+
+
+class ClaimsJWTAuthentication(AsyncJWTAuthentication):
+    """
+    JWT authentication that builds request.user from the token claims
+    instead of loading the User row on every request.
+
+    The token's version claim is checked against the user's current
+    token_version (cached), so tokens issued before a role change or a
+    deletion are refused. request.user is an unsaved, partially populated
+    User (id, username, role): fine for permission checks and as a foreign
+    key value, but it must never be saved.
+
+    Tokens issued before these claims existed fall back to the database.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+            role = validated_token[ROLE_CLAIM]
+            version = validated_token[VERSION_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+
+        if version != get_token_version(user_id):
+            raise AuthenticationFailed('Token is no longer valid', code='token_revoked')
+
+        return self._claims_user(validated_token, user_id, role)
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+            role = validated_token[ROLE_CLAIM]
+            version = validated_token[VERSION_CLAIM]
+        except KeyError:
+            return await super().aget_user(validated_token)
+
+        if version != await aget_token_version(user_id):
+            raise AuthenticationFailed('Token is no longer valid', code='token_revoked')
+
+        return self._claims_user(validated_token, user_id, role)
+
+    def _claims_user(self, validated_token, user_id, role):
+        user = User(
+            pk=user_id,
+            username=validated_token.get(USERNAME_CLAIM, ''),
+            role=role,
+            is_active=True
+        )
+        user._state.adding = False
+        return user
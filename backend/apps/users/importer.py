@@ -0,0 +1,164 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+User = get_user_model()
+
+REQUIRED_FIELDS = ('username', 'password', 'email', 'first_name', 'last_name')
+
+IMPORTABLE_ROLES = {
+    'student': User.Role.STUDENT,
+    'mentor': User.Role.MENTOR,
+}
+
+FORMATS = ('csv', 'ndjson')
+
+
+def parse_rows(lines, fmt):
+    """
+    Yields (line_number, row) for a CSV (with header) or NDJSON stream of
+    text lines. Rows that cannot be decoded are yielded as an error string
+    instead of a dict.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, 'Invalid JSON'
+            continue
+        yield line_number, row if isinstance(row, dict) else 'Expected a JSON object'
+
+
+def import_users(rows, pool=None, chunk_size=500):
+    """
+    Creates users from (line_number, row) pairs as produced by parse_rows.
+
+    Users are inserted with bulk_create one chunk at a time, so memory stays
+    bounded whatever the input size. Passwords are hashed on `pool` (a
+    concurrent.futures executor; PBKDF2 is CPU bound) when given, in this
+    process otherwise. Bad rows are reported and skipped; they never abort
+    the batch.
+
+    Returns {"total": n, "created": n, "errors": [{"line", "username", "detail"}]}.
+    """
+    if pool is None:
+        hash_passwords = _hash_passwords
+    else:
+        def hash_passwords(passwords):
+            processes = os.cpu_count() or 1
+            return pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (processes * 4)))
+
+    summary = {'total': 0, 'created': 0, 'errors': []}
+    seen_usernames = set()
+    rows = iter(rows)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        summary['total'] += len(chunk)
+        _import_chunk(chunk, hash_passwords, seen_usernames, summary)
+
+    summary['errors'].sort(key=lambda error: error['line'])
+    return summary
+
+
+def _hash_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def _import_chunk(chunk, hash_passwords, seen_usernames, summary):
+    errors = summary['errors']
+    candidates = []
+
+    for line_number, row in chunk:
+        if isinstance(row, str):
+            errors.append({'line': line_number, 'username': None, 'detail': row})
+            continue
+
+        try:
+            user = _build_user(row)
+        except ValidationError as e:
+            errors.append({'line': line_number, 'username': row.get('username'), 'detail': ' '.join(e.messages)})
+            continue
+
+        if user.username in seen_usernames:
+            errors.append({'line': line_number, 'username': user.username, 'detail': 'Duplicate username in import'})
+            continue
+        seen_usernames.add(user.username)
+        candidates.append((line_number, user))
+
+    existing = set(
+        User.objects.filter(
+            username__in=[user.username for _, user in candidates]
+        ).values_list('username', flat=True)
+    )
+
+    new_users = []
+    for line_number, user in candidates:
+        if user.username in existing:
+            errors.append({'line': line_number, 'username': user.username, 'detail': 'User with this username already exists'})
+        else:
+            new_users.append((line_number, user))
+
+    if not new_users:
+        return
+
+    hashes = hash_passwords([user.password for _, user in new_users])
+    for (_, user), password_hash in zip(new_users, hashes):
+        user.password = password_hash
+
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _, user in new_users])
+        summary['created'] += len(new_users)
+    except IntegrityError:
+        # Someone registered one of these usernames meanwhile: fall back to
+        # row-by-row inserts so only the conflicting rows are rejected.
+        for line_number, user in new_users:
+            try:
+                with transaction.atomic():
+                    user.save()
+                summary['created'] += 1
+            except IntegrityError:
+                errors.append({'line': line_number, 'username': user.username, 'detail': 'User with this username already exists'})
+
+
+def _build_user(row):
+    """
+    Validates one input row and returns an unsaved User whose `password`
+    still holds the raw password.
+    """
+    values = {field: str(row.get(field) or '').strip() for field in REQUIRED_FIELDS}
+    missing = [field for field, value in values.items() if not value]
+    if missing:
+        raise ValidationError(f"Missing required fields: {', '.join(missing)}")
+
+    role = str(row.get('role') or 'student').strip().lower()
+    if role not in IMPORTABLE_ROLES:
+        raise ValidationError(f"Invalid role '{role}'. Expected one of: {', '.join(IMPORTABLE_ROLES)}")
+
+    user = User(
+        username=values['username'],
+        password=values['password'],
+        email=User.objects.normalize_email(values['email']),
+        first_name=values['first_name'],
+        last_name=values['last_name'],
+        role=IMPORTABLE_ROLES[role],
+    )
+    user.full_clean(exclude=['password'], validate_unique=False)
+    return user
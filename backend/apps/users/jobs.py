@@ -0,0 +1,47 @@
+import logging
+
+from django.conf import settings
+
+from core.jobs import claim_jobs as claim_queued_jobs
+
+from .importer import import_users
+from .models import UserImportJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_import(rows, created_by):
+    """
+    Queues (line_number, row) pairs from parse_rows for the import worker.
+    """
+    return UserImportJob.objects.create(rows=[list(row) for row in rows], created_by=created_by)
+
+
+def claim_jobs(limit):
+    """
+    Moves up to `limit` pending jobs to RUNNING and returns them.
+    """
+    return claim_queued_jobs(UserImportJob.objects.all(), limit)
+
+
+def process_jobs(jobs, pool):
+    """
+    Imports the claimed jobs one after the other, hashing passwords on
+    `pool` (a concurrent.futures executor). The rows, raw passwords
+    included, are cleared once a job is DONE or FAILED.
+    """
+    for job in jobs:
+        try:
+            job.summary = import_users(job.rows, pool=pool)
+            job.status = UserImportJob.Status.DONE
+            job.error = ''
+        except Exception as e:
+            logger.exception("User import job %s failed", job.job_id)
+            job.error = str(e)
+            job.status = job.retry_status(settings.USER_IMPORT_JOB_MAX_ATTEMPTS)
+
+        if job.status != UserImportJob.Status.PENDING:
+            job.rows = []
+        job.save(update_fields=['status', 'error', 'summary', 'rows', 'updated_at'])
+
+    return len(jobs)
@@ -0,0 +1,24 @@
+from django.conf import settings
+
+from apps.users.jobs import claim_jobs, process_jobs
+from apps.users.models import UserImportJob
+from core.jobs import JobWorkerCommand, setup_django
+
+
+class Command(JobWorkerCommand):
+    help = (
+        "Run user imports uploaded through the API, hashing passwords on a local "
+        "process pool. The queue lives in the database, so no external broker is needed."
+    )
+    model = UserImportJob
+    stale_seconds = settings.USER_IMPORT_JOB_STALE_SECONDS
+    worker_name = "User import worker"
+    job_name = "user import job"
+    pool_purpose = "password hashing"
+    pool_initializer = staticmethod(setup_django)
+
+    def claim(self, limit):
+        return claim_jobs(limit)
+
+    def process(self, jobs, pool):
+        return process_jobs(jobs, pool)
@@ -1,7 +1,11 @@
 
+import uuid
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from core.jobs import QueueJob
+
 class User(AbstractUser):
     class Role(models.IntegerChoices):
         ADMIN = 1, 'Admin'
@@ -9,4 +13,35 @@ class User(AbstractUser):
         STUDENT = 3, 'Student'
 
     role = models.PositiveSmallIntegerField(choices=Role.choices, default=Role.STUDENT)
-    is_approved = models.BooleanField(default=False)
\ No newline at end of file
+    is_approved = models.BooleanField(default=False)
+
+    # Embedded in issued JWTs; bumping it invalidates every outstanding token
+    token_version = models.PositiveIntegerField(default=0)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Role-filtered lists paginated by id (e.g. the mentor's student list)
+            models.Index(fields=['role', 'id'], name='user_role_idx'),
+        ]
+
+class UserImportJob(QueueJob):
+    """
+    A user import uploaded through the API, processed by the
+    `run_user_import_worker` management command, which hashes the
+    passwords on a process pool.
+    """
+    job_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    created_by = models.ForeignKey('User', null=True, on_delete=models.SET_NULL, related_name='+')
+    # [line_number, row] pairs as produced by importer.parse_rows. They hold
+    # raw passwords, so they are cleared once the job is DONE or FAILED
+    rows = models.JSONField(default=list, blank=True)
+    # importer.import_users' summary once the job is DONE
+    summary = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"UserImportJob {self.job_id} ({self.get_status_display()})"
@@ -1,11 +1,22 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
+from core.serializers import ModelSerializer
+
+from .models import UserImportJob
+
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ModelSerializer):
     role_name = serializers.CharField(source='get_role_display', read_only=True)
 
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'role', 'role_name', 'first_name', 'last_name']
\ No newline at end of file
+        fields = ['id', 'username', 'email', 'role', 'role_name', 'first_name', 'last_name']
+
+class UserImportJobSerializer(ModelSerializer):
+    status_name = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = UserImportJob
+        fields = ['job_id', 'status', 'status_name', 'attempts', 'error', 'summary', 'created_at', 'updated_at']
@@ -0,0 +1,165 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.checks import check_shared_cache
+from core.instrumentation import registry
+from core.serializers import ValuesSerializer
+
+from .jobs import claim_jobs, process_jobs
+from .models import UserImportJob
+from .serializers import UserImportJobSerializer, UserSerializer
+
+User = get_user_model()
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+REDIS = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache"}}
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    """
+    Token revocations (and enrollment invalidations) only reach every
+    worker through a shared cache.
+    """
+
+    @override_settings(CACHES=LOCMEM, WEB_CONCURRENCY=1)
+    def test_single_worker_may_use_process_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(CACHES=LOCMEM, WEB_CONCURRENCY=4)
+    def test_several_workers_need_a_shared_cache(self):
+        self.assertEqual([error.id for error in check_shared_cache(None)], ["core.E001"])
+
+    @override_settings(CACHES=REDIS, WEB_CONCURRENCY=4)
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class UserValuesSerializerTests(TestCase):
+    def test_same_data_as_user_serializer(self):
+        User.objects.create_user(username="admin", password="x", role=User.Role.ADMIN, email="a@example.com")
+        User.objects.create_user(username="student", password="x", role=User.Role.STUDENT, first_name="S")
+        users = User.objects.order_by("pk")
+
+        values = ValuesSerializer(UserSerializer)
+        self.assertEqual(values.to_representation(values.values(users)), UserSerializer(users, many=True).data)
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_user(username="admin", password="x", role=User.Role.ADMIN)
+        for i in range(4):
+            User.objects.create_user(username=f"student{i}", password="x", role=User.Role.STUDENT)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def test_envelope(self):
+        response = self.client.get("/api/users/", {"page_size": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data), ["data", "next", "previous", "detail"])
+        self.assertEqual(response.data["detail"], "Users fetched successfully")
+        self.assertEqual(len(response.data["data"]), 2)
+        self.assertIsNone(response.data["previous"])
+        self.assertIsNotNone(response.data["next"])
+
+    def test_next_and_previous_cursors_walk_every_row_once(self):
+        pages = [self.client.get("/api/users/", {"page_size": 2}).data]
+        while pages[-1]["next"]:
+            pages.append(self.client.get(pages[-1]["next"]).data)
+
+        ids = [user["id"] for page in pages for user in page["data"]]
+        self.assertEqual(ids, list(User.objects.order_by("pk").values_list("pk", flat=True)))
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[-1]["next"])
+
+        previous = self.client.get(pages[-1]["previous"]).data
+        self.assertEqual(previous["data"], pages[1]["data"])
+
+
+class UserImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        admin = User.objects.create_user(username="admin", password="x", role=User.Role.ADMIN)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def test_http_import_is_queued_for_the_worker(self):
+        body = (
+            "username,password,email,first_name,last_name,role\n"
+            "ann,pw-ann,ann@example.com,Ann,A,student\n"
+            "admin,pw,admin@example.com,Ad,Min,student\n"
+            "ben,pw-ben,ben@example.com,Ben,B,mentor\n"
+        )
+        response = self.client.post("/api/users/import/", body, content_type="text/csv")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(User.objects.filter(username="ann").exists())
+        status_url = response.data["data"]["status_url"]
+        self.assertEqual(self.client.get(status_url).data["data"]["status_name"], "Pending")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            self.assertEqual(process_jobs(claim_jobs(10), pool), 1)
+
+        job = self.client.get(status_url).data["data"]
+        self.assertEqual(job["status_name"], "Done")
+        self.assertEqual(job["summary"]["created"], 2)
+        self.assertEqual([error["line"] for error in job["summary"]["errors"]], [3])
+        self.assertEqual(UserImportJob.objects.get().rows, [])
+        self.assertTrue(User.objects.get(username="ben").check_password("pw-ben"))
+        self.assertEqual(User.objects.get(username="ben").role, User.Role.MENTOR)
+
+    @override_settings(USER_IMPORT_MAX_ROWS=2)
+    def test_row_limit(self):
+        body = "".join(f'{{"username": "u{i}"}}\n' for i in range(3))
+        response = self.client.post("/api/users/import/", body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(UserImportJob.objects.exists())
+
+
+@override_settings(REQUEST_METRICS=True, REQUEST_METRICS_SAMPLE_RATE=1.0, REQUEST_METRICS_SERVER_TIMING=True)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        admin = User.objects.create_user(username="admin", password="x", role=User.Role.ADMIN)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def test_records_view_and_render_time(self):
+        response = self.client.get("/api/users/")
+
+        self.assertEqual(response.status_code, 200)
+        timings = [entry.split(";")[0] for entry in response["Server-Timing"].split(", ")]
+        self.assertEqual(timings, ["db", "view", "serialize", "render", "total"])
+
+        metrics = registry.snapshot()["UserViewSet.list"]
+        self.assertEqual(metrics["view_ms"]["count"], 1)
+        # ValuesSerializer.to_representation
+        self.assertGreater(metrics["serialize_ms"]["max"], 0)
+        self.assertEqual(metrics["render_ms"]["count"], 1)
+        self.assertGreater(metrics["render_ms"]["max"], 0)
+        self.assertGreater(metrics["sql_count"]["max"], 0)
+
+    def test_serializer_data_is_timed_apart_from_the_view(self):
+        job = UserImportJob.objects.create()
+        to_representation = UserImportJobSerializer.to_representation
+
+        def slow_to_representation(serializer, instance):
+            time.sleep(0.05)
+            return to_representation(serializer, instance)
+
+        with mock.patch.object(UserImportJobSerializer, "to_representation", slow_to_representation):
+            response = self.client.get(f"/api/users/import/{job.job_id}/")
+
+        self.assertEqual(response.status_code, 200)
+        metrics = registry.snapshot()["UserViewSet.import_status"]
+        self.assertGreaterEqual(metrics["serialize_ms"]["max"], 50)
+        self.assertLess(metrics["view_ms"]["max"], 50)
@@ -1,20 +1,37 @@
+from itertools import islice
+
 from rest_framework import status, mixins, viewsets
 from rest_framework.views import APIView
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.reverse import reverse
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError
 from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from core.pagination import EnvelopeCursorPagination
+from core.serializers import ValuesSerializer
 
+from .authentication import bump_token_version, issue_tokens, revoke_tokens
+from .importer import parse_rows
+from .jobs import enqueue_import
+from .models import UserImportJob
 from .permissions import IsAdminRole
-from .serializers import UserSerializer
+from .serializers import UserImportJobSerializer, UserSerializer
 from ..courses.permissions import IsMentor
 
 User = get_user_model()
 
+IMPORT_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
 
 # --- Authentication Views ---
 
@@ -40,7 +57,7 @@ class RegisterView(APIView):
                 email=mail
             )
 
-            token = RefreshToken.for_user(user)
+            token = issue_tokens(user)
             return Response({
                 'data': {
                     'access': str(token.access_token),
@@ -86,7 +103,7 @@ class LoginView(APIView):
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
-        token = RefreshToken.for_user(user)
+        token = issue_tokens(user)
 
         return Response({
             "data": {
@@ -112,13 +129,13 @@ class UserViewSet(mixins.ListModelMixin,  # Enables GET /api/users/
 
     def list(self, request, *args, **kwargs):
         try:
-            # super().list() handles pagination and serialization automatically
-            response = super().list(request, *args, **kwargs)
+            values = ValuesSerializer(self.get_serializer_class(), context=self.get_serializer_context())
+            page = self.paginate_queryset(values.values(self.get_queryset()))
 
-            return Response({
-                'data': response.data,
-                'detail': 'Users fetched successfully',
-            }, status=status.HTTP_200_OK)
+            return self.paginator.get_paginated_response(
+                values.to_representation(page),
+                detail='Users fetched successfully'
+            )
 
         except Exception as e:
             return Response({
@@ -128,7 +145,9 @@ class UserViewSet(mixins.ListModelMixin,  # Enables GET /api/users/
     def destroy(self, request, *args, **kwargs):
         try:
             instance = self.get_object()  # Raises 404 automatically if not found
+            user_id = instance.pk
             self.perform_destroy(instance)
+            revoke_tokens(user_id)
 
             return Response({
                 'detail': 'User deleted successfully'
@@ -144,6 +163,66 @@ class UserViewSet(mixins.ListModelMixin,  # Enables GET /api/users/
                 'detail': f'Failed to delete user: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    # Custom Action: POST /api/users/import/
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_users(self, request):
+        """
+        Bulk user import (Admin only).
+        Body: CSV with a header row (Content-Type: text/csv) or one JSON object
+        per line (Content-Type: application/x-ndjson), with the columns
+        username, password, email, first_name, last_name and optional role
+        (student | mentor), up to USER_IMPORT_MAX_ROWS rows.
+
+        The rows are queued for `run_user_import_worker`, which hashes the
+        passwords on a process pool; answers 202 with the job to poll.
+        """
+        content_type = request.content_type.split(';')[0].strip()
+        fmt = IMPORT_CONTENT_TYPES.get(content_type)
+        if fmt is None:
+            return Response({
+                'detail': f'Unsupported content type. Use one of: {", ".join(IMPORT_CONTENT_TYPES)}'
+            }, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        stream = request.stream
+        lines = (line.decode('utf-8-sig') for line in stream) if stream is not None else iter(())
+        max_rows = settings.USER_IMPORT_MAX_ROWS
+
+        try:
+            rows = list(islice(parse_rows(lines, fmt), max_rows + 1))
+        except UnicodeDecodeError:
+            return Response({
+                'detail': 'The import must be UTF-8 encoded'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(rows) > max_rows:
+            return Response({
+                'detail': f'An import is limited to {max_rows} rows; use `manage.py import_users` for larger files'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+        job = enqueue_import(rows, created_by=request.user)
+
+        return Response({
+            'data': {
+                **UserImportJobSerializer(job).data,
+                'status_url': reverse('user-import-status', kwargs={'job_id': job.job_id}, request=request)
+            },
+            'detail': f'Import of {len(rows)} rows queued',
+        }, status=status.HTTP_202_ACCEPTED)
+
+    # Custom Action: GET /api/users/import/:job_id/
+    @action(detail=False, methods=['get'], url_path=r'import/(?P<job_id>[0-9a-f-]+)', url_name='import-status')
+    def import_status(self, request, job_id=None):
+        """
+        Status of a queued import; `summary` holds the created count and the
+        rejected rows once it is done.
+        """
+        job = get_object_or_404(UserImportJob, job_id=job_id)
+
+        return Response({
+            'data': UserImportJobSerializer(job).data,
+            'detail': 'Import job fetched successfully'
+        }, status=status.HTTP_200_OK)
+
     # Custom Action: PUT /api/users/:pk/approve-mentor/
     @action(detail=True, methods=['put'], url_path='approve-mentor')
     def approve_mentor(self, request, pk):
@@ -161,6 +240,8 @@ class UserViewSet(mixins.ListModelMixin,  # Enables GET /api/users/
 
             user.role = User.Role.MENTOR
             user.save()
+            # Tokens carry the role claim; make the user log in again
+            bump_token_version(user)
 
             return Response({
                 'detail': f'User {user.username} has been approved as mentor',
@@ -185,14 +266,16 @@ class MentorStudentListView(APIView):
 
     def get(self, request):
         try:
-            students = User.objects.filter(role=User.Role.STUDENT)
+            values = ValuesSerializer(UserSerializer)
+            students = values.values(User.objects.filter(role=User.Role.STUDENT))
 
-            serializer = UserSerializer(students, many=True)
+            paginator = EnvelopeCursorPagination()
+            page = paginator.paginate_queryset(students, request, view=self)
 
-            return Response({
-                "data": serializer.data,
-                "detail": "Students fetched successfully"
-            }, status=status.HTTP_200_OK)
+            return paginator.get_paginated_response(
+                values.to_representation(page),
+                detail="Students fetched successfully"
+            )
 
         except Exception as e:
             return Response({
@@ -0,0 +1,9 @@
+"""
+core.urls as served with ASYNC_READ_VIEWS on, for the ASGI side of the
+load benchmark (the setting itself is read once, when core.urls loads).
+"""
+from django.urls import include, path
+
+from core.urls import urlpatterns as project_urlpatterns
+
+urlpatterns = [path('api/', include('apps.courses.async_urls'))] + project_urlpatterns
@@ -0,0 +1,301 @@
+"""
+Concurrent load benchmark for the read endpoints: the same requests served
+through the WSGI handler (sync DRF views) and through the ASGI handler
+(the async read views).
+
+    cd backend
+    python -m benchmarks.load --output load.json
+    python -m benchmarks.load --concurrency 50 --db-latency-ms 2
+
+WSGI is driven like a sync worker with --threads request threads, ASGI
+like one event-loop worker with up to --concurrency requests in flight.
+Both call the handlers directly (no sockets) on the same seeded database,
+and every ASGI response body is compared with its WSGI twin, so the run
+also checks that the async views return what the DRF views do.
+
+Against the in-process SQLite database a request barely waits on I/O, so
+there is little for an async worker to overlap; --db-latency-ms adds that
+much latency to every query to stand in for a database on the network.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, fields
+from io import BytesIO
+from pathlib import Path
+
+from .run import percentile
+
+ENDPOINTS = ("enrolled_courses", "chapter_list", "my_progress")
+
+
+def request_mix(count, students=50):
+    """
+    `count` (endpoint, path, token) tuples cycling through the read
+    endpoints for up to `students` enrolled students.
+    """
+    from django.contrib.auth import get_user_model
+
+    from apps.courses.models import CourseAssignment
+    from apps.users.authentication import issue_tokens
+
+    User = get_user_model()
+
+    learners = list(
+        User.objects.filter(
+            role=User.Role.STUDENT,
+            assigned_courses__isnull=False
+        ).distinct().order_by("pk")[:students]
+    )
+    tokens = {learner.pk: str(issue_tokens(learner).access_token) for learner in learners}
+    courses = dict(
+        CourseAssignment.objects.filter(student__in=learners).order_by("-course_id").values_list("student_id", "course_id")
+    )
+
+    requests = []
+    for i in range(count):
+        learner = learners[(i // len(ENDPOINTS)) % len(learners)]
+        endpoint = ENDPOINTS[i % len(ENDPOINTS)]
+        path = {
+            "enrolled_courses": "/api/courses/enrolled/",
+            "chapter_list": f"/api/courses/{courses[learner.pk]}/chapters/",
+            "my_progress": "/api/progress/my/",
+        }[endpoint]
+        requests.append((endpoint, path, tokens[learner.pk]))
+    return requests
+
+
+def add_query_latency(seconds):
+    """
+    Sleeps `seconds` before every query on every connection, including
+    the ones request threads open later.
+    """
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        # Fired again on every reconnect of the same wrapper
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install, weak=False)
+    for connection in connections.all():
+        install(None, connection)
+
+
+def wsgi_get(application, path, token):
+    path, _, query = path.partition("?")
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": "testserver",
+        "HTTP_AUTHORIZATION": f"Bearer {token}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    started = []
+    response = application(environ, lambda status, headers, exc_info=None: started.append(status))
+    try:
+        body = b"".join(response)
+    finally:
+        # Fires request_finished, like a WSGI server would
+        response.close()
+    return int(started[0].split()[0]), body
+
+
+async def asgi_get(application, path, token):
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    status = next(message["status"] for message in messages if message["type"] == "http.response.start")
+    body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.response.body")
+    return status, body
+
+
+def run_wsgi(requests, threads):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    application = WSGIHandler()
+
+    def one(request):
+        _, path, token = request
+        start = time.perf_counter()
+        status, body = wsgi_get(application, path, token)
+        return status, body, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(one, requests))
+        return results, time.perf_counter() - start
+
+
+def run_asgi(requests, concurrency):
+    from django.core.handlers.asgi import ASGIHandler
+
+    application = ASGIHandler()
+
+    async def main():
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one(request):
+            _, path, token = request
+            async with slots:
+                start = time.perf_counter()
+                status, body = await asgi_get(application, path, token)
+                return status, body, time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(request) for request in requests))
+        return results, time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+def summarize(requests, results, seconds):
+    latencies = [elapsed * 1000 for _, _, elapsed in results]
+    per_endpoint = {}
+    for (endpoint, _, _), latency in zip(requests, latencies):
+        per_endpoint.setdefault(endpoint, []).append(latency)
+
+    return {
+        "requests": len(results),
+        "seconds": round(seconds, 3),
+        "throughput_rps": round(len(results) / seconds, 1),
+        "errors": sum(1 for status, _, _ in results if status != 200),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "endpoints": {
+            endpoint: {
+                "p50_ms": round(percentile(samples, 0.50), 3),
+                "p95_ms": round(percentile(samples, 0.95), 3),
+            }
+            for endpoint, samples in per_endpoint.items()
+        },
+    }
+
+
+def run(dataset, count, threads, concurrency, warmup, db_latency_ms):
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.test.utils import override_settings
+
+    from .seed import seed
+
+    call_command("migrate", verbosity=0)
+    seed(dataset)
+    requests = request_mix(count)
+    if db_latency_ms:
+        add_query_latency(db_latency_ms / 1000)
+
+    cache.clear()
+    run_wsgi(requests[:warmup], threads)
+    wsgi, wsgi_seconds = run_wsgi(requests, threads)
+
+    cache.clear()
+    with override_settings(ROOT_URLCONF="benchmarks.asgi_urls"):
+        run_asgi(requests[:warmup], concurrency)
+        asgi, asgi_seconds = run_asgi(requests, concurrency)
+
+    wsgi_summary = summarize(requests, wsgi, wsgi_seconds)
+    asgi_summary = summarize(requests, asgi, asgi_seconds)
+
+    return {
+        "meta": {
+            "dataset": asdict(dataset),
+            "requests": count,
+            "wsgi_threads": threads,
+            "asgi_concurrency": concurrency,
+            "db_latency_ms": db_latency_ms,
+        },
+        "wsgi": wsgi_summary,
+        "asgi": asgi_summary,
+        "asgi_speedup": round(asgi_summary["throughput_rps"] / wsgi_summary["throughput_rps"], 2),
+        # Requests whose status or body differed between the two
+        "mismatches": sum(
+            1 for (status, body, _), (other_status, other_body, _) in zip(wsgi, asgi)
+            if status != other_status or body != other_body
+        ),
+    }
+
+
+def main(argv=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    import django
+    django.setup()
+
+    from django.conf import settings
+
+    from .seed import Dataset
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__.split("\n\n")[0])
+    for field in fields(Dataset):
+        parser.add_argument(f"--{field.name}", type=field.type, default=field.default)
+    parser.add_argument("--requests", type=int, default=600, help="Requests per server model.")
+    parser.add_argument("--threads", type=int, default=1, help="WSGI request threads (default 1: a sync worker).")
+    parser.add_argument("--concurrency", type=int, default=20, help="ASGI requests in flight.")
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Added to every query.")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout).")
+    args = parser.parse_args(argv)
+
+    dataset = Dataset(**{field.name: getattr(args, field.name) for field in fields(Dataset)})
+    try:
+        results = run(dataset, args.requests, args.threads, args.concurrency, args.warmup, args.db_latency_ms)
+    finally:
+        if not os.getenv("BENCH_DIR"):
+            shutil.rmtree(settings.BENCH_DIR, ignore_errors=True)
+    report = json.dumps(results, indent=2) + "\n"
+
+    if args.output:
+        Path(args.output).write_text(report)
+    else:
+        sys.stdout.write(report)
+
+    if results["mismatches"] or results["wsgi"]["errors"] or results["asgi"]["errors"]:
+        print("Async and sync responses differ or requests failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
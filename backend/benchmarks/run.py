@@ -0,0 +1,333 @@
+"""
+Endpoint benchmark suite.
+
+Seeds a throwaway SQLite database, drives every route registered in
+apps/*/urls.py through the test client and reports p50/p95 latency and
+query counts per endpoint as JSON. With --check the results are compared
+against a committed baseline and the run fails on regressions.
+
+    cd backend
+    python -m benchmarks --output results.json
+    python -m benchmarks --check                # against benchmarks/baseline.json
+    python -m benchmarks --update-baseline      # after an intended change
+
+Every request runs inside a transaction that is rolled back afterwards, so
+writes (create, delete, complete, ...) are measured against the same data
+on every iteration. on_commit callbacks therefore never fire.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+from dataclasses import asdict, fields
+from pathlib import Path
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+APP_URLCONFS = ("apps.users.urls", "apps.courses.urls", "apps.certificates.urls")
+
+
+def scenarios(actors, job_id, import_job_id, uploads):
+    """
+    (name, user, method, path, body, content_type[, headers]) per endpoint.
+    Names are "<View>.<action>", matching the route inventory; variants add
+    a suffix.
+    """
+    from apps.courses.models import Chapter
+
+    course = actors.course
+    chapter_ids = list(
+        Chapter.objects.filter(course=course).order_by("sequence_number").values_list("pk", flat=True)
+    )
+    chapter_body = {
+        "title": "Benchmark chapter",
+        "description": "Created by the benchmark suite",
+        "video_url": "https://videos.example.com/new",
+        "sequence_number": 10_000,
+    }
+    import_body = "username,password,email,first_name,last_name,role\n" + "".join(
+        f"imported{i},pw-{i},imported{i}@example.com,Imported,{i},student\n" for i in range(20)
+    )
+
+    return [
+        ("RegisterView.post", None, "post", "/api/auth/register/", {
+            "username": "newcomer", "password": "newcomer-password", "email": "new@example.com",
+            "first_name": "New", "last_name": "Comer", "role": "student",
+        }, None),
+        ("LoginView.post", None, "post", "/api/auth/login/", {
+            "username": actors.student.username, "password": "bench-password",
+        }, None),
+        ("UserViewSet.list", actors.admin, "get", "/api/users/", None, None),
+        ("UserViewSet.import_users", actors.admin, "post", "/api/users/import/", import_body, "text/csv"),
+        ("UserViewSet.import_status", actors.admin, "get", f"/api/users/import/{import_job_id}/", None, None),
+        ("UserViewSet.destroy", actors.admin, "delete", f"/api/users/{actors.victim.pk}/", None, None),
+        ("UserViewSet.approve_mentor", actors.admin, "put",
+            f"/api/users/{actors.applicant.pk}/approve-mentor/", None, None),
+        ("MentorStudentListView.get", actors.mentor, "get", "/api/users/students/", None, None),
+
+        ("CourseViewSet.list", actors.admin, "get", "/api/courses/", None, None),
+        ("CourseViewSet.create", actors.mentor, "post", "/api/courses/",
+            {"title": "New course", "description": "Created by the benchmark suite"}, None),
+        ("CourseViewSet.my_courses", actors.mentor, "get", "/api/courses/my/", None, None),
+        ("CourseViewSet.enrolled_courses", actors.student, "get", "/api/courses/enrolled/", None, None),
+        ("CourseViewSet.update", actors.mentor, "put", f"/api/courses/{course.pk}/",
+            {"title": "Renamed course"}, None),
+        ("CourseViewSet.partial_update", actors.mentor, "patch", f"/api/courses/{course.pk}/",
+            {"description": "Updated by the benchmark suite"}, None),
+        ("CourseViewSet.destroy", actors.mentor, "delete", f"/api/courses/{course.pk}/", None, None),
+        ("CourseViewSet.progress_matrix", actors.mentor, "get",
+            f"/api/courses/{course.pk}/progress-matrix/", None, None),
+        ("CourseViewSet.progress_matrix[bitmap]", actors.mentor, "get",
+            f"/api/courses/{course.pk}/progress-matrix/?encoding=bitmap", None, None),
+        ("CourseViewSet.analytics", actors.admin, "get", "/api/courses/analytics/", None, None),
+        ("CourseViewSet.course_analytics", actors.admin, "get", f"/api/courses/{course.pk}/analytics/", None, None),
+        ("CourseViewSet.assign_course", actors.mentor, "post", f"/api/courses/{course.pk}/assign/",
+            {"student_id": actors.victim.pk}, None),
+        ("CourseViewSet.assign_course[bulk]", actors.mentor, "post", f"/api/courses/{course.pk}/assign/",
+            {"student_ids": list(range(1, 201))}, None),
+
+        ("ChapterViewSet.list", actors.student, "get", f"/api/courses/{course.pk}/chapters/", None, None),
+        ("ChapterViewSet.create", actors.mentor, "post", f"/api/courses/{course.pk}/chapters/",
+            chapter_body, None),
+
+        ("ChapterViewSet.create[bulk]", actors.mentor, "post", f"/api/courses/{course.pk}/chapters/",
+            [dict(chapter_body, sequence_number=10_000 + n) for n in range(20)], None),
+        ("ChapterViewSet.reorder", actors.mentor, "post", f"/api/courses/{course.pk}/chapters/reorder/",
+            {"chapter_ids": chapter_ids[::-1]}, None),
+
+        ("ChapterUploadViewSet.create", actors.mentor, "post", "/api/chapter-uploads/",
+            {"chapter": actors.next_chapter.pk, "filename": "cover.png", "size": len(uploads.image)}, None),
+        ("ChapterUploadViewSet.retrieve", actors.mentor, "get",
+            f"/api/chapter-uploads/{uploads.pending.upload_id}/", None, None),
+        ("ChapterUploadViewSet.chunk", actors.mentor, "put",
+            f"/api/chapter-uploads/{uploads.pending.upload_id}/chunk/", uploads.image, "application/octet-stream",
+            {"HTTP_CONTENT_RANGE": f"bytes 0-{len(uploads.image) - 1}/{len(uploads.image)}"}),
+        ("ChapterUploadViewSet.finalize", actors.mentor, "post",
+            f"/api/chapter-uploads/{uploads.complete.upload_id}/finalize/", None, None),
+
+        ("ProgressViewSet.complete_chapter", actors.student, "post",
+            f"/api/progress/{actors.next_chapter.pk}/complete/", None, None),
+        # Replays the rest of the course in one batch
+        ("ProgressViewSet.sync", actors.student, "post", "/api/progress/sync/",
+            {"completions": chapter_ids[chapter_ids.index(actors.next_chapter.pk):]}, None),
+        ("ProgressViewSet.my_progress", actors.student, "get", "/api/progress/my/", None, None),
+
+        ("CertificateViewSet.retrieve", actors.graduate, "get", f"/api/certificates/{course.pk}/", None, None),
+        ("CertificateViewSet.job_status", actors.graduate, "get", f"/api/certificates/jobs/{job_id}/", None, None),
+    ]
+
+
+def route_inventory():
+    """
+    "<View>.<action>" for every method of every route in APP_URLCONFS.
+    """
+    from importlib import import_module
+
+    from django.urls import URLResolver
+
+    names = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+                continue
+            cls = getattr(pattern.callback, "cls", None)
+            if cls is None or cls.__name__ == "APIRootView":
+                continue
+            actions = getattr(pattern.callback, "actions", None)
+            if actions:
+                names.update(f"{cls.__name__}.{action}" for action in actions.values())
+            else:
+                names.update(
+                    f"{cls.__name__}.{method}" for method in cls.http_method_names
+                    if method not in ("head", "options") and hasattr(cls, method)
+                )
+
+    for urlconf in APP_URLCONFS:
+        walk(import_module(urlconf).urlpatterns)
+    return names
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(client_for, scenario, iterations, warmup):
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+
+    name, user, method, path, body, content_type, *headers = scenario
+    client = client_for(user)
+    kwargs = {"content_type": content_type} if content_type else {"format": "json"}
+    if headers:
+        kwargs.update(headers[0])
+
+    def once(capture=False):
+        with transaction.atomic():
+            if capture:
+                with CaptureQueriesContext(connection) as queries:
+                    response = getattr(client, method)(path, body, **kwargs)
+            else:
+                start = time.perf_counter()
+                response = getattr(client, method)(path, body, **kwargs)
+                elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        return (response, len(queries)) if capture else (response, elapsed)
+
+    for _ in range(warmup):
+        once()
+    response, query_count = once(capture=True)
+    samples = [once()[1] * 1000 for _ in range(iterations)]
+
+    return {
+        "method": method.upper(),
+        "path": path,
+        "status": response.status_code,
+        "queries": query_count,
+        "p50_ms": round(percentile(samples, 0.50), 3),
+        "p95_ms": round(percentile(samples, 0.95), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def run(dataset, iterations, warmup, only=None):
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from rest_framework.test import APIClient
+
+    from apps.certificates.models import CertificateJob
+    from apps.users.authentication import issue_tokens
+    from apps.users.models import UserImportJob
+
+    from .seed import seed, seed_uploads
+
+    call_command("migrate", verbosity=0)
+    actors = seed(dataset)
+    cache.clear()
+
+    tokens = {}
+
+    def client_for(user):
+        client = APIClient()
+        if user is not None:
+            if user.pk not in tokens:
+                tokens[user.pk] = str(issue_tokens(user).access_token)
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens[user.pk]}")
+        return client
+
+    # Queue the graduate's certificate so the job status route has a job
+    client_for(actors.graduate).get(f"/api/certificates/{actors.course.pk}/")
+    job_id = CertificateJob.objects.values_list("job_id", flat=True).first()
+    # Likewise an import for the import status route
+    client_for(actors.admin).post(
+        "/api/users/import/", "username,password,email,first_name,last_name\n", content_type="text/csv"
+    )
+    import_job_id = UserImportJob.objects.values_list("job_id", flat=True).first()
+
+    uploads = seed_uploads(actors)
+
+    results = {}
+    for scenario in scenarios(actors, job_id, import_job_id, uploads):
+        if only and not any(pattern in scenario[0] for pattern in only):
+            continue
+        results[scenario[0]] = measure(client_for, scenario, iterations, warmup)
+
+    covered = {name.split("[")[0] for name in results}
+    missing = sorted(route_inventory() - covered) if not only else []
+
+    return {
+        "meta": {
+            "dataset": asdict(dataset),
+            "iterations": iterations,
+            "warmup": warmup,
+            "only": only or [],
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "uncovered_routes": missing,
+        "endpoints": results,
+    }
+
+
+def compare(results, baseline, threshold, slack_ms):
+    """
+    Regressions against `baseline`: more queries than before, or a p95
+    slower than baseline * threshold + slack_ms. Timings only compare
+    meaningfully on the same machine; query counts compare anywhere.
+    """
+    problems = []
+    for name, expected in baseline["endpoints"].items():
+        actual = results["endpoints"].get(name)
+        if actual is None:
+            # --only runs skip the rest of the baseline on purpose
+            if not results["meta"]["only"]:
+                problems.append(f"{name}: missing from this run")
+            continue
+        if actual["status"] != expected["status"]:
+            problems.append(f"{name}: status {expected['status']} -> {actual['status']}")
+        if actual["queries"] > expected["queries"]:
+            problems.append(f"{name}: queries {expected['queries']} -> {actual['queries']}")
+        limit = expected["p95_ms"] * threshold + slack_ms
+        if actual["p95_ms"] > limit:
+            problems.append(
+                f"{name}: p95 {expected['p95_ms']:.2f}ms -> {actual['p95_ms']:.2f}ms (limit {limit:.2f}ms)"
+            )
+    for name in results["uncovered_routes"]:
+        problems.append(f"{name}: route has no benchmark scenario")
+    return problems
+
+
+def main(argv=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    import django
+    django.setup()
+
+    from django.conf import settings
+
+    from .seed import Dataset
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n\n")[1])
+    for field in fields(Dataset):
+        parser.add_argument(f"--{field.name}", type=field.type, default=field.default)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", action="append", help="Only run endpoints whose name contains this.")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout).")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--check", action="store_true", help="Fail on regressions against --baseline.")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Allowed p95 ratio (default 1.5).")
+    parser.add_argument("--slack-ms", type=float, default=2.0, help="Absolute p95 allowance (default 2ms).")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite --baseline with this run.")
+    args = parser.parse_args(argv)
+
+    dataset = Dataset(**{field.name: getattr(args, field.name) for field in fields(Dataset)})
+    try:
+        results = run(dataset, args.iterations, args.warmup, only=args.only)
+    finally:
+        if not os.getenv("BENCH_DIR"):
+            shutil.rmtree(settings.BENCH_DIR, ignore_errors=True)
+    report = json.dumps(results, indent=2) + "\n"
+
+    if args.output:
+        Path(args.output).write_text(report)
+    elif not args.update_baseline:
+        sys.stdout.write(report)
+
+    if args.update_baseline:
+        Path(args.baseline).write_text(report)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+
+    if args.check:
+        problems = compare(results, json.loads(Path(args.baseline).read_text()), args.threshold, args.slack_ms)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            return 1
+        print("No regressions against the baseline.", file=sys.stderr)
+    return 0
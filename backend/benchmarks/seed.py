@@ -0,0 +1,184 @@
+"""
+Deterministic dataset for the benchmark suite.
+"""
+import os
+import random
+from dataclasses import dataclass
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from PIL import Image
+
+from apps.courses.models import Chapter, ChapterProgress, ChapterUpload, Course, CourseAssignment
+from apps.courses.uploads import partial_path
+from apps.courses.utils import refresh_course_counters, refresh_course_stats
+
+User = get_user_model()
+
+PASSWORD = "bench-password"
+
+
+@dataclass
+class Dataset:
+    mentors: int = 20
+    courses: int = 200
+    chapters: int = 20
+    students: int = 2000
+    # Courses each student is enrolled in
+    enrollments: int = 5
+    # Average fraction of an enrolled course's chapters a student completed
+    progress: float = 0.5
+    seed: int = 42
+
+
+@dataclass
+class Actors:
+    """
+    The users and rows the benchmark scenarios act on.
+    """
+    admin: object
+    mentor: object
+    applicant: object
+    student: object
+    graduate: object
+    victim: object
+    course: object
+    next_chapter: object
+
+
+@dataclass
+class Uploads:
+    """
+    Chunked uploads for the upload routes: one nothing was sent to yet and
+    one whose bytes have all arrived, plus the image both carry.
+    """
+    pending: object
+    complete: object
+    image: bytes
+
+
+def seed(dataset):
+    rng = random.Random(dataset.seed)
+    password = make_password(PASSWORD)
+    now = timezone.now()
+
+    def users(prefix, count, role, **extra):
+        return User.objects.bulk_create([
+            User(
+                username=f"{prefix}{i}",
+                email=f"{prefix}{i}@example.com",
+                first_name=prefix.title(),
+                last_name=str(i),
+                password=password,
+                role=role,
+                **extra
+            )
+            for i in range(count)
+        ], batch_size=1000)
+
+    with transaction.atomic():
+        admin, = users("admin", 1, User.Role.ADMIN, is_approved=True)
+        mentors = users("mentor", max(dataset.mentors, 1), User.Role.MENTOR, is_approved=True)
+        # Named students on top of the dataset: a typical learner, one who
+        # finished a course (certificates), one the delete route removes and
+        # one the admin promotes to mentor
+        student, graduate, victim, applicant = users("actor", 4, User.Role.STUDENT)
+        students = users("student", dataset.students, User.Role.STUDENT)
+
+        courses = Course.objects.bulk_create([
+            Course(
+                mentor=mentors[i % len(mentors)],
+                title=f"Course {i}",
+                description="Benchmark course " * 8,
+                created_at=now,
+            )
+            for i in range(max(dataset.courses, 2))
+        ], batch_size=1000)
+
+        Chapter.objects.bulk_create([
+            Chapter(
+                course=course,
+                title=f"Chapter {n}",
+                description="Benchmark chapter " * 16,
+                video_url=f"https://videos.example.com/{course.pk}/{n}",
+                sequence_number=n,
+            )
+            for course in courses
+            for n in range(1, max(dataset.chapters, 2) + 1)
+        ], batch_size=2000)
+
+        chapters = {}
+        for chapter_id, course_id in Chapter.objects.order_by("sequence_number").values_list("pk", "course_id"):
+            chapters.setdefault(course_id, []).append(chapter_id)
+
+        assignments = []
+        progress = []
+
+        def enroll(learner, course, completed):
+            assignments.append(CourseAssignment(student=learner, course=course))
+            progress.extend(
+                ChapterProgress(student=learner, chapter_id=chapter_id, completed=True, completed_at=now)
+                for chapter_id in chapters[course.pk][:completed]
+            )
+
+        per_student = min(dataset.enrollments, len(courses))
+        for learner in students + [victim]:
+            for course in rng.sample(courses, per_student):
+                total = len(chapters[course.pk])
+                # Completion is sequential, so progress is always a prefix
+                done = min(total, max(0, round(rng.gauss(dataset.progress, 0.25) * total)))
+                enroll(learner, course, done)
+
+        course = courses[0]
+        enroll(student, course, len(chapters[course.pk]) // 2)
+        enroll(student, courses[1], 0)
+        enroll(graduate, course, len(chapters[course.pk]))
+
+        CourseAssignment.objects.bulk_create(assignments, batch_size=2000)
+        ChapterProgress.objects.bulk_create(progress, batch_size=5000)
+
+        refresh_course_counters()
+        refresh_course_stats()
+
+    next_chapter = Chapter.objects.get(
+        course=course,
+        sequence_number=len(chapters[course.pk]) // 2 + 1
+    )
+
+    return Actors(
+        admin=admin,
+        mentor=course.mentor,
+        applicant=applicant,
+        student=student,
+        graduate=graduate,
+        victim=victim,
+        course=course,
+        next_chapter=next_chapter,
+    )
+
+
+def seed_uploads(actors):
+    buffer = BytesIO()
+    Image.new("RGB", (640, 480), (30, 90, 160)).save(buffer, "PNG")
+    image = buffer.getvalue()
+
+    pending, complete = (
+        ChapterUpload.objects.create(
+            chapter=actors.next_chapter,
+            owner=actors.mentor,
+            filename="cover.png",
+            size=len(image),
+            offset=offset,
+        )
+        for offset in (0, len(image))
+    )
+
+    os.makedirs(os.path.dirname(partial_path(complete)), exist_ok=True)
+    with open(partial_path(complete), "wb") as f:
+        f.write(image)
+
+    return Uploads(pending=pending, complete=complete, image=image)
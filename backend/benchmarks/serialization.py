@@ -0,0 +1,141 @@
+"""
+Serialization benchmark for the list endpoints: DRF's ModelSerializer +
+JSONRenderer against ValuesSerializer + FastJSONRenderer on the same rows.
+
+    cd backend
+    python -m benchmarks.serialization --output serialization.json
+
+Each case serializes and renders every row of a list queryset (users,
+courses with their nested chapters, chapters), queries included, and
+fails if the two paths do not produce the same bytes.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from dataclasses import asdict, fields
+from pathlib import Path
+
+from .run import percentile
+
+
+def cases():
+    """
+    (name, serializer_class, legacy queryset, values queryset) per list.
+    """
+    from django.contrib.auth import get_user_model
+
+    from apps.courses.models import Chapter, Course
+    from apps.courses.serializers import ChapterSerializer, CourseSerializer
+    from apps.users.serializers import UserSerializer
+
+    User = get_user_model()
+
+    return [
+        ("users", UserSerializer, User.objects.order_by("pk"), User.objects.order_by("pk")),
+        # The legacy path with the usual prefetch (no N+1)
+        ("courses", CourseSerializer, Course.objects.prefetch_related("chapters").order_by("pk"),
+            Course.objects.order_by("pk")),
+        ("chapters", ChapterSerializer, Chapter.objects.order_by("pk"), Chapter.objects.order_by("pk")),
+    ]
+
+
+def measure(render, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        body = render()
+        timings.append((time.perf_counter() - start) * 1000)
+    return body, {
+        "p50_ms": round(percentile(timings, 0.50), 2),
+        "p95_ms": round(percentile(timings, 0.95), 2),
+    }
+
+
+def run(dataset, iterations):
+    from django.core.management import call_command
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIRequestFactory
+
+    from core import renderers
+    from core.serializers import ValuesSerializer
+
+    from .seed import seed
+
+    call_command("migrate", verbosity=0)
+    seed(dataset)
+    context = {"request": APIRequestFactory().get("/api/")}
+
+    results = {}
+    for name, serializer_class, legacy_queryset, values_queryset in cases():
+        def legacy():
+            data = serializer_class(legacy_queryset.all(), many=True, context=context).data
+            return JSONRenderer().render(data)
+
+        def fast():
+            values = ValuesSerializer(serializer_class, context=context)
+            return renderers.FastJSONRenderer().render(values.to_representation(values.values(values_queryset.all())))
+
+        legacy_body, legacy_timing = measure(legacy, iterations)
+        fast_body, fast_timing = measure(fast, iterations)
+        results[name] = {
+            "rows": values_queryset.count(),
+            "bytes": len(fast_body),
+            "legacy": legacy_timing,
+            "fast": fast_timing,
+            "speedup": round(legacy_timing["p50_ms"] / fast_timing["p50_ms"], 2),
+            "identical": legacy_body == fast_body,
+        }
+
+    return {
+        "meta": {
+            "dataset": asdict(dataset),
+            "iterations": iterations,
+            "orjson": renderers.orjson is not None,
+        },
+        "cases": results,
+    }
+
+
+def main(argv=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    import django
+    django.setup()
+
+    from django.conf import settings
+
+    from .seed import Dataset
+
+    # ~10k rows per list by default
+    defaults = {"students": 10000, "courses": 1000, "chapters": 10, "enrollments": 1}
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization", description=__doc__.split("\n\n")[0])
+    for field in fields(Dataset):
+        parser.add_argument(f"--{field.name}", type=field.type, default=defaults.get(field.name, field.default))
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout).")
+    args = parser.parse_args(argv)
+
+    dataset = Dataset(**{field.name: getattr(args, field.name) for field in fields(Dataset)})
+    try:
+        results = run(dataset, args.iterations)
+    finally:
+        if not os.getenv("BENCH_DIR"):
+            shutil.rmtree(settings.BENCH_DIR, ignore_errors=True)
+    report = json.dumps(results, indent=2) + "\n"
+
+    if args.output:
+        Path(args.output).write_text(report)
+    else:
+        sys.stdout.write(report)
+
+    if not all(case["identical"] for case in results["cases"].values()):
+        print("ValuesSerializer output differs from the ModelSerializer output", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Settings for the endpoint benchmark suite (and the test suite): the
+project settings on a throwaway SQLite database, with no network services.
+"""
+import os
+import tempfile
+
+from core.settings import *  # noqa: F401,F403
+
+BENCH_DIR = os.getenv("BENCH_DIR") or tempfile.mkdtemp(prefix="lms-bench-")
+
+DEBUG = False
+ALLOWED_HOSTS = ["testserver"]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(BENCH_DIR, "bench.sqlite3"),
+        # A file, not shared-cache memory, so threaded tests wait on locks
+        "TEST": {"NAME": os.path.join(BENCH_DIR, "test.sqlite3")},
+    }
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+MEDIA_ROOT = os.path.join(BENCH_DIR, "media")
+CHAPTER_UPLOAD_DIR = os.path.join(BENCH_DIR, "uploads")
+
+# Password hashing would dominate the auth endpoints and says nothing
+# about the code under test
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+REQUEST_METRICS = False
+# core.urls serves the DRF views; the load benchmark mounts the async ones itself
+ASYNC_READ_VIEWS = False
+CERTIFICATE_RENDERING = "background"
+CERTIFICATE_DELIVERY = "direct"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "loggers": {"django.request": {"level": "CRITICAL"}},
+}
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Backends whose entries live in one process only
+PROCESS_LOCAL_CACHES = {"django.core.cache.backends.locmem.LocMemCache"}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Enrollment sets and token versions are cached, and invalidated by the
+    worker that handles the write. With several workers, a process-local
+    cache keeps serving revoked tokens and stale enrollments elsewhere
+    until the entries expire.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if settings.WEB_CONCURRENCY > 1 and backend in PROCESS_LOCAL_CACHES:
+        return [
+            Error(
+                f"WEB_CONCURRENCY is {settings.WEB_CONCURRENCY} but the default cache ({backend}) "
+                "is per process, so enrollment and token revocation invalidations "
+                "would only reach one worker.",
+                hint="Set REDIS_URL to share the cache between workers.",
+                id="core.E001",
+            )
+        ]
+    return []
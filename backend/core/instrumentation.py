@@ -0,0 +1,261 @@
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Upper bounds of the histogram buckets; the last bucket is open ended
+DURATION_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+METRICS = {
+    "wall_ms": DURATION_BUCKETS_MS,
+    "sql_ms": DURATION_BUCKETS_MS,
+    "view_ms": DURATION_BUCKETS_MS,
+    "serialize_ms": DURATION_BUCKETS_MS,
+    "render_ms": DURATION_BUCKETS_MS,
+    "sql_count": QUERY_COUNT_BUCKETS,
+}
+
+# The recorder of the request being measured on this thread / task, if any
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestRecorder:
+    __slots__ = (
+        "action", "sql_count", "sql_seconds", "view_started", "view_seconds",
+        "serializing", "serialize_seconds", "render_seconds",
+    )
+
+    def __init__(self):
+        self.action = None
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        # (perf_counter, sql_seconds, serialize_seconds) when the view was called
+        self.view_started = None
+        self.view_seconds = 0.0
+        self.serializing = False
+        self.serialize_seconds = 0.0
+        self.render_seconds = 0.0
+
+    def start_view(self):
+        self.view_started = (time.perf_counter(), self.sql_seconds, self.serialize_seconds)
+
+    def end_view(self):
+        # Time spent in the view outside SQL and serialization: permission
+        # checks, validation, the view's own logic
+        if self.view_started is not None:
+            started, sql_seconds, serialize_seconds = self.view_started
+            self.view_seconds = (
+                time.perf_counter() - started
+                - (self.sql_seconds - sql_seconds)
+                - (self.serialize_seconds - serialize_seconds)
+            )
+            self.view_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - start
+            self.sql_count += 1
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Counts the block, outside SQL, as serialization time of the request
+    being measured (a no-op otherwise). Nested blocks, e.g. a serializer's
+    .data inside a ValuesSerializer, are counted once.
+    """
+    recorder = _current.get()
+    if recorder is None or recorder.serializing:
+        yield
+        return
+
+    recorder.serializing = True
+    start = time.perf_counter()
+    sql_seconds = recorder.sql_seconds
+    try:
+        yield
+    finally:
+        recorder.serializing = False
+        recorder.serialize_seconds += time.perf_counter() - start - (recorder.sql_seconds - sql_seconds)
+
+
+class Histogram:
+    __slots__ = ("bounds", "buckets", "count", "total", "max")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """
+        Upper bound of the bucket holding the q-th observation (None when it
+        falls in the open-ended bucket).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def as_dict(self):
+        labels = [f"le_{bound}" for bound in self.bounds] + ["inf"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process histograms keyed by view action. Each worker process keeps
+    its own numbers, so read them per process (or scrape every worker).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._actions = {}
+
+    def record(self, action, values):
+        with self._lock:
+            histograms = self._actions.get(action)
+            if histograms is None:
+                histograms = self._actions[action] = {
+                    name: Histogram(bounds) for name, bounds in METRICS.items()
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                action: {name: histogram.as_dict() for name, histogram in histograms.items()}
+                for action, histograms in sorted(self._actions.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._actions.clear()
+
+
+registry = MetricsRegistry()
+
+
+def view_action_name(request, view_func):
+    """
+    "CourseViewSet.my_courses" for viewsets, "LoginView.post" for APIViews,
+    the dotted function path otherwise.
+    """
+    method = request.method.lower()
+    cls = getattr(view_func, "cls", None)
+    if cls is not None:
+        actions = getattr(view_func, "actions", None) or {}
+        return f"{cls.__name__}.{actions.get(method, method)}"
+    return f"{view_func.__module__}.{getattr(view_func, '__qualname__', view_func.__class__.__name__)}"
+
+
+class RequestMetricsMiddleware:
+    """
+    Records SQL count, SQL time, view time (outside SQL and serialization:
+    permission checks, validation), serialization time (see
+    timed_serialization), render time and wall time per view action when
+    REQUEST_METRICS is on.
+
+    Only a REQUEST_METRICS_SAMPLE_RATE fraction of requests is measured;
+    the rest pass straight through. Measured requests feed the in-process
+    histograms and, with REQUEST_METRICS_SERVER_TIMING, get a Server-Timing
+    header.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.REQUEST_METRICS_SAMPLE_RATE
+        self.server_timing = settings.REQUEST_METRICS_SERVER_TIMING
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = RequestRecorder()
+        token = _current.set(recorder)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                # DRF responses are rendered inside get_response, so
+                # rendering is part of the wall time
+                response = self.get_response(request)
+                # Responses that are not rendered afterwards
+                recorder.end_view()
+        finally:
+            _current.reset(token)
+        wall_seconds = time.perf_counter() - start
+
+        registry.record(recorder.action or "unresolved", {
+            "wall_ms": wall_seconds * 1000,
+            "sql_ms": recorder.sql_seconds * 1000,
+            "view_ms": recorder.view_seconds * 1000,
+            "serialize_ms": recorder.serialize_seconds * 1000,
+            "render_ms": recorder.render_seconds * 1000,
+            "sql_count": recorder.sql_count,
+        })
+
+        if self.server_timing:
+            response["Server-Timing"] = ", ".join([
+                f'db;dur={recorder.sql_seconds * 1000:.2f};desc="{recorder.sql_count} queries"',
+                f"view;dur={recorder.view_seconds * 1000:.2f}",
+                f"serialize;dur={recorder.serialize_seconds * 1000:.2f}",
+                f"render;dur={recorder.render_seconds * 1000:.2f}",
+                f"total;dur={wall_seconds * 1000:.2f}",
+            ])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        recorder = _current.get()
+        if recorder is not None:
+            recorder.action = view_action_name(request, view_func)
+            recorder.start_view()
+        return None
+
+    def process_template_response(self, request, response):
+        # Called with the view's (DRF) response right before it is rendered
+        recorder = _current.get()
+        if recorder is not None:
+            recorder.end_view()
+            render_started = time.perf_counter()
+
+            def rendered(response):
+                recorder.render_seconds = time.perf_counter() - render_started
+
+            response.add_post_render_callback(rendered)
+        return response
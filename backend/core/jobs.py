@@ -0,0 +1,178 @@
+"""
+Database-backed job queues: the fields every queue entry shares, the
+claim / requeue helpers and the polling worker command behind
+`run_certificate_worker` and `run_image_worker`. The queue lives in the
+database, so no external broker is needed.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class QueueJob(models.Model):
+    """
+    Abstract queue entry. Workers move it PENDING -> RUNNING (claim_jobs)
+    -> DONE, or back to PENDING for a retry until it runs out of attempts
+    and becomes FAILED.
+    """
+    class Status(models.IntegerChoices):
+        PENDING = 1, 'Pending'
+        RUNNING = 2, 'Running'
+        DONE = 3, 'Done'
+        FAILED = 4, 'Failed'
+
+    status = models.PositiveSmallIntegerField(choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    # When a worker last claimed the job
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    def retry_status(self, max_attempts):
+        """
+        Status after a failed attempt: PENDING again while attempts remain.
+        """
+        if self.attempts < max_attempts:
+            return self.Status.PENDING
+        return self.Status.FAILED
+
+
+def requeue_stale_jobs(model, timeout):
+    """
+    Puts RUNNING jobs claimed more than `timeout` ago (their worker died)
+    back in the queue.
+    """
+    now = timezone.now()
+    return model.objects.filter(
+        status=QueueJob.Status.RUNNING,
+        locked_at__lt=now - timeout
+    ).update(status=QueueJob.Status.PENDING, updated_at=now)
+
+
+def claim_jobs(queryset, limit):
+    """
+    Moves up to `limit` pending jobs (oldest first) to RUNNING and returns
+    them, fetched through `queryset` (add select_related there).
+    Each claim is a conditional update, so concurrent workers never pick up
+    the same job; on databases with SKIP LOCKED they also skip each other's
+    candidates instead of contending for them.
+    """
+    model = queryset.model
+    now = timezone.now()
+
+    with transaction.atomic():
+        pending = model.objects.filter(status=QueueJob.Status.PENDING).order_by('created_at')
+
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+
+        claimed = [
+            pk for pk in pending.values_list('pk', flat=True)[:limit]
+            if model.objects.filter(
+                pk=pk,
+                status=QueueJob.Status.PENDING
+            ).update(
+                status=QueueJob.Status.RUNNING,
+                attempts=F('attempts') + 1,
+                locked_at=now,
+                updated_at=now
+            )
+        ]
+
+    return list(queryset.filter(pk__in=claimed))
+
+
+def setup_django():
+    """
+    Process pool initializer for jobs that use Django in the workers;
+    needed where they are spawned rather than forked (macOS, Windows).
+    """
+    import django
+    django.setup()
+
+
+class JobWorkerCommand(BaseCommand):
+    """
+    Polls a QueueJob model and processes claimed batches on a local process
+    pool. Subclasses set `model`, `stale_seconds` (RUNNING jobs silent for
+    longer are requeued) and the labels, and implement claim / process.
+    Set `pool_initializer` (e.g. setup_django) to run in every pool process.
+    """
+    model = None
+    stale_seconds = 300
+    pool_initializer = None
+    worker_name = "Worker"
+    job_name = "job"
+    pool_purpose = "processing"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help=f"Size of the {self.pool_purpose} process pool (default: CPU count).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Jobs claimed per poll (default: 2 x processes).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling forever.",
+        )
+
+    def claim(self, limit):
+        raise NotImplementedError
+
+    def process(self, jobs, pool):
+        """
+        Runs the claimed jobs on `pool`; returns how many were processed.
+        """
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        processes = max(1, options["processes"])
+        batch_size = options["batch_size"] or processes * 2
+        stale_after = timedelta(seconds=self.stale_seconds)
+
+        self.stdout.write(f"{self.worker_name} started with {processes} process(es)")
+
+        processed = 0
+        with ProcessPoolExecutor(max_workers=processes, initializer=self.pool_initializer) as pool:
+            try:
+                while True:
+                    close_old_connections()
+                    requeue_stale_jobs(self.model, stale_after)
+
+                    jobs = self.claim(batch_size)
+                    if jobs:
+                        processed += self.process(jobs, pool)
+                        continue
+
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} {self.job_name}(s)"))
@@ -0,0 +1,70 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class _PageQuery:
+    """
+    Stands in for the queryset while CursorPagination.paginate_queryset
+    runs: the ordering and cursor filter it applies go to the real
+    queryset, and taking the page slice records the sliced queryset
+    (`query`) and returns `rows` instead of running it.
+    """
+
+    def __init__(self, queryset, rows=()):
+        self.queryset = queryset
+        self.rows = list(rows)
+        self.query = None
+
+    def order_by(self, *fields):
+        self.queryset = self.queryset.order_by(*fields)
+        return self
+
+    def filter(self, *args, **kwargs):
+        self.queryset = self.queryset.filter(*args, **kwargs)
+        return self
+
+    def __getitem__(self, key):
+        self.query = self.queryset[key]
+        return self.rows
+
+    def __getattr__(self, name):
+        # e.g. `model` for ordering filters
+        return getattr(self.queryset, name)
+
+
+class EnvelopeCursorPagination(CursorPagination):
+    """
+    Keyset pagination ordered on the primary key.
+
+    Deep pages cost the same as the first one because each page is a
+    `WHERE id > cursor LIMIT n` lookup on the PK index. Responses keep the
+    API's {"data": ..., "detail": ...} envelope and add `next`/`previous`
+    cursor links.
+
+    Async views use `apaginate_queryset` / `get_paginated_data`, which
+    fetch the page through the async ORM and produce the same payload.
+    """
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # DRF's paginate_queryset runs twice: once to build the page query,
+        # which is then fetched through the async ORM, and once more over
+        # the fetched rows to set the page and the cursor positions
+        page = _PageQuery(queryset)
+        if self.paginate_queryset(page, request, view) is None:
+            return None
+        rows = [obj async for obj in page.query]
+        return self.paginate_queryset(_PageQuery(queryset, rows), request, view)
+
+    def get_paginated_data(self, data, detail=None):
+        return {
+            "data": data,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "detail": detail,
+        }
+
+    def get_paginated_response(self, data, detail=None):
+        return Response(self.get_paginated_data(data, detail))
@@ -0,0 +1,304 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import ManyToOneRel
+from rest_framework import fields, relations, serializers
+
+from .instrumentation import timed_serialization
+
+# DRF fields whose to_representation is a plain type conversion
+_CONVERSIONS = {
+    fields.IntegerField: int,
+    fields.CharField: str,
+    fields.EmailField: str,
+    fields.URLField: str,
+    fields.SlugField: str,
+    fields.BooleanField: bool,
+}
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for the list output of a ModelSerializer.
+
+    The serializer's fields are compiled once per class into
+    (key, column, conversion) steps, and rows from `.values(*columns)` are
+    turned into dicts with them: no model instances and no per-field
+    get_attribute walk. Every step ends in the DRF field's own
+    to_representation, so the result equals
+    `serializer_class(instances, many=True, context=context).data`.
+
+    Supported fields: model columns, forward foreign keys (as pks),
+    `get_<field>_display` sources, file/image URLs, nested many=True
+    ModelSerializers over a reverse foreign key (one extra query, like
+    prefetch_related) and SerializerMethodFields whose serializer defines
+    `represent_<name>(value)` for the model column of the same name.
+
+    Serializers that override to_representation are rejected: the rows
+    never go through it.
+
+    `fields` limits the output to those keys (None: all of them) and
+    `nested_fields` does the same per nested serializer. Columns and nested
+    queries of the keys left out are not fetched at all.
+
+        values = ValuesSerializer(CourseSerializer, context=..., fields=["id", "title"])
+        page = paginator.paginate_queryset(Course.objects.values(*values.columns), request)
+        data = values.to_representation(page)
+    """
+
+    def __init__(self, serializer_class, context=None, fields=None, nested_fields=None):
+        self.serializer_class = serializer_class
+        self.context = context or {}
+        self.plan = compile_serializer(serializer_class)
+        if fields is not None or nested_fields:
+            self.plan = self.plan.only(fields, nested_fields or {})
+
+    @property
+    def columns(self):
+        return self.plan.columns
+
+    def values(self, queryset=None):
+        """
+        `queryset` (default: every row of the model) as .values() rows.
+        """
+        if queryset is None:
+            queryset = self.plan.model._default_manager.all()
+        return queryset.values(*self.columns)
+
+    def nested_querysets(self, rows):
+        """
+        {key: queryset} of the rows each nested field loads for `rows`.
+        """
+        return {step.key: self.plan.related_rows(step, rows) for step in self.plan.nested}
+
+    def to_representation(self, rows):
+        with timed_serialization():
+            rows = list(rows)
+            nested = {
+                step.key: _group(list(self.plan.related_rows(step, rows)), step.fk_name)
+                for step in self.plan.nested
+            }
+            return self._build(rows, nested)
+
+    async def ato_representation(self, rows):
+        with timed_serialization():
+            nested = {
+                step.key: _group([row async for row in self.plan.related_rows(step, rows)], step.fk_name)
+                for step in self.plan.nested
+            }
+            return self._build(rows, nested)
+
+    def _build(self, rows, nested):
+        converters = self.plan.bind(self.context, nested)
+        data = []
+        for row in rows:
+            item = {}
+            for key, column, convert, none_is_null in converters:
+                value = row[column]
+                item[key] = None if value is None and none_is_null else convert(value)
+            data.append(item)
+        return data
+
+
+class ModelSerializer(serializers.ModelSerializer):
+    """
+    Base for the apps' output serializers: `.data` is timed as
+    serialization in the request metrics.
+    """
+
+    @property
+    def data(self):
+        with timed_serialization():
+            return super().data
+
+
+def _group(rows, fk_name):
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[fk_name], []).append(row)
+    return groups
+
+
+class _Step:
+    __slots__ = ("key", "column", "kind", "field", "extra")
+
+    def __init__(self, key, column, kind, field=None, extra=None):
+        self.key = key
+        self.column = column
+        self.kind = kind
+        self.field = field
+        self.extra = extra
+
+
+class _NestedStep(_Step):
+    __slots__ = ("plan", "fk_name")
+
+    def __init__(self, key, column, plan, fk_name):
+        super().__init__(key, column, "nested")
+        self.plan = plan
+        self.fk_name = fk_name
+
+
+class _Plan:
+    def __init__(self, serializer_class, model, steps):
+        self.serializer_class = serializer_class
+        self.model = model
+        self.steps = steps
+        self.nested = [step for step in steps if step.kind == "nested"]
+        self.pk = model._meta.pk.name
+        # The primary key is always fetched: pagination cursors and nested
+        # lookups need it even when no output field shows it
+        self.columns = tuple(dict.fromkeys([self.pk] + [step.column for step in steps]))
+
+    @property
+    def keys(self):
+        return [step.key for step in self.steps]
+
+    def only(self, keys, nested_fields):
+        """
+        A plan for the `keys` subset of this one (None: every key), with
+        the nested plans in `nested_fields` narrowed the same way.
+        """
+        steps = []
+        for step in self.steps:
+            if keys is not None and step.key not in keys:
+                continue
+            if step.kind == "nested" and nested_fields.get(step.key) is not None:
+                step = _NestedStep(step.key, step.column, step.plan.only(nested_fields[step.key], {}), step.fk_name)
+            steps.append(step)
+        return _Plan(self.serializer_class, self.model, steps)
+
+    def related_rows(self, step, rows):
+        """
+        The nested step's rows for every parent in `rows`, in the related
+        model's default ordering (what prefetch_related would load).
+        """
+        child = step.plan
+        return child.model._default_manager.filter(
+            **{f"{step.fk_name}__in": [row[self.pk] for row in rows]}
+        ).values(*dict.fromkeys(child.columns + (step.fk_name,)))
+
+    def bind(self, context, nested):
+        """
+        The steps as (key, column, convert, none_is_null) for one call.
+        """
+        serializer = None
+        converters = []
+        for step in self.steps:
+            none_is_null = True
+            if step.kind == "convert":
+                convert = step.extra
+            elif step.kind == "field":
+                convert = step.field.to_representation
+            elif step.kind == "display":
+                choices, to_representation = step.extra, step.field.to_representation
+                convert = lambda value, choices=choices, rep=to_representation: rep(choices.get(value, value))
+            elif step.kind == "file":
+                convert = _file_url(step.extra, context.get("request"))
+            elif step.kind == "method":
+                if serializer is None:
+                    serializer = self.serializer_class(context=context)
+                convert = getattr(serializer, f"represent_{step.key}")
+                # SerializerMethodField calls its method whatever the value
+                none_is_null = False
+            else:
+                child = step.plan.bind(context, {})
+                children = nested[step.key]
+                convert = lambda pk, child=child, children=children: [
+                    {key: None if row[column] is None and null else fn(row[column]) for key, column, fn, null in child}
+                    for row in children.get(pk, ())
+                ]
+            converters.append((step.key, step.column, convert, none_is_null))
+        return converters
+
+
+def _file_url(storage, request):
+    # FileField.to_representation for a stored name
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    if serializer_class.to_representation is not serializers.Serializer.to_representation:
+        raise ImproperlyConfigured(
+            f"{serializer_class.__name__} overrides to_representation, which ValuesSerializer would bypass"
+        )
+
+    model = serializer_class.Meta.model
+    opts = model._meta
+    steps = []
+
+    for field in serializer_class().fields.values():
+        if field.write_only:
+            continue
+        key, source = field.field_name, field.source
+
+        if isinstance(field, serializers.ListSerializer):
+            relation = _model_field(opts, source)
+            if not isinstance(relation, ManyToOneRel) or not isinstance(field.child, serializers.ModelSerializer):
+                raise _unsupported(serializer_class, key)
+            child_plan = compile_serializer(type(field.child))
+            if child_plan.nested:
+                raise _unsupported(serializer_class, key)
+            steps.append(_NestedStep(key, opts.pk.name, child_plan, relation.field.name))
+
+        elif isinstance(field, serializers.SerializerMethodField):
+            represent = f"represent_{key}"
+            if not hasattr(serializer_class, represent) or _model_field(opts, key) is None:
+                raise _unsupported(serializer_class, key)
+            # A subclass overriding get_<field> alone would be bypassed
+            if not issubclass(_defined_in(serializer_class, represent), _defined_in(serializer_class, field.method_name)):
+                raise _unsupported(serializer_class, key)
+            steps.append(_Step(key, key, "method"))
+
+        elif isinstance(field, relations.PrimaryKeyRelatedField):
+            if field.pk_field is not None or _model_field(opts, source) is None:
+                raise _unsupported(serializer_class, key)
+            # .values("<fk>") already holds the related pk
+            steps.append(_Step(key, source, "convert", extra=lambda pk: pk))
+
+        elif source.startswith("get_") and source.endswith("_display"):
+            model_field = _model_field(opts, source[4:-8])
+            if model_field is None or not model_field.choices:
+                raise _unsupported(serializer_class, key)
+            choices = {value: str(label) for value, label in model_field.flatchoices}
+            steps.append(_Step(key, model_field.name, "display", field, choices))
+
+        elif isinstance(field, fields.FileField):
+            model_field = _model_field(opts, source)
+            if model_field is None or not getattr(field, "use_url", True):
+                raise _unsupported(serializer_class, key)
+            steps.append(_Step(key, source, "file", field, model_field.storage))
+
+        elif isinstance(field, relations.RelatedField) or "." in source or _model_field(opts, source) is None:
+            raise _unsupported(serializer_class, key)
+
+        elif type(field) in _CONVERSIONS:
+            steps.append(_Step(key, source, "convert", extra=_CONVERSIONS[type(field)]))
+
+        else:
+            steps.append(_Step(key, source, "field", field))
+
+    return _Plan(serializer_class, model, steps)
+
+
+def _model_field(opts, name):
+    try:
+        return opts.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+
+def _defined_in(cls, name):
+    return next(klass for klass in cls.__mro__ if name in vars(klass))
+
+
+def _unsupported(serializer_class, key):
+    return ImproperlyConfigured(
+        f"{serializer_class.__name__}.{key} has no ValuesSerializer equivalent"
+    )
@@ -48,6 +48,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+
+    # Per-action SQL / view / serialization / render / wall time; a no-op unless REQUEST_METRICS is on
+    'core.instrumentation.RequestMetricsMiddleware',
 ]
 
 # --------------------
@@ -69,6 +72,11 @@ CSRF_TRUSTED_ORIGINS = [
 ROOT_URLCONF = 'core.urls'
 WSGI_APPLICATION = 'core.wsgi.application'
 
+# Serve the hot read endpoints (enrolled courses, chapter list, my progress)
+# from native async views. core/asgi.py turns this on; under WSGI each async
+# view would only add an event loop round trip.
+ASYNC_READ_VIEWS = os.getenv("ASYNC_READ_VIEWS", "False") == "True"
+
 # --------------------
 # Templates
 # --------------------
@@ -110,6 +118,32 @@ DATABASES = {
 
 
 
+# --------------------
+# Cache
+# --------------------
+# Per-student enrollment sets and token versions live here. With several
+# worker processes, set REDIS_URL (requires the `redis` package) so
+# invalidations reach all of them; `manage.py check` fails otherwise.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+ENROLLMENT_CACHE_TIMEOUT = 300
+
+# Worker processes per host; gunicorn and uvicorn read the same variable
+# for their default worker count
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
 # --------------------
 # Auth
 # --------------------
@@ -124,9 +158,21 @@ AUTH_PASSWORD_VALIDATORS = [
 # REST Framework
 # --------------------
 REST_FRAMEWORK = {
+    # JWT_AUTH_MODE=claims serves requests from the role/version claims in the
+    # token instead of loading the user row on every request
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.ClaimsJWTAuthentication'
+        if os.getenv("JWT_AUTH_MODE") == "claims"
+        else 'apps.users.authentication.AsyncJWTAuthentication',
     ),
+    # orjson-backed when orjson is installed; same bytes as DRF's JSONRenderer
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # Keyset pagination on the primary key for every list endpoint
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.EnvelopeCursorPagination',
+    'PAGE_SIZE': int(os.getenv("API_PAGE_SIZE", "100")),
     # Optional: Set global permission policy if you want strict security by default
     # 'DEFAULT_PERMISSION_CLASSES': (
     #    'rest_framework.permissions.IsAuthenticated',
@@ -138,6 +184,9 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(weeks=4),
 }
 
+# How long a user's token_version stays cached for ClaimsJWTAuthentication
+TOKEN_VERSION_CACHE_TIMEOUT = 300
+
 # --------------------
 # Static & Media Files (Crucial for Certificates)
 # --------------------
@@ -150,5 +199,80 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# --------------------
+# Certificates
+# --------------------
+# "background": PDFs are rendered by `manage.py run_certificate_worker`
+#               and the download endpoint answers 202 until the file exists
+# "inline":     PDFs are rendered on the request thread (no worker needed)
+CERTIFICATE_RENDERING = os.getenv("CERTIFICATE_RENDERING", "background")
+CERTIFICATE_JOB_MAX_ATTEMPTS = 3
+# RUNNING jobs not updated for this long are assumed orphaned and requeued
+CERTIFICATE_JOB_STALE_SECONDS = 300
+# A FAILED job is queued for one more attempt when the certificate is
+# requested again this long after the last failure
+CERTIFICATE_JOB_RETRY_SECONDS = 600
+
+# How rendered PDFs reach the client once permission checks pass:
+# "direct":           streamed by Django (ETag / If-None-Match / Range aware)
+# "x-accel-redirect": handed to nginx, which serves MEDIA_ROOT from an
+#                     `internal` location at CERTIFICATE_ACCEL_REDIRECT_PREFIX
+# "x-sendfile":       handed to Apache/lighttpd by absolute file path
+CERTIFICATE_DELIVERY = os.getenv("CERTIFICATE_DELIVERY", "direct")
+CERTIFICATE_ACCEL_REDIRECT_PREFIX = os.getenv("CERTIFICATE_ACCEL_REDIRECT_PREFIX", "/protected-media/")
+
+# --------------------
+# User imports
+# --------------------
+# POST /api/users/import/ queues the rows for `manage.py run_user_import_worker`;
+# larger files go through `manage.py import_users`
+USER_IMPORT_MAX_ROWS = 20_000
+# Not retried: a rerun would report the users created by the failed
+# attempt as duplicates
+USER_IMPORT_JOB_MAX_ATTEMPTS = 1
+# Hashing USER_IMPORT_MAX_ROWS passwords takes a while; only jobs silent for
+# longer than this are assumed orphaned and requeued
+USER_IMPORT_JOB_STALE_SECONDS = 3600
+
+# --------------------
+# Chapter images
+# --------------------
+# Resized WebP variants generated by `manage.py run_image_worker`
+CHAPTER_IMAGE_WIDTHS = (320, 640, 1280)
+CHAPTER_IMAGE_WEBP_QUALITY = 80
+# Uploads with more pixels than this are rejected instead of decoded
+CHAPTER_IMAGE_MAX_PIXELS = 40_000_000
+CHAPTER_IMAGE_JOB_MAX_ATTEMPTS = 3
+CHAPTER_IMAGE_JOB_STALE_SECONDS = 300
+
+# Resumable chunked uploads: partial files live here until finalized. Every
+# web worker must see the same directory (one host, or a shared volume):
+# chunks of one upload can land on any worker
+CHAPTER_UPLOAD_DIR = os.getenv("CHAPTER_UPLOAD_DIR", str(BASE_DIR / "uploads"))
+CHAPTER_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+CHAPTER_UPLOAD_MAX_CHUNK = 8 * 1024 * 1024
+# Unfinished uploads idle for longer are removed by `cleanup_uploads`
+CHAPTER_UPLOAD_EXPIRY_HOURS = 24
+
+# --------------------
+# Progress events
+# --------------------
+# Buffered ProgressEvents are written once this many are pending (and at
+# the end of every request)
+PROGRESS_EVENT_BATCH_SIZE = 500
+# `consume_progress_events` leaves events younger than this for its next pass
+PROGRESS_EVENT_SETTLE_SECONDS = 5
+
+# --------------------
+# Request metrics
+# --------------------
+# Records SQL count, SQL time, view / serialization / render time and wall time per view action
+# into in-process histograms (admin: GET /api/metrics/)
+REQUEST_METRICS = os.getenv("REQUEST_METRICS", "False") == "True"
+# Fraction of requests measured; keep it low in production
+REQUEST_METRICS_SAMPLE_RATE = float(os.getenv("REQUEST_METRICS_SAMPLE_RATE", "1.0"))
+# Add a Server-Timing header to measured responses
+REQUEST_METRICS_SERVER_TIMING = os.getenv("REQUEST_METRICS_SERVER_TIMING", "True") == "True"
+
 STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
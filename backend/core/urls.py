@@ -1,8 +1,16 @@
+from django.conf import settings
 from django.urls import path, include
 
+from .views import RequestMetricsView
+
 
 urlpatterns = [
  path('api/', include('apps.users.urls')),
  path('api/', include('apps.courses.urls')),
  path('api/', include('apps.certificates.urls')),
+ path('api/metrics/', RequestMetricsView.as_view()),
 ]
+
+if settings.ASYNC_READ_VIEWS:
+    # Async twins of the hot read endpoints shadow their DRF routes
+    urlpatterns.insert(0, path('api/', include('apps.courses.async_urls')))
@@ -0,0 +1,29 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.users.permissions import IsAdminRole
+
+from .instrumentation import registry
+
+
+class RequestMetricsView(APIView):
+    """
+    GET    /api/metrics/  -> per-action request histograms of this process
+    DELETE /api/metrics/  -> reset them
+    (Admin only; empty unless REQUEST_METRICS is on)
+    """
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def get(self, request):
+        return Response({
+            "data": registry.snapshot(),
+            "detail": "Request metrics fetched successfully"
+        }, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        registry.reset()
+        return Response({
+            "detail": "Request metrics reset"
+        }, status=status.HTTP_200_OK)
@@ -44,6 +44,23 @@ api.interceptors.response.use(
    API FUNCTIONS
 =========================== */
 
+// List endpoints are cursor paginated ({data, next, previous, detail}):
+// follow `next` until the last page and answer with every row in `data`.
+const getAllPages = async (url, params) => {
+  const res = await api.get(url, { params });
+  const rows = [...(res.data.data || [])];
+
+  let next = res.data.next;
+  while (next) {
+    const cursor = new URL(next).searchParams.get("cursor");
+    const page = await api.get(url, { params: { ...params, cursor } });
+    rows.push(...(page.data.data || []));
+    next = page.data.next;
+  }
+
+  return { ...res, data: { ...res.data, data: rows, next: null } };
+};
+
 // authentication
 export const registerUser = (data) => {
   return api.post("auth/register/", data);
@@ -55,7 +72,7 @@ export const loginUser = (data) => {
 
 // user-management
 export const getUsers = (params) => {
-  return api.get("users/", { params });
+  return getAllPages("users/", params);
 };
 
 export const approveMentor = (id, data) => {
@@ -68,11 +85,11 @@ export const deleteUser = (id) => {
 
 // courses
 export const getCourses = (params) => {
-  return api.get("courses/", {params});
+  return getAllPages("courses/", params);
 };
 
 export const getMyCourses = (params) => {
-  return api.get("courses/my/", {params});
+  return getAllPages("courses/my/", params);
 };
 
 export const createCourse = (data) => {
@@ -96,11 +113,11 @@ export const assignCourse = (courseId, data) => {
 };
 
 export const getAllStudents = (params) => {
-  return api.get("users/students/", {params});
+  return getAllPages("users/students/", params);
 };
 
-export const getEnrolledCourses = () =>
-  api.get("courses/enrolled/");
+export const getEnrolledCourses = (params) =>
+  getAllPages("courses/enrolled/", params);
 
 export const getCourseChapters = (courseId) =>
   api.get(`courses/${courseId}/chapters/`);
@@ -111,7 +128,15 @@ export const markChapterComplete = (chapterId) =>
 export const getMyProgress = () =>
   api.get("progress/my/");
 
-export const downloadCertificate = (courseId) =>
-  api.get(`certificates/${courseId}/`, {
-    responseType: "blob",
-  });
\ No newline at end of file
+// Certificates are rendered in the background: the endpoint answers 202
+// until the PDF is ready, so keep asking for a while before giving up.
+export const downloadCertificate = async (courseId, attempts = 30) => {
+  for (let i = 0; i < attempts; i++) {
+    const res = await api.get(`certificates/${courseId}/`, {
+      responseType: "blob",
+    });
+    if (res.status !== 202) return res;
+    await new Promise((resolve) => setTimeout(resolve, 2000));
+  }
+  throw new Error("Certificate is still being generated");
+};
\ No newline at end of file
@@ -67,7 +67,7 @@ export default function AdminDashboard() {
 
   const fetchCourses = () => {
     setLoadingCourses(true);
-    getCourses()
+    getCourses({fields: "id,title,description,mentor"})
       .then((res) => {
         setCourses(res.data.data || []);
       })
@@ -49,7 +49,7 @@ export default function StudentDashboard() {
   }, []);
 
   const fetchCourses = () => {
-    getEnrolledCourses()
+    getEnrolledCourses({fields: "id,title"})
       .then((res) => setCourses(res.data.data || []))
       .catch(() => alert("Failed to load courses"));
   };